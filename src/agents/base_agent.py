@@ -1,12 +1,14 @@
+import asyncio
 import json
 from typing import Optional, List, Dict, Any, Tuple
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.prebuilt import create_react_agent
 
 from src.agents.response import AgentResponse
 from src.agents.state import AgentState
+from src.utils import fastjson
 
 
 class BaseAgent:
@@ -19,6 +21,7 @@ class BaseAgent:
         tools=None,
         state_key: Optional[str] = None,  # key this agent updates (simple agents)
         next_default: Optional[str] = None,
+        response_cache=None,  # optional SQLiteSemanticCache: semantic cache of raw LLM output
     ):
         self.name = name
         self.logger = logger
@@ -28,6 +31,7 @@ class BaseAgent:
         self.system_prompt = system_prompt
         self.state_key = state_key
         self.next_default = next_default
+        self.response_cache = response_cache
 
         if tools is not None and len(tools) > 0:
             # Tool/ReAct agents: state_modifier is fine; inputs must include "messages"
@@ -58,13 +62,8 @@ class BaseAgent:
         # Messages are already provided separately; remove to avoid serialization issues
         safe.pop("messages", None)
 
-        # Anything non-serializable should be stringified as a last resort
-        try:
-            return json.dumps(safe, ensure_ascii=False)
-        except TypeError:
-            def default(o):
-                return str(o)
-            return json.dumps(safe, ensure_ascii=False, default=default)
+        # Anything non-serializable is stringified as a last resort
+        return fastjson.dumps(safe)
 
     async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
         """
@@ -137,6 +136,53 @@ class BaseAgent:
 
         return [response], updates
 
+    # ----------------------------
+    # Semantic response cache (optional)
+    # ----------------------------
+    def _response_cache_key(self, state: AgentState, *parts: Any) -> Optional[str]:
+        """
+        Exact-match prefilter: entries are only compared within the same agent (+ parts) and the same
+        request context (the METADATA/override messages ahead of the request). None (don't cache) when
+        the thread has earlier turns: the model reads that history, so a follow-up like "send it" must
+        not reuse a label from another conversation.
+        """
+        messages = state.get("messages") or []
+        raw_input = state.get("raw_input")
+        end = next(
+            (i for i in range(len(messages) - 1, -1, -1)
+             if isinstance(messages[i], HumanMessage) and messages[i].content == raw_input),
+            len(messages),
+        )
+        context = messages[:end]
+        if any(not isinstance(m, HumanMessage) for m in context):
+            return None
+        return json.dumps([self.name, *parts, [m.content for m in context]])
+
+    async def _cached_response(self, cache_key: Optional[str], raw_input: str) -> Optional[AIMessage]:
+        """Cached model output for a paraphrase of raw_input, or None. Cache errors count as misses."""
+        if self.response_cache is None or not raw_input or cache_key is None:
+            return None
+        try:
+            content = await self.response_cache.lookup(cache_key, raw_input)
+        except Exception as e:
+            self.logger.debug(f"[{self.name}] response cache lookup failed: {e}")
+            return None
+        if content is None:
+            return None
+        self.logger.debug(f"[{self.name}] response cache hit")
+        return AIMessage(content=content)
+
+    def _remember_response(self, cache_key: Optional[str], raw_input: str, content: str) -> None:
+        """Store in the background: the reply doesn't wait on the embedding call and the insert."""
+        if self.response_cache is None or not raw_input or cache_key is None:
+            return
+        task = self.response_cache.store_in_background(cache_key, raw_input, content)
+        task.add_done_callback(self._log_cache_store_failure)
+
+    def _log_cache_store_failure(self, task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            self.logger.debug(f"[{self.name}] cache store failed: {task.exception()}")
+
     def create_response(
         self,
         messages: Optional[List[BaseMessage]] = None,
@@ -0,0 +1,74 @@
+from __future__ import annotations
+
+from typing import Any, Dict, List, Tuple
+
+from langchain_core.messages import AIMessage, BaseMessage, HumanMessage
+
+from src.agents.base_agent import BaseAgent
+from src.agents.state import AgentState
+
+
+SYSTEM_PROMPT = """
+You are the Draft Polish Agent for an AI-powered email assistant.
+
+The email in the latest message was reviewed; state_json.issues lists the only problems found
+(grammar/clarity, low or medium severity), with suggested fixes where available.
+
+Instructions:
+- Fix exactly those issues with minimal edits.
+- Keep everything else unchanged: structure, greeting, signature, names, facts, tone and length.
+- Do not output JSON. Do not output analysis. Output only the email.
+""".strip()
+
+# Issue categories (ReviewValidator schema) that a minimal in-place edit can address
+CHEAP_FIX_CATEGORIES = frozenset({"grammar", "clarity"})
+CHEAP_FIX_SEVERITIES = frozenset({"low", "medium"})
+
+
+def needs_only_polish(report: Dict[str, Any]) -> bool:
+    """True if every validator issue is a low/medium grammar or clarity issue (and there is at least one)."""
+    issues = report.get("issues") or []
+    if not isinstance(issues, list) or not issues:
+        return False
+    return all(
+        isinstance(i, dict)
+        and str(i.get("category") or "").lower() in CHEAP_FIX_CATEGORIES
+        and str(i.get("severity") or "").lower() in CHEAP_FIX_SEVERITIES
+        for i in issues
+    )
+
+
+class DraftPolishAgent(BaseAgent):
+    """Applies the validator's minor fixes to the finished draft, instead of a full redraft + personalization."""
+
+    def __init__(self, llm, logger):
+        super().__init__(
+            name="DraftPolish",
+            llm=llm,
+            logger=logger,
+            system_prompt=SYSTEM_PROMPT,
+            state_key=None,  # structured updates
+        )
+
+    async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
+        draft = (state.get("personalized_draft") or state.get("draft") or "").strip()
+        report = state.get("validation_report") or {}
+        issues = report.get("issues") or []
+
+        self.logger.debug(f"[DraftPolish] draft_len={len(draft)} issues={len(issues)}")
+
+        response = await self.agent.ainvoke(
+            {
+                "messages": [HumanMessage(content=draft)],
+                "state_json": self._safe_state_json({"issues": issues}),
+            }
+        )
+
+        polished = (response.content or "").strip()
+        if not polished:
+            # Fail-soft: keep the draft; the validator decides again
+            self.logger.debug("[DraftPolish] empty model output; keeping draft")
+            return [AIMessage(content=draft)], {"personalized_draft": draft}
+
+        self.logger.debug(f"[DraftPolish] polished_len={len(polished)}")
+        return [response], {"personalized_draft": polished}
@@ -2,7 +2,7 @@ from __future__ import annotations
 
 from typing import Any, Dict, List, Tuple
 
-from langchain_core.messages import BaseMessage
+from langchain_core.messages import AIMessage, BaseMessage
 
 from src.agents.base_agent import BaseAgent
 from src.agents.state import AgentState
@@ -24,10 +24,15 @@ Instructions:
 - Do not output JSON. Do not output analysis. Output only the email.
 """.strip()
 
+# Short, formulaic emails the deterministic (cheaper, faster) model writes well
+SIMPLE_INTENTS = frozenset({"thank_you"})
+SIMPLE_INTENT_MIN_CONFIDENCE = 0.9
+
 
 class DraftWriterAgent(BaseAgent):
-    def __init__(self, llm, logger, template_engine):
+    def __init__(self, llm, logger, template_engine, draft_cache=None, simple_llm=None):
         self.template_engine = template_engine
+        self.draft_cache = draft_cache  # optional SQLiteDraftCache (first-pass drafts only)
 
         super().__init__(
             name="DraftWriter",
@@ -36,6 +41,8 @@ class DraftWriterAgent(BaseAgent):
             system_prompt=SYSTEM_PROMPT,
             state_key=None,  # structured updates
         )
+        # Same prompt, cheaper model: used for confidently-detected simple intents
+        self.simple_agent = self.agent.first | simple_llm if simple_llm is not None else None
 
     async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
         intent = (state.get("intent") or "other").strip()
@@ -69,24 +76,70 @@ class DraftWriterAgent(BaseAgent):
                 "length_budget": plan.get("length_budget"),
                 "format": plan.get("format"),
             },
-            "rendered_skeleton": plan.get("rendered_skeleton", ""),
+            "rendered_skeleton": plan.rendered_skeleton,
         }
 
-        response = await self.agent.ainvoke(
-            {
-                "messages": state.get("messages", []),
-                "state_json": self._safe_state_json(payload),
-            }
-        )
+        # Semantic cache: only first passes; retries must follow revision_instructions
+        raw_input = state.get("raw_input") or ""
+        cache_key = None
+        if self.draft_cache is not None and raw_input and not (state.get("retry_count") or 0):
+            cache_key = self.draft_cache.make_key(
+                intent=intent,
+                tone_params=tone_params,
+                constraints=constraints,
+                parsed_input=parsed_input,
+            )
+
+        cached = await self._cache_lookup(cache_key, raw_input)
+        if cached:
+            self.logger.debug(f"[DraftWriter] semantic cache hit draft_len={len(cached)}")
+            response = AIMessage(content=cached)
+        else:
+            tier = self._model_tier(state, intent)
+            agent = self.simple_agent if tier == "simple" else self.agent
+            response = await agent.ainvoke(
+                {
+                    "messages": state.get("messages", []),
+                    "state_json": self._safe_state_json(payload),
+                }
+            )
 
         draft = (response.content or "").strip()
+        if not cached and draft:
+            self._cache_store(cache_key, raw_input, draft)
 
         updates: Dict[str, Any] = {
             "draft": draft,
             # useful for UI debug panels
             "template_id": plan.get("template_id") or "",
-            "template_plan": plan,
+            "template_plan": plan.to_dict(),
         }
 
+        if not cached:
+            updates["draft_model_tier"] = tier
         self.logger.debug(f"[DraftWriter] draft_len={len(draft)}")
         return [response], updates
+
+    def _model_tier(self, state: AgentState, intent: str) -> str:
+        if self.simple_agent is None or intent not in SIMPLE_INTENTS:
+            return "creative"
+        if (state.get("intent_confidence") or 0.0) <= SIMPLE_INTENT_MIN_CONFIDENCE:
+            return "creative"
+        return "simple"
+
+    async def _cache_lookup(self, cache_key, raw_input: str):
+        if cache_key is None:
+            return None
+        try:
+            return await self.draft_cache.lookup(cache_key, raw_input)
+        except Exception as e:
+            # Cache problems (e.g. embedding call failed) must never block drafting
+            self.logger.debug(f"[DraftWriter] semantic cache lookup failed: {e}")
+            return None
+
+    def _cache_store(self, cache_key, raw_input: str, draft: str) -> None:
+        # In the background: the draft goes on to personalization without waiting on the write
+        if cache_key is None:
+            return
+        task = self.draft_cache.store_in_background(cache_key, raw_input, draft)
+        task.add_done_callback(self._log_cache_store_failure)
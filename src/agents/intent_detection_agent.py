@@ -50,13 +50,14 @@ Rules:
 class IntentDetectionAgent(BaseAgent):
     """Classifies intent into a controlled taxonomy with confidence."""
 
-    def __init__(self, llm, logger):
+    def __init__(self, llm, logger, response_cache=None):
         super().__init__(
             name="IntentDetection",
             llm=llm,
             logger=logger,
             system_prompt=SYSTEM_PROMPT,
             state_key=None,  # structured updates
+            response_cache=response_cache,
         )
 
     async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
@@ -90,12 +91,18 @@ class IntentDetectionAgent(BaseAgent):
             f"[IntentDetection] Input: messages={len(messages)} state_json_len={len(state_json)}"
         )
 
-        response = await self.agent.ainvoke(
-            {
-                "messages": messages,
-                "state_json": state_json,
-            }
-        )
+        # Paraphrased requests reuse an earlier classification (semantic cache, optional)
+        raw_input = state.get("raw_input") or ""
+        cache_key = self._response_cache_key(state)
+        response = await self._cached_response(cache_key, raw_input)
+        cached = response is not None
+        if not cached:
+            response = await self.agent.ainvoke(
+                {
+                    "messages": messages,
+                    "state_json": state_json,
+                }
+            )
 
         self.logger.debug(
             f"[IntentDetection] Raw model output (first 200 chars): {response.content[:200]!r}"
@@ -159,4 +166,6 @@ class IntentDetectionAgent(BaseAgent):
         
         self.logger.debug(f"[IntentDetection] updates={updates}")
 
+        if not cached:
+            self._remember_response(cache_key, raw_input, response.content)
         return [response], updates
@@ -5,7 +5,7 @@ from langchain_core.messages import BaseMessage, AIMessage
 from src.agents.base_agent import BaseAgent
 from src.agents.state import AgentState
 from src.memory.sqlite_memory_store import SQLiteMemoryStore
-from src.utils.recipient import compute_recipient_key, normalize_recipient
+from src.utils.recipient import compute_legacy_recipient_key, compute_recipient_key, normalize_recipient
 
 SYSTEM_PROMPT = """
 You are the Memory Agent for an AI-powered email assistant.
@@ -85,7 +85,7 @@ class MemoryAgent(BaseAgent):
             if recipient_key:
                 # Load existing summary
                 past_summary = self.memory_store.get_past_summary(
-                    user_id, recipient_key
+                    user_id, recipient_key, legacy_key=compute_legacy_recipient_key(recipient)
                 )
 
         payload = {
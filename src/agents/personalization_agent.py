@@ -9,7 +9,7 @@ from src.agents.base_agent import BaseAgent
 from src.agents.state import AgentState
 from src.profiles.sqlite_profile_store import SQLiteProfileStore
 from src.memory.sqlite_memory_store import SQLiteMemoryStore
-from src.utils.recipient import compute_recipient_key, normalize_recipient
+from src.utils.recipient import compute_legacy_recipient_key, compute_recipient_key, normalize_recipient
 
 
 SYSTEM_PROMPT = """
@@ -55,10 +55,38 @@ class PersonalizationAgent(BaseAgent):
         )
 
 
+    def load_context(self, state: AgentState) -> Dict[str, Any]:
+        """
+        DB reads only (no LLM): user profile, plus the past summary for the parsed recipient.
+        Depends on user_id/parsed_input/constraints, not on the draft, so it can run alongside draft_writer.
+        """
+        parsed_input = state.get("parsed_input") or {}
+        user_id = (state.get("user_id") or "default").strip()
+
+        profile = self.profile_store.get_profile(user_id)
+        self.logger.debug(
+            f"[Personalization] Loaded profile: user_id={user_id!r} keys={list(profile.keys())[:12]}"
+        )
+        context: Dict[str, Any] = {"user_profile": profile}
+
+        recipient = parsed_input.get("recipient") or {}
+        self.logger.debug(f"[Personalization] Parsed recipient: {recipient!r}")
+        if recipient:
+            metadata = state.get("constraints") or {}
+            recipient = normalize_recipient(recipient, metadata)
+            self.logger.debug(f"[Personalization] Normalized recipient: {recipient!r}")
+            recipient_key = compute_recipient_key(recipient)
+            self.logger.debug(f"[Personalization] Computed recipient_key: {recipient_key!r}")
+            past_summary = self.memory_store.get_past_summary(
+                user_id, recipient_key, legacy_key=compute_legacy_recipient_key(recipient)
+            )
+            self.logger.debug(f"[Personalization] Loaded past summary for user={user_id}, recipient_key={recipient_key}\n keys={list(past_summary.keys())[:10]}" if past_summary else "None")
+            context["past_summary"] = past_summary
+        return context
+
     async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
         draft = (state.get("personalized_draft") or state.get("draft") or "").strip()
         parsed_input = state.get("parsed_input") or {}
-        user_id = (state.get("user_id") or "default").strip()
 
         if not draft:
             self.logger.debug("[Personalization] No draft present; skipping.")
@@ -67,39 +95,23 @@ class PersonalizationAgent(BaseAgent):
                 "memory_updates": {},
             }
 
-        # 1) Load profile from DB
-        profile = self.profile_store.get_profile(user_id)
-
-        self.logger.debug(
-            f"[Personalization] Loaded profile: user_id={user_id!r} keys={list(profile.keys())[:12]}"
-        )
+        # 1) Profile (+ past summary for the recipient): prefetched by the workflow while the
+        #    draft was being written, or loaded now
+        context = state.get("personalization_prefetch") or self.load_context(state)
+        profile = context["user_profile"]
 
         payload = {
             "draft": draft,
             "user_profile": profile,
             "parsed_input": parsed_input,
         }
+        if "past_summary" in context:
+            payload["past_summary"] = context["past_summary"]
 
         self.logger.debug(
             f"[Personalization] Input: draft_len={len(draft)} parsed_keys={list(parsed_input.keys())[:10]}"
         )
 
-        past_summary = None
-        recipient_key = "unknown"
-        recipient = parsed_input.get("recipient") or {}
-        self.logger.debug(f"[Personalization] Parsed recipient: {recipient!r}")
-        if recipient:
-            metadata = state.get("constraints") or {}
-            recipient = normalize_recipient(recipient, metadata)
-            self.logger.debug(f"[Personalization] Normalized recipient: {recipient!r}")
-            recipient_key = compute_recipient_key(recipient)
-            self.logger.debug(f"[Personalization] Computed recipient_key: {recipient_key!r}")
-            past_summary = self.memory_store.get_past_summary(
-                user_id, recipient_key
-            )
-            self.logger.debug(f"[Personalization] Loaded past summary for user={user_id}, recipient_key={recipient_key}\n keys={list(past_summary.keys())[:10]}" if past_summary else "None")
-            payload["past_summary"] = past_summary
-
         self.logger.debug(f"[Personalization] Invoking LLM with payload={payload!r}")
         response = await self.agent.ainvoke(
             {
@@ -24,3 +24,7 @@ class AgentResponse(BaseModel):
         None,
         description="Explicit next node request (router-eligible agents only)"
     )
+
+    def to_state_delta(self) -> Dict[str, Any]:
+        """Graph node return value: new messages plus the proposed state updates."""
+        return {"messages": self.messages, **self.updates}
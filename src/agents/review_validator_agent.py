@@ -1,9 +1,12 @@
 import json
-from typing import Any, Dict, List, Tuple
+import re
+from contextlib import aclosing
+from typing import Any, Dict, List, Optional, Tuple
 
 from langchain_core.messages import BaseMessage, AIMessage, HumanMessage 
 from src.agents.base_agent import BaseAgent
 from src.agents.state import AgentState
+from src.utils import fastjson
 
 
 SYSTEM_PROMPT = """
@@ -97,6 +100,15 @@ Rules:
 
 
 
+# A PASS with no issues is final: only high-severity issues turn a PASS into FAIL. The schema
+# lists status, summary, issues first, so generation can stop once that prefix is complete.
+CLEAN_PASS_PREFIX = re.compile(
+    r'\A\s*\{\s*"status"\s*:\s*"PASS"\s*,\s*"summary"\s*:\s*("(?:[^"\\]|\\.)*")\s*,\s*"issues"\s*:\s*\[\s*\]'
+)
+# Once either of these shows up the response cannot be a clean PASS; stop checking
+NOT_CLEAN_PASS = re.compile(r'"status"\s*:\s*"(?:FAIL|BLOCKED)|"issues"\s*:\s*\[\s*[^\s\]]')
+
+
 class ReviewValidatorAgent(BaseAgent):
     """Reviews and validates the drafted email. Produces structured validation_report + is_valid."""
 
@@ -150,7 +162,7 @@ class ReviewValidatorAgent(BaseAgent):
                 HumanMessage(content=draft_text),
             ]
 
-        response = await self.agent.ainvoke(
+        response, early = await self._stream_review(
             {
                 "messages": validator_messages,
                 "state_json": payload,
@@ -171,7 +183,9 @@ class ReviewValidatorAgent(BaseAgent):
         # JSON parsing
         # ----------------------------
         try:
-            data = json.loads(content)
+            data = early if early is not None else fastjson.loads(content)
+            if not isinstance(data, dict):
+                raise ValueError(f"expected a JSON object, got {type(data).__name__}")
             self.logger.debug(
                 f"[{self.name}] JSON parse SUCCESS | keys={list(data.keys())}"
             )
@@ -238,12 +252,21 @@ class ReviewValidatorAgent(BaseAgent):
                 "Apply only necessary edits; keep structure intact."
             )
 
+        # Read by the workflow's apply_revision_hints step to adjust constraints/tone before a retry
+        constraint_resolution = data.get("constraint_resolution") or {}
+        if not isinstance(constraint_resolution, dict):
+            self.logger.debug(
+                f"[{self.name}] constraint_resolution malformed; expected dict, got {type(constraint_resolution).__name__}"
+            )
+            constraint_resolution = {}
+
         report: Dict[str, Any] = {
             "status": status,
             "summary": data.get("summary") or "",
             "issues": issues,
             "suggested_edits": data.get("suggested_edits") or {},
             "revision_instructions": revision_instructions,
+            "constraint_resolution": constraint_resolution,
         }
 
         is_valid = report["status"] == "PASS"
@@ -259,3 +282,23 @@ class ReviewValidatorAgent(BaseAgent):
 
         return [response], {"validation_report": report, "is_valid": is_valid}
 
+    async def _stream_review(self, inputs: Dict[str, Any]) -> Tuple[AIMessage, Optional[Dict[str, Any]]]:
+        """
+        Streams the review. On a clean PASS the stream is closed (cancelling the generation) and
+        the parsed prefix is returned as data; otherwise returns the full response and None.
+        """
+        buf = ""
+        watching = True
+        async with aclosing(self.agent.astream(inputs)) as stream:
+            async for chunk in stream:
+                if isinstance(chunk.content, str):
+                    buf += chunk.content
+                if not watching:
+                    continue
+                m = CLEAN_PASS_PREFIX.match(buf)
+                if m:
+                    data = {"status": "PASS", "summary": json.loads(m.group(1)), "issues": []}
+                    self.logger.debug(f"[{self.name}] clean PASS after {len(buf)} chars; stopped generation")
+                    return AIMessage(content=json.dumps(data)), data
+                watching = NOT_CLEAN_PASS.search(buf) is None
+        return AIMessage(content=buf), None
@@ -3,9 +3,19 @@ from langgraph.graph.message import add_messages
 from langchain_core.messages import BaseMessage
 
 
+# Checkpoint threads are per user, so history carries over between runs; keep only the tail
+MAX_MESSAGES = 64
+
+
+def add_messages_capped(left, right):
+    """add_messages (append / replace by id), then keep the most recent MAX_MESSAGES."""
+    merged = add_messages(left, right)
+    return merged[-MAX_MESSAGES:] if len(merged) > MAX_MESSAGES else merged
+
+
 class AgentState(TypedDict, total=False):
     # Conversation history (LangGraph-managed)
-    messages: Annotated[List[BaseMessage], add_messages]
+    messages: Annotated[List[BaseMessage], add_messages_capped]
 
     # ===== Input & Parsing =====
     raw_input: str
@@ -26,10 +36,12 @@ class AgentState(TypedDict, total=False):
     template_plan: Dict[str, Any]   # structure + budgets + placeholders
     draft: str                          # generic draft
     personalized_draft: str             # after personalization
+    draft_model_tier: str               # "creative" | "simple" (deterministic model for simple intents)
 
     # ===== User Context & Memory =====
     user_id: str
     user_context: Dict[str, Any]        # profile data, preferences
+    personalization_prefetch: Dict[str, Any]  # user_profile (+ past_summary) loaded alongside the draft
     memory_updates: Dict[str, Any]      # safe-to-persist deltas only
 
     # ===== Conversation context (for PersonalizationAgent) =====
@@ -40,17 +40,38 @@ Rules:
 - "tone_label" should be stable, lowercase, and underscore-free (e.g., "follow_up" is NOT a tone).
 """.strip()
 
+# Numeric tone fields: (key, type, lo, hi, default when missing/unparseable)
+TONE_RANGES = (
+    ("formality", int, 0, 100, 70),
+    ("warmth", int, 0, 100, 45),
+    ("directness", int, 0, 100, 65),
+    ("confidence", float, 0.0, 1.0, 0.6),
+)
+
+
+def _clamp_tone_fields(tone_params: Dict[str, Any]) -> None:
+    """Coerce and clamp the numeric fields in place (plain min/max: numpy is slower for 4 scalars)."""
+    for key, cast, lo, hi, default in TONE_RANGES:
+        try:
+            x = cast(tone_params.get(key))
+        except (TypeError, ValueError, OverflowError):
+            x = default
+        if x != x:  # NaN
+            x = default
+        tone_params[key] = lo if x < lo else hi if x > hi else x
+
 
 class ToneStylistAgent(BaseAgent):
     """Derives tone_params for downstream drafting/personalization."""
 
-    def __init__(self, llm, logger):
+    def __init__(self, llm, logger, response_cache=None):
         super().__init__(
             name="ToneStylist",
             llm=llm,
             logger=logger,
             system_prompt=SYSTEM_PROMPT,
             state_key=None,  # structured updates
+            response_cache=response_cache,
         )
 
     async def _execute(self, state: AgentState) -> Tuple[List[BaseMessage], Dict[str, Any]]:
@@ -83,12 +104,18 @@ class ToneStylistAgent(BaseAgent):
 
         self.logger.debug(f"[ToneStylist] Input: messages={len(messages)} state_json_len={len(state_json)}")
 
-        response = await self.agent.ainvoke(
-            {
-                "messages": messages,
-                "state_json": state_json,
-            }
-        )
+        # Paraphrased requests reuse an earlier classification (semantic cache, optional)
+        raw_input = state.get("raw_input") or ""
+        cache_key = self._response_cache_key(state, *self._recipient_hints(state))
+        response = await self._cached_response(cache_key, raw_input)
+        cached = response is not None
+        if not cached:
+            response = await self.agent.ainvoke(
+                {
+                    "messages": messages,
+                    "state_json": state_json,
+                }
+            )
 
         self.logger.debug(f"[ToneStylist] Raw model output (first 200 chars): {response.content[:200]!r}")
 
@@ -141,24 +168,7 @@ class ToneStylistAgent(BaseAgent):
         tone_params["tone_label"] = tone_label
 
         # Ensure numeric ranges
-        def clamp_int(v: Any, lo: int, hi: int, default: int) -> int:
-            try:
-                x = int(v)
-            except Exception:
-                return default
-            return max(lo, min(hi, x))
-
-        def clamp_float(v: Any, lo: float, hi: float, default: float) -> float:
-            try:
-                x = float(v)
-            except Exception:
-                return default
-            return max(lo, min(hi, x))
-
-        tone_params["formality"] = clamp_int(tone_params.get("formality"), 0, 100, 70)
-        tone_params["warmth"] = clamp_int(tone_params.get("warmth"), 0, 100, 45)
-        tone_params["directness"] = clamp_int(tone_params.get("directness"), 0, 100, 65)
-        tone_params["confidence"] = clamp_float(tone_params.get("confidence"), 0.0, 1.0, 0.6)
+        _clamp_tone_fields(tone_params)
 
 
         updates: Dict[str, Any] = {
@@ -172,4 +182,17 @@ class ToneStylistAgent(BaseAgent):
             f"directness={tone_params['directness']} confidence={tone_params['confidence']}"
         )
 
+        if not cached:
+            self._remember_response(cache_key, raw_input, response.content)
         return [response], updates
+
+    @staticmethod
+    def _recipient_hints(state: AgentState) -> Tuple[str, str]:
+        # Tone depends on who the email is for; cached tones are only reused for the same recipient kind
+        recipient = (state.get("parsed_input") or {}).get("recipient") or {}
+        if not isinstance(recipient, dict):
+            return "", ""
+        return (
+            str(recipient.get("role") or "").strip().lower(),
+            str(recipient.get("relationship") or "").strip().lower(),
+        )
@@ -0,0 +1,60 @@
+from __future__ import annotations
+
+import json
+import re
+from typing import Any, Dict
+
+from src.memory.sqlite_semantic_cache import SQLiteSemanticCache
+
+_NON_WORD = re.compile(r"[^\w']+")
+
+
+class SQLiteDraftCache(SQLiteSemanticCache):
+    """
+    Semantic cache of generated drafts.
+    - The exact-match key is the draft's constraint key (make_key: intent, tone, the parsed ask,
+      must_include/avoid, length/format/audience/bullets, recipient role/name/org, deadline);
+      numbers/negations and the embedding comparison work as in SQLiteSemanticCache. The parsed ask
+      is what keeps opposite paraphrases ("approve" vs "reject" the request) apart.
+    - draft_cache: one row per cached draft, embedding stored as float32 bytes.
+    """
+
+    TABLE = "draft_cache"
+    VALUE_COLUMN = "draft"
+
+    @staticmethod
+    def make_key(
+        *,
+        intent: str,
+        tone_params: Dict[str, Any],
+        constraints: Dict[str, Any],
+        parsed_input: Dict[str, Any],
+    ) -> str:
+        recipient = (parsed_input or {}).get("recipient") or {}
+        if not isinstance(recipient, dict):
+            recipient = {}
+
+        def norm(value: Any) -> str:
+            return str(value or "").strip().lower()
+
+        # Lexical form of the ask: case, punctuation and spacing don't matter, the words do
+        ask = " ".join(_NON_WORD.sub(" ", norm((parsed_input or {}).get("primary_request"))).split())
+
+        return json.dumps(
+            [
+                intent or "",
+                (tone_params or {}).get("tone_label") or "",
+                ask,
+                sorted(map(str, constraints.get("must_include") or [])),
+                sorted(map(str, constraints.get("must_avoid") or [])),
+                norm(recipient.get("role")),
+                norm(recipient.get("name")),
+                norm(recipient.get("org")),
+                norm(constraints.get("deadline")),
+                norm(constraints.get("length")),
+                norm(constraints.get("format")),
+                norm(constraints.get("audience")),
+                bool(constraints.get("use_bullets")),
+                norm(constraints.get("bullet_count")),
+            ]
+        )
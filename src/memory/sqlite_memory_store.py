@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from typing import Any, Dict, Optional
+from typing import Any, ContextManager, Dict, Optional
+
+from src.utils.sqlite_pool import SQLitePool
 
 
 class SQLiteMemoryStore:
@@ -12,11 +14,14 @@ class SQLiteMemoryStore:
     - conversation_events: one row per event in a conversation thread.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool: Optional[SQLitePool] = None):
         self.db_path = db_path
+        self.pool = pool  # shared connections (EmailWorkflow); otherwise one connection per call
         self._init_schema()
 
-    def _connect(self) -> sqlite3.Connection:
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        if self.pool is not None:
+            return self.pool.connection()
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
@@ -37,7 +42,13 @@ CREATE TABLE IF NOT EXISTS email_summaries (
             )
             conn.commit()
 
-    def get_past_summary(self, user_id: str, recipient_key: str) -> Dict[str, Any]:
+    def get_past_summary(
+        self, user_id: str, recipient_key: str, legacy_key: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        legacy_key: the recipient's key in the old format (see compute_legacy_recipient_key). If only a
+        row under that key exists, it is moved to recipient_key and returned.
+        """
         if not user_id:
             return {}
 
@@ -46,6 +57,17 @@ CREATE TABLE IF NOT EXISTS email_summaries (
                 "SELECT summary_json FROM email_summaries WHERE user_id = ? AND recipient_key = ? ORDER BY updated_at DESC LIMIT 1;",
                 (user_id, recipient_key),
             ).fetchone()
+            if not row and legacy_key and legacy_key != recipient_key:
+                row = conn.execute(
+                    "SELECT summary_json FROM email_summaries WHERE user_id = ? AND recipient_key = ? ORDER BY updated_at DESC LIMIT 1;",
+                    (user_id, legacy_key),
+                ).fetchone()
+                if row:
+                    conn.execute(
+                        "UPDATE email_summaries SET recipient_key = ? WHERE user_id = ? AND recipient_key = ?;",
+                        (recipient_key, user_id, legacy_key),
+                    )
+                    conn.commit()
 
         if not row:
             return {}
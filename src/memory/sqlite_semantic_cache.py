@@ -0,0 +1,168 @@
+from __future__ import annotations
+
+import asyncio
+import re
+import sqlite3
+from typing import Awaitable, Callable, ContextManager, List, Optional, Sequence, Set
+
+import numpy as np
+
+from src.utils.sqlite_pool import SQLitePool, connect
+
+EmbedFn = Callable[[str], Awaitable[Sequence[float]]]
+
+# Tokens that flip or pin down the meaning of a request while barely moving its embedding
+# ("meet on the 3rd" vs "the 5th", "send" vs "don't send")
+_CRITICAL_TOKENS = re.compile(r"\d+(?:[.,:/-]\d+)*|\b(?:not|no|never|cannot|without|\w+n't)\b", re.IGNORECASE)
+
+
+class SQLiteSemanticCache:
+    """
+    Semantic cache of model output, keyed by the request text.
+    - Lookups require an exact match on the caller's cache key and on the request's numbers and
+      negations (lexical guard against near-identical embeddings with a different meaning); only the
+      rest of the request is compared semantically (cosine distance between embeddings).
+    - One table per cache (`table`): one row per cached response, embedding stored as float32 bytes.
+    - ttl_seconds: entries older than this are ignored by lookups and pruned on store (None: no expiry).
+    - SQLite work runs in a worker thread; store_in_background() keeps the embedding call and the
+      insert off the caller's path entirely (drain() waits for those writes).
+    """
+
+    TABLE = "semantic_cache"
+    VALUE_COLUMN = "response"
+
+    def __init__(
+        self,
+        db_path: str,
+        embed: EmbedFn,
+        max_distance: float = 0.08,
+        max_entries_per_key: int = 50,
+        pool: Optional[SQLitePool] = None,
+        table: Optional[str] = None,
+        ttl_seconds: Optional[int] = None,
+    ):
+        table = table or self.TABLE
+        if not table.isidentifier():
+            raise ValueError(f"Invalid cache table name: {table!r}")
+        self.db_path = db_path
+        self.pool = pool
+        self.embed = embed
+        self.max_distance = max_distance
+        self.max_entries_per_key = max_entries_per_key
+        self.table = table
+        self.ttl_seconds = ttl_seconds
+        self._last_embedding: Optional[tuple] = None  # (text, unit vector): a miss is followed by store()
+        self._pending: Set[asyncio.Task] = set()
+        self._init_schema()
+
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        if self.pool is not None:
+            return self.pool.connection()
+        return connect(self.db_path)
+
+    def _init_schema(self) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"""
+CREATE TABLE IF NOT EXISTS {self.table} (
+  id          INTEGER PRIMARY KEY AUTOINCREMENT,
+  cache_key   TEXT NOT NULL,
+  raw_input   TEXT NOT NULL,
+  embedding   BLOB NOT NULL,
+  {self.VALUE_COLUMN:<11} TEXT NOT NULL,
+  created_at  TEXT NOT NULL DEFAULT (datetime('now'))
+);
+                """
+            )
+            conn.execute(f"CREATE INDEX IF NOT EXISTS idx_{self.table}_key ON {self.table}(cache_key);")
+            conn.commit()
+
+    def _cutoff(self) -> str:
+        """datetime('now', ?) modifier for the oldest entry still within ttl_seconds."""
+        return f"-{int(self.ttl_seconds)} seconds"
+
+    @staticmethod
+    def _scoped_key(cache_key: str, raw_input: str) -> str:
+        """cache_key narrowed to requests with the same numbers/negations (unchanged if there are none)."""
+        tokens = sorted({
+            "not" if t.lower().endswith("n't") else t.lower()
+            for t in _CRITICAL_TOKENS.findall(raw_input)
+        })
+        return f"{cache_key}|{' '.join(tokens)}" if tokens else cache_key
+
+    async def lookup(self, cache_key: str, raw_input: str) -> Optional[str]:
+        cache_key = self._scoped_key(cache_key, raw_input)
+        rows = await asyncio.to_thread(self._select, cache_key)
+        if not rows:
+            return None
+
+        query = await self._embed_unit(raw_input)
+        stored = np.stack([np.frombuffer(r["embedding"], dtype=np.float32) for r in rows])
+        distances = 1.0 - stored @ query  # rows are stored normalized
+        best = int(np.argmin(distances))
+        if distances[best] > self.max_distance:
+            return None
+        return rows[best]["value"]
+
+    async def store(self, cache_key: str, raw_input: str, value: str) -> None:
+        cache_key = self._scoped_key(cache_key, raw_input)
+        embedding = await self._embed_unit(raw_input)
+        await asyncio.to_thread(self._insert, cache_key, raw_input, embedding, value)
+
+    def store_in_background(self, cache_key: str, raw_input: str, value: str) -> asyncio.Task:
+        """Schedule store() on the running loop; the task is kept until done (see drain())."""
+        task = asyncio.create_task(self.store(cache_key, raw_input, value))
+        self._pending.add(task)
+        task.add_done_callback(self._pending.discard)
+        return task
+
+    async def drain(self) -> None:
+        """Wait for stores scheduled by store_in_background() (their errors are not raised here)."""
+        if self._pending:
+            await asyncio.gather(*list(self._pending), return_exceptions=True)
+
+    def _select(self, cache_key: str) -> List[sqlite3.Row]:
+        sql = f"SELECT embedding, {self.VALUE_COLUMN} AS value FROM {self.table} WHERE cache_key = ?"
+        params: tuple = (cache_key,)
+        if self.ttl_seconds is not None:
+            sql += " AND created_at >= datetime('now', ?)"
+            params += (self._cutoff(),)
+        with self._connect() as conn:
+            return conn.execute(sql, params).fetchall()
+
+    def _insert(self, cache_key: str, raw_input: str, embedding: np.ndarray, value: str) -> None:
+        with self._connect() as conn:
+            conn.execute(
+                f"INSERT INTO {self.table}(cache_key, raw_input, embedding, {self.VALUE_COLUMN}) VALUES(?, ?, ?, ?);",
+                (cache_key, raw_input, embedding.tobytes(), value),
+            )
+            if self.ttl_seconds is not None:
+                conn.execute(
+                    f"DELETE FROM {self.table} WHERE cache_key = ? AND created_at < datetime('now', ?);",
+                    (cache_key, self._cutoff()),
+                )
+            # Keep only the newest entries per key
+            conn.execute(
+                f"""
+                DELETE FROM {self.table}
+                WHERE cache_key = ? AND id NOT IN (
+                    SELECT id FROM {self.table} WHERE cache_key = ? ORDER BY id DESC LIMIT ?
+                );
+                """,
+                (cache_key, cache_key, self.max_entries_per_key),
+            )
+            conn.commit()
+
+    async def _embed_unit(self, text: str) -> np.ndarray:
+        last = self._last_embedding
+        if last is not None and last[0] == text:
+            return last[1]
+        vec = _unit(await self.embed(text))
+        self._last_embedding = (text, vec)
+        return vec
+
+
+def _unit(vec: Sequence[float] | List[float]) -> np.ndarray:
+    arr = np.asarray(vec, dtype=np.float32)
+    norm = float(np.linalg.norm(arr))
+    return arr / norm if norm else arr
@@ -2,7 +2,9 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from typing import Any, Dict, Optional
+from typing import Any, ContextManager, Dict, Optional
+
+from src.utils.sqlite_pool import SQLitePool
 
 
 class SQLiteProfileStore:
@@ -11,11 +13,14 @@ class SQLiteProfileStore:
     - user_profiles: one row per user_id, JSON blob for profile fields.
     """
 
-    def __init__(self, db_path: str):
+    def __init__(self, db_path: str, pool: Optional[SQLitePool] = None):
         self.db_path = db_path
+        self.pool = pool  # shared connections (EmailWorkflow); otherwise one connection per call
         self._init_schema()
 
-    def _connect(self) -> sqlite3.Connection:
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        if self.pool is not None:
+            return self.pool.connection()
         conn = sqlite3.connect(self.db_path)
         conn.row_factory = sqlite3.Row
         return conn
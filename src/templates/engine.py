@@ -1,6 +1,106 @@
 from __future__ import annotations
 
-from typing import Any, Dict, Optional
+import re
+import time
+from collections.abc import Mapping
+from functools import lru_cache
+from typing import Any, Callable, Dict, Iterator, Optional, Tuple
+
+from src.templates.memory_template_store import InMemoryTemplateStore
+
+
+_PLACEHOLDER_RE = re.compile(r"\{\{(\w+)\}\}")
+
+
+# Store lookups remembered per engine, keyed by (intent, tone_label): the stores select on those only
+TEMPLATE_CACHE_SIZE = 256
+# Cached lookups are refreshed after this, so templates re-seeded under a running app show up
+TEMPLATE_CACHE_TTL_SECONDS = 300
+
+
+@lru_cache(maxsize=128)
+def _compile_body(body: str) -> Tuple[Tuple[str, ...], Tuple[str, ...]]:
+    """
+    Split a template body into (literals, keys) once per distinct body.
+    literals always has exactly one more element than keys.
+    """
+    parts = _PLACEHOLDER_RE.split(body)
+    return tuple(parts[0::2]), tuple(parts[1::2])
+
+
+class TemplatePlan(Mapping):
+    """
+    Result of EmailTemplateEngine.build_plan.
+    Read-only, dict-compatible (plan["key"], plan.get(...), dict(plan)); rendered_skeleton
+    is only rendered on first access so callers that just need placeholders skip the render.
+    (Lazy attribute is hand-rolled: functools.cached_property needs a __dict__, which __slots__ removes.)
+    """
+
+    __slots__ = (
+        "template_id",
+        "tone_label",
+        "length_hint",
+        "length_budget",
+        "format",
+        "placeholders",
+        "template_body",
+        "_renderer",
+        "_rendered_skeleton",
+    )
+
+    _KEYS = (
+        "template_id",
+        "tone_label",
+        "length_hint",
+        "length_budget",
+        "format",
+        "placeholders",
+        "template_body",
+        "rendered_skeleton",
+    )
+
+    def __init__(
+        self,
+        *,
+        template_id: Optional[str],
+        tone_label: str,
+        length_hint: str,
+        length_budget: Dict[str, int],
+        format: Dict[str, Any],
+        placeholders: Dict[str, str],
+        template_body: str,
+        renderer: Callable[[str, Dict[str, str]], str],
+    ):
+        self.template_id = template_id
+        self.tone_label = tone_label
+        self.length_hint = length_hint
+        self.length_budget = length_budget
+        self.format = format
+        self.placeholders = placeholders
+        self.template_body = template_body
+        self._renderer = renderer
+        self._rendered_skeleton: Optional[str] = None
+
+    @property
+    def rendered_skeleton(self) -> str:
+        if self._rendered_skeleton is None:
+            self._rendered_skeleton = self._renderer(self.template_body, self.placeholders)
+        return self._rendered_skeleton
+
+    def __getitem__(self, key: str) -> Any:
+        if key not in self._KEYS:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._KEYS)
+
+    def __len__(self) -> int:
+        return len(self._KEYS)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict (renders the skeleton); use this when the plan goes into graph state."""
+        return dict(self)
 
 
 class EmailTemplateEngine:
@@ -9,8 +109,30 @@ class EmailTemplateEngine:
     Produces a template_plan that DraftWriter must follow.
     """
 
-    def __init__(self, template_store):
-        self.store = template_store
+    def __init__(self, template_store=None, cache_ttl_seconds: float = TEMPLATE_CACHE_TTL_SECONDS):
+        # No store passed -> serve the bundled fixtures from memory.
+        self.store = template_store if template_store is not None else InMemoryTemplateStore()
+        # (intent, tone_label) -> (expires_at, template). Changes to the store show up within
+        # cache_ttl_seconds; clear_template_cache() applies them right away.
+        self.cache_ttl_seconds = cache_ttl_seconds
+        self._templates: Dict[Tuple[str, str], Tuple[float, Optional[Dict[str, Any]]]] = {}
+
+    def clear_template_cache(self) -> None:
+        self._templates.clear()
+
+    def _best_template(self, intent: str, tone_label: str, constraints: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        key = (intent, tone_label)
+        now = time.monotonic()
+        entry = self._templates.get(key)
+        if entry is not None and now < entry[0]:
+            return entry[1]
+        tpl = self.store.get_best_template(intent=intent, tone_label=tone_label, constraints=constraints)
+        if entry is not None:
+            del self._templates[key]  # re-inserted below as the newest entry
+        elif len(self._templates) >= TEMPLATE_CACHE_SIZE:
+            del self._templates[next(iter(self._templates))]  # oldest first
+        self._templates[key] = (now + self.cache_ttl_seconds, tpl)
+        return tpl
 
     def build_plan(
         self,
@@ -19,7 +141,7 @@ class EmailTemplateEngine:
         tone_params: Dict[str, Any],
         constraints: Dict[str, Any],
         parsed_input: Dict[str, Any],
-    ) -> Dict[str, Any]:
+    ) -> TemplatePlan:
         tone_label = (tone_params.get("tone_label") or "neutral").strip() or "neutral"
 
         # ---- length policy (v1) ----
@@ -42,32 +164,29 @@ class EmailTemplateEngine:
         # ---- template selection ----
         tpl = None
         if self.store is not None:
-            tpl = self.store.get_best_template(intent=intent, tone_label=tone_label, constraints=constraints)
+            tpl = self._best_template(intent, tone_label, constraints)
 
         body = (tpl or {}).get("body") or self._default_body()
 
         # ---- placeholder defaults (v1) ----
+        # Only run the suggesters whose keys the selected body actually references.
+        _, keys = _compile_body(body)
         placeholders = {
-            "subject": self._suggest_subject(intent, parsed_input),
-            "greeting": self._suggest_greeting(tone_label, parsed_input),
-            "context": self._suggest_context(parsed_input),
-            "ask": self._suggest_ask(intent, parsed_input),
-            "closing": self._suggest_closing(tone_label),
-            "signature": self._suggest_signature(),
+            k: self._SUGGESTERS[k](self, intent, tone_label, parsed_input)
+            for k in dict.fromkeys(keys)
+            if k in self._SUGGESTERS
         }
 
-        rendered_skeleton = self._render(body, placeholders)
-
-        return {
-            "template_id": (tpl or {}).get("template_id"),
-            "tone_label": tone_label,
-            "length_hint": length_hint,
-            "length_budget": length_budget,
-            "format": fmt,
-            "placeholders": placeholders,
-            "template_body": body,
-            "rendered_skeleton": rendered_skeleton,
-        }
+        return TemplatePlan(
+            template_id=(tpl or {}).get("template_id"),
+            tone_label=tone_label,
+            length_hint=length_hint,
+            length_budget=length_budget,
+            format=fmt,
+            placeholders=placeholders,
+            template_body=body,
+            renderer=self._render,
+        )
 
     def _length_budget(self, length_hint: str) -> Dict[str, int]:
         # v1: conservative budgets
@@ -90,12 +209,16 @@ class EmailTemplateEngine:
         )
 
     def _render(self, template: str, values: Dict[str, str]) -> str:
-        out = template
-        for k, v in values.items():
-            out = out.replace("{{" + k + "}}", v or "")
-        return out
+        literals, keys = _compile_body(template)
+        out = [literals[0]]
+        for k, lit in zip(keys, literals[1:]):
+            # unknown placeholders are left untouched
+            out.append((values[k] or "") if k in values else "{{" + k + "}}")
+            out.append(lit)
+        return "".join(out)
 
-    def _suggest_subject(self, intent: str, parsed_input: Dict[str, Any]) -> str:
+    # Suggesters share one signature so build_plan can dispatch via _SUGGESTERS.
+    def _suggest_subject(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         primary = (parsed_input.get("primary_request") or "").strip()
         if primary:
             return primary[:70]
@@ -107,17 +230,17 @@ class EmailTemplateEngine:
             "info": "Update",
         }.get(intent, "Message")
 
-    def _suggest_greeting(self, tone_label: str, parsed_input: Dict[str, Any]) -> str:
+    def _suggest_greeting(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         rec = (parsed_input.get("recipient") or {})
         name = (rec.get("name") or "").strip()
         if name:
             return f"Hi {name},"
         return "Hello," if tone_label == "formal" else "Hi,"
 
-    def _suggest_context(self, parsed_input: Dict[str, Any]) -> str:
+    def _suggest_context(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         return (parsed_input.get("context") or "I’m reaching out regarding the following.").strip()
 
-    def _suggest_ask(self, intent: str, parsed_input: Dict[str, Any]) -> str:
+    def _suggest_ask(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         ask = (parsed_input.get("ask") or "").strip()
         if ask:
             return ask
@@ -131,7 +254,7 @@ class EmailTemplateEngine:
             return "Would you be open to a brief chat?"
         return "Please let me know your thoughts."
 
-    def _suggest_closing(self, tone_label: str) -> str:
+    def _suggest_closing(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         if tone_label == "formal":
             return "Thank you for your time."
         if tone_label == "friendly":
@@ -142,6 +265,15 @@ class EmailTemplateEngine:
             return "Thanks in advance for your help."
         return "Thanks,"
 
-    def _suggest_signature(self) -> str:
+    def _suggest_signature(self, intent: str, tone_label: str, parsed_input: Dict[str, Any]) -> str:
         # Personalizer will replace this later.
         return "[Your Name]"
+
+    _SUGGESTERS = {
+        "subject": _suggest_subject,
+        "greeting": _suggest_greeting,
+        "context": _suggest_context,
+        "ask": _suggest_ask,
+        "closing": _suggest_closing,
+        "signature": _suggest_signature,
+    }
@@ -75,3 +75,6 @@ TEMPLATES = [
         "meta": {"version": 1},
     },
 ]
+
+# (intent, tone_label) -> template, for O(1) lookups by in-memory stores.
+TEMPLATES_BY_KEY = {(t["intent"], t["tone_label"]): t for t in TEMPLATES}
@@ -0,0 +1,54 @@
+from __future__ import annotations
+
+from typing import Any, Dict, Optional, Tuple
+
+from src.templates.fixtures.templates import TEMPLATES_BY_KEY
+
+
+class InMemoryTemplateStore:
+    """
+    Dict-backed template store (no SQLite, no JSON decoding).
+    Mirrors SQLiteTemplateStore.get_best_template so the two are interchangeable.
+    """
+
+    def __init__(self, templates_by_key: Optional[Dict[Tuple[str, str], Dict[str, Any]]] = None):
+        self.templates_by_key = TEMPLATES_BY_KEY if templates_by_key is None else templates_by_key
+
+    def upsert_template(self, tpl: Dict[str, Any]) -> None:
+        if self.templates_by_key is TEMPLATES_BY_KEY:
+            # never mutate the shared fixture index
+            self.templates_by_key = dict(TEMPLATES_BY_KEY)
+        self.templates_by_key[(tpl["intent"], tpl["tone_label"])] = tpl
+
+    def get_best_template(
+        self,
+        *,
+        intent: str,
+        tone_label: str,
+        constraints: Dict[str, Any],
+    ) -> Optional[Dict[str, Any]]:
+        """
+        Same selection strategy as SQLiteTemplateStore (v1):
+          1) exact match intent + tone_label
+          2) exact match intent + 'neutral'
+          3) fallback to 'other' + tone_label
+          4) fallback to 'other' + 'neutral'
+        """
+        by_key = self.templates_by_key
+        tpl = (
+            by_key.get((intent, tone_label))
+            or by_key.get((intent, "neutral"))
+            or by_key.get(("other", tone_label))
+            or by_key.get(("other", "neutral"))
+        )
+        if tpl is None:
+            return None
+
+        return {
+            "template_id": tpl["template_id"],
+            "intent": tpl["intent"],
+            "tone_label": tpl["tone_label"],
+            "name": tpl["name"],
+            "body": tpl["body"],
+            "meta": dict(tpl.get("meta") or {}),
+        }
@@ -2,18 +2,32 @@ from __future__ import annotations
 
 import json
 import sqlite3
-from typing import Any, Dict, Optional
+from typing import Any, ContextManager, Dict, Optional
+
+from src.utils.sqlite_pool import SQLitePool, connect
 
 
 class SQLiteTemplateStore:
-    def __init__(self, db_path: str):
+    # The whole fallback cascade in one statement: candidates are ranked, the best existing one wins.
+    # A constant string, so each connection's statement cache compiles it once.
+    _SELECT_BEST = """
+        WITH candidates(rank, intent, tone_label) AS (VALUES (0, ?, ?), (1, ?, ?), (2, ?, ?), (3, ?, ?))
+        SELECT t.template_id, t.intent, t.tone_label, t.name, t.body, t.meta_json
+        FROM candidates c
+        JOIN email_templates t ON t.intent = c.intent AND t.tone_label = c.tone_label
+        ORDER BY c.rank
+        LIMIT 1;
+    """
+
+    def __init__(self, db_path: str, pool: Optional[SQLitePool] = None):
         self.db_path = db_path
+        self.pool = pool  # shared connections (EmailWorkflow); otherwise one connection per call
         self._init_schema()
 
-    def _connect(self) -> sqlite3.Connection:
-        conn = sqlite3.connect(self.db_path)
-        conn.row_factory = sqlite3.Row
-        return conn
+    def _connect(self) -> ContextManager[sqlite3.Connection]:
+        if self.pool is not None:
+            return self.pool.connection()
+        return connect(self.db_path)
 
     def _init_schema(self) -> None:
         with self._connect() as conn:
@@ -76,37 +90,29 @@ class SQLiteTemplateStore:
           3) fallback to 'other' + tone_label
           4) fallback to 'other' + 'neutral'
         """
-        candidates = [
-            (intent, tone_label),
-            (intent, "neutral"),
-            ("other", tone_label),
-            ("other", "neutral"),
-        ]
+        params = (
+            intent, tone_label,
+            intent, "neutral",
+            "other", tone_label,
+            "other", "neutral",
+        )
 
         with self._connect() as conn:
-            for i, t in candidates:
-                row = conn.execute(
-                    """
-                    SELECT template_id, intent, tone_label, name, body, meta_json
-                    FROM email_templates
-                    WHERE intent = ? AND tone_label = ?
-                    LIMIT 1;
-                    """,
-                    (i, t),
-                ).fetchone()
-                if row:
-                    meta = {}
-                    try:
-                        meta = json.loads(row["meta_json"] or "{}")
-                    except Exception:
-                        meta = {}
-                    return {
-                        "template_id": row["template_id"],
-                        "intent": row["intent"],
-                        "tone_label": row["tone_label"],
-                        "name": row["name"],
-                        "body": row["body"],
-                        "meta": meta,
-                    }
+            row = conn.execute(self._SELECT_BEST, params).fetchone()
+
+        if not row:
+            return None
 
-        return None
+        meta = {}
+        try:
+            meta = json.loads(row["meta_json"] or "{}")
+        except Exception:
+            meta = {}
+        return {
+            "template_id": row["template_id"],
+            "intent": row["intent"],
+            "tone_label": row["tone_label"],
+            "name": row["name"],
+            "body": row["body"],
+            "meta": meta,
+        }
@@ -0,0 +1 @@
+# src/ui/__init__.py
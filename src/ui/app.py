@@ -1,66 +1,32 @@
-import asyncio
 import json
-import logging
 import sqlite3
 import os
+import queue
+import re
+import uuid
 import streamlit as st
-from io import BytesIO
-from reportlab.lib.pagesizes import letter
-from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
-from reportlab.platypus import SimpleDocTemplate, Paragraph, Spacer
-from reportlab.lib.units import inch
-from src.workflow.workflow import EmailWorkflow
+from src.ui.pdf import generate_pdf
+from src.ui.styles import PAGE_CSS, PAGE_CSS_DEBUG
+from src.utils.async_runtime import AsyncRuntime
 from src.utils.logging import setup_logging
 
+try:
+    from orjson import loads as _json_loads
+except ImportError:
+    from json import loads as _json_loads
+
 logger = setup_logging()
 
 # Check for debug mode via query parameter
 debug_mode = st.query_params.get("debug", "0") == "1"
 
-# Hide header IMMEDIATELY before anything else renders (if not in debug mode)
-if not debug_mode:
-    st.markdown("""
-    <style>
-        /* Hide Streamlit header and menu */
-        header {display: none !important;}
-        #MainMenu {display: none !important;}
-        footer {display: none !important;}
-        .stDeployButton {display: none !important;}
-        div[data-testid="stToolbar"] {display: none !important;}
-        div[data-testid="stDecoration"] {display: none !important;}
-        div[data-testid="stStatusWidget"] {display: none !important;}
-        div[data-testid="stSidebarHeader"] {display: none !important;}
-        section[data-testid="stSidebar"] > div:first-child {padding-top: 2rem;}
-        .main .block-container {padding-top: 1rem !important;}
-        
-        /* Target the header more specifically */
-        header[data-testid="stHeader"] {
-            display: none !important;
-            height: 0 !important;
-            visibility: hidden !important;
-        }
-        
-        /* Remove any top spacing from the app */
-        .stApp > header {
-            display: none !important;
-        }
-        .appview-container {
-            padding-top: 0 !important;
-        }
-        .block-container {
-            padding-top: 1rem !important;
-        }
-    </style>
-    """, unsafe_allow_html=True)
+# Page CSS as a single minified injection, IMMEDIATELY before anything else renders.
+# Debug mode keeps the Streamlit header (theme only).
+st.markdown(PAGE_CSS_DEBUG if debug_mode else PAGE_CSS, unsafe_allow_html=True)
 
-# Silence noisy libraries
-logging.getLogger("httpcore").setLevel(logging.WARNING)
-logging.getLogger("httpx").setLevel(logging.WARNING)
-logging.getLogger("openai").setLevel(logging.WARNING)
-logging.getLogger("langchain").setLevel(logging.INFO)
-logging.getLogger("langgraph").setLevel(logging.INFO)
-logging.getLogger("LiteLLM").setLevel(logging.INFO)
-logging.getLogger("LiteLLM Router").setLevel(logging.INFO)
+# One conversation thread per browser session (the workflow itself is shared by all sessions)
+if "session_id" not in st.session_state:
+    st.session_state["session_id"] = uuid.uuid4().hex
 
 # Avoid repeating this on every Streamlit rerun
 if "logger_announced" not in st.session_state:
@@ -71,85 +37,249 @@ if "logger_announced" not in st.session_state:
 # ----------------------------
 # Database helper functions
 # ----------------------------
+_DB_PATH = os.path.normpath(os.path.join(os.path.dirname(__file__), "..", "..", "data", "email_assist.db"))
+
+
 def get_db_path():
     """Get the path to the SQLite database."""
-    return os.path.join(os.path.dirname(__file__), "..", "..", "data", "email_assist.db")
+    return _DB_PATH
+
+
+@st.cache_resource(show_spinner=False)
+def get_db_conn():
+    """One shared read connection for the UI (autocommit; usable from any script thread)."""
+    conn = sqlite3.connect(get_db_path(), check_same_thread=False, isolation_level=None)
+    conn.row_factory = sqlite3.Row
+    return conn
 
 
+@st.cache_data(ttl=60, show_spinner=False)
 def load_user_profiles():
-    """Load user profiles from the database."""
+    """Load user profiles from the database (cached; cleared by the sidebar refresh button)."""
     db_path = get_db_path()
     profiles = {}
     
     if not os.path.exists(db_path):
-        logger.warning(f"Database not found at {db_path}")
+        logger.warning("Database not found at %s", db_path)
         return profiles
     
     try:
-        conn = sqlite3.connect(db_path)
-        cursor = conn.cursor()
-        cursor.execute("SELECT user_id, profile_json FROM user_profiles ORDER BY user_id;")
-        rows = cursor.fetchall()
-        conn.close()
-        
+        conn = get_db_conn()
+        rows = conn.execute("SELECT user_id, profile_json FROM user_profiles ORDER BY user_id;").fetchall()
+
         for user_id, profile_json in rows:
             try:
-                profile = json.loads(profile_json)
+                profile = _json_loads(profile_json)
                 profiles[user_id] = profile
-            except json.JSONDecodeError:
-                logger.warning(f"Invalid JSON for user_id {user_id}")
+            except ValueError:  # json/orjson JSONDecodeError
+                logger.warning("Invalid JSON for user_id %s", user_id)
                 continue
     except sqlite3.Error as e:
-        logger.error(f"Database error: {e}")
+        logger.error("Database error: %s", e)
     
     return profiles
 
 
+@st.cache_data(show_spinner=False)
+def build_user_options(user_profiles):
+    """Display name -> user_id, with (default) as first choice. Keyed on the (hashed) profiles dict."""
+    return {
+        "(default)": "default",
+        **{profile.get("name", f"User {user_id}"): user_id for user_id, profile in user_profiles.items()},
+    }
+
+
 # ----------------------------
-# PDF Generation
+# Sidebar profile card
 # ----------------------------
-def generate_pdf(text):
-    """Generate a PDF from the email draft text."""
-    buffer = BytesIO()
-    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=1*inch, bottomMargin=1*inch)
-    styles = getSampleStyleSheet()
-    
-    # Custom style for email content
-    email_style = ParagraphStyle(
-        'EmailStyle',
-        parent=styles['Normal'],
-        fontSize=11,
-        leading=16,
-        spaceAfter=12,
-    )
-    
-    story = []
-    
-    # Split text into paragraphs and add to document
-    paragraphs = text.split('\n')
-    for para in paragraphs:
-        if para.strip():
-            # Escape special characters for ReportLab
-            safe_para = para.replace('&', '&amp;').replace('<', '&lt;').replace('>', '&gt;')
-            story.append(Paragraph(safe_para, email_style))
-        else:
-            story.append(Spacer(1, 12))
-    
-    doc.build(story)
-    buffer.seek(0)
-    return buffer
+_HTML_ESCAPES = str.maketrans({"&": "&amp;", "<": "&lt;", ">": "&gt;", '"': "&quot;", "'": "&#x27;"})
+
+
+@st.cache_data(show_spinner=False)
+def render_profile_card(profile_tuple):
+    """HTML for the selected profile; keyed on (name, title, org, email). Animation CSS is global."""
+    name, title, org, email = (str(v).translate(_HTML_ESCAPES) if v else v for v in profile_tuple)
+    email_line = f"<br><strong>Email:</strong> {email}" if email else ""
+    return f"""
+    <div class="profile-details profile-details-animated">
+        <strong>Name:</strong> {name or 'N/A'}<br>
+        <strong>Title:</strong> {title or 'N/A'}<br>
+        <strong>Organization:</strong> {org or 'N/A'}
+        {email_line}
+    </div>
+    """
 
 
 # ----------------------------
-# Async runner (Streamlit-safe for Python 3.11)
+# Workflow (one instance per process, shared by all sessions; each session has its own thread)
 # ----------------------------
-def run_async(coro):
-    try:
-        loop = asyncio.get_running_loop()
-    except RuntimeError:
-        loop = asyncio.new_event_loop()
-        asyncio.set_event_loop(loop)
-    return loop.run_until_complete(coro)
+@st.cache_resource(show_spinner=False)
+def get_workflow():
+    # Imported here: the workflow pulls in litellm/langchain/langgraph, which would
+    # otherwise hold up the first page render
+    from src.workflow.workflow import EmailWorkflow
+
+    workflow = EmailWorkflow(logger)
+    # Pooled HTTP connections belong to the runtime loop: close them there on shutdown
+    get_runtime().add_shutdown_hook(workflow.aclose)
+    return workflow
+
+
+# ----------------------------
+# PDF export (rebuilt only when the draft text changes)
+# ----------------------------
+@st.cache_data(show_spinner=False, max_entries=8)
+def get_pdf_bytes(text: str) -> bytes:
+    with generate_pdf(text) as pdf_file:
+        return pdf_file.read()
+
+
+# ----------------------------
+# Copy-to-clipboard button
+# ----------------------------
+try:
+    from xxhash import xxh64_intdigest as _content_hash
+except ImportError:
+    _content_hash = hash
+
+
+# Cmd/Ctrl+Enter shortcut, shipped inside the copy-button component so the page needs one
+# iframe for both. Every reload swaps out the listener a previous iframe installed instead of stacking.
+_SHORTCUT_SCRIPT = """
+    <script>
+    const streamlitDoc = window.parent.document;
+    if (streamlitDoc.__emailAssistShortcut) {
+        streamlitDoc.removeEventListener('keydown', streamlitDoc.__emailAssistShortcut);
+    }
+    streamlitDoc.__emailAssistShortcut = function(e) {
+        // Inside the form Streamlit already submits on Cmd/Ctrl+Enter
+        if (e.target.closest && e.target.closest('[data-testid="stForm"]')) return;
+        const isMac = navigator.platform.toUpperCase().indexOf('MAC') >= 0;
+        const metaOrCtrl = isMac ? e.metaKey : e.ctrlKey;
+        if (metaOrCtrl && e.key === 'Enter') {
+            const btns = Array.from(streamlitDoc.querySelectorAll('button'));
+            const target = btns.find(b => (b.innerText || '').includes('Generate Email'));
+            if (target) target.click();
+        }
+    };
+    streamlitDoc.addEventListener('keydown', streamlitDoc.__emailAssistShortcut);
+    </script>
+"""
+
+_COPY_BUTTON_DISABLED_HTML = """
+    <style>
+        html, body {
+            margin: 0 !important;
+            padding: 0 !important;
+            overflow: hidden;
+        }
+    </style>
+    <button style="
+        width: 100%;
+        padding: 0.5rem 1rem;
+        border-radius: 8px;
+        border: 1px solid rgba(49, 57, 66, 0.2);
+        background: white;
+        color: rgb(49, 51, 63);
+        font-weight: 400;
+        font-size: 0.875rem;
+        font-family: 'Source Sans Pro', sans-serif;
+        line-height: 1.6;
+        height: 38px;
+        opacity: 0.5;
+        cursor: not-allowed;
+        box-sizing: border-box;
+        margin: 0;
+    " disabled>
+        📋 Copy
+    </button>
+    """ + _SHORTCUT_SCRIPT
+
+
+def build_copy_button_html(draft_content: str) -> str:
+    """Clipboard button (components.html) carrying the draft as a JS string literal, plus the shortcut."""
+    # One C-level pass to a valid JS string literal; "</" is split so the draft can't close the <script>
+    js_literal = json.dumps(draft_content).replace("</", "<\\/")
+
+    return f"""
+    <style>
+        html, body {{
+            margin: 0 !important;
+            padding: 0 !important;
+            overflow: hidden;
+        }}
+    </style>
+    <button id="copyBtn" style="
+        width: 100%;
+        padding: 0.5rem 1rem;
+        border-radius: 8px;
+        border: 1px solid rgba(49, 57, 66, 0.2);
+        background: white;
+        color: rgb(49, 51, 63);
+        cursor: pointer;
+        font-weight: 400;
+        font-size: 0.875rem;
+        font-family: 'Source Sans Pro', sans-serif;
+        line-height: 1.6;
+        height: 38px;
+        transition: all 0.2s ease;
+        box-sizing: border-box;
+        margin: 0;
+    "
+    onmouseover="this.style.borderColor='#8B4557'; this.style.color='#8B4557';"
+    onmouseout="if(this.innerText !== '✓ Copied!') {{ this.style.borderColor='rgba(49, 57, 66, 0.2)'; this.style.color='rgb(49, 51, 63)'; }}">
+        📋 Copy
+    </button>
+    <script>
+        const content = {js_literal};
+        document.getElementById('copyBtn').addEventListener('click', function() {{
+            navigator.clipboard.writeText(content).then(() => {{
+                this.innerText = '✓ Copied!';
+                this.style.background = '#C6F6D5';
+                this.style.borderColor = '#22543D';
+                this.style.color = '#22543D';
+                setTimeout(() => {{
+                    this.innerText = '📋 Copy';
+                    this.style.background = 'white';
+                    this.style.borderColor = 'rgba(49, 57, 66, 0.2)';
+                    this.style.color = 'rgb(49, 51, 63)';
+                }}, 1500);
+            }});
+        }});
+    </script>
+    {_SHORTCUT_SCRIPT}"""
+
+
+# ----------------------------
+# Async runner (one background event loop for the whole process)
+# ----------------------------
+@st.cache_resource(show_spinner=False)
+def get_runtime():
+    return AsyncRuntime.get()
+
+
+_STREAM_DONE = object()
+
+
+def iter_async(agen):
+    """
+    Iterate an async generator from the script thread. The generator runs on the
+    background loop and hands items over through a queue, so Streamlit calls stay
+    on the script thread; errors from the generator are re-raised here.
+    """
+    items = queue.Queue()
+
+    async def pump():
+        try:
+            async for item in agen:
+                items.put(item)
+        finally:
+            items.put(_STREAM_DONE)
+
+    future = get_runtime().submit(pump())
+    while (item := items.get()) is not _STREAM_DONE:
+        yield item
+    future.result()
 
 
 # ----------------------------
@@ -161,209 +291,15 @@ st.set_page_config(
     layout="wide"
 )
 
-# Custom CSS for polished look (header hiding is handled above)
-st.markdown("""
-<style>
-    /* Main container styling */
-    .main .block-container {
-        padding-bottom: 2rem;
-        max-width: 1200px;
-    }
-    
-    /* Header styling */
-    h1 {
-        color: #5D2E3D;
-        font-weight: 700;
-        margin-bottom: 0.5rem;
-    }
-    
-    h2, h3 {
-        color: #6B3A4A;
-        font-weight: 600;
-    }
-    
-    /* Sidebar styling - maroon theme */
-    [data-testid="stSidebar"] {
-        background: linear-gradient(180deg, #FAF5F7 0%, #F0E4E8 100%);
-    }
-    
-    [data-testid="stSidebar"] .stSelectbox label,
-    [data-testid="stSidebar"] .stTextArea label {
-        font-weight: 600;
-        color: #5D2E3D;
-    }
-    
-    /* Button styling - maroon theme with WHITE text */
-    .stButton > button[kind="primary"] {
-        background: linear-gradient(90deg, #8B4557 0%, #6B3A4A 100%);
-        border: none;
-        border-radius: 8px;
-        padding: 0.75rem 2rem;
-        font-weight: 600;
-        transition: all 0.3s ease;
-        color: white !important;
-    }
-    
-    .stButton > button[kind="primary"]:hover {
-        background: linear-gradient(90deg, #6B3A4A 0%, #5D2E3D 100%);
-        box-shadow: 0 4px 12px rgba(107, 58, 74, 0.4);
-        color: white !important;
-    }
-    
-    .stButton > button[kind="primary"] p {
-        color: white !important;
-    }
-    
-    /* Text area styling - maroon theme */
-    .stTextArea textarea {
-        border-radius: 8px;
-        border: 2px solid #E8D8DD;
-        background-color: #FDF9FA;
-        transition: border-color 0.3s ease;
-    }
-    
-    .stTextArea textarea:focus {
-        border-color: #8B4557;
-        box-shadow: 0 0 0 3px rgba(139, 69, 87, 0.1);
-    }
-    
-    /* Card-like containers */
-    .output-card {
-        background: #FFFFFF;
-        border-radius: 12px;
-        padding: 1.5rem;
-        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
-        border: 1px solid #E8D8DD;
-    }
-    
-    /* Preview section - maroon theme */
-    .preview-content {
-        background: #FDF9FA;
-        border-radius: 8px;
-        padding: 1.5rem;
-        border-left: 4px solid #8B4557;
-        min-height: 340px;
-        font-family: 'Georgia', serif;
-        line-height: 1.6;
-        color: #4A3540;
-    }
-    
-    .preview-placeholder {
-        color: #A08890;
-        font-style: italic;
-        text-align: center;
-        padding: 2rem;
-    }
-    
-    /* Status badges */
-    .status-badge {
-        display: inline-block;
-        padding: 0.25rem 0.75rem;
-        border-radius: 20px;
-        font-size: 0.85rem;
-        font-weight: 600;
-    }
-    
-    .status-success {
-        background: #C6F6D5;
-        color: #22543D;
-    }
-    
-    .status-warning {
-        background: #FEEBC8;
-        color: #744210;
-    }
-    
-    .status-error {
-        background: #FED7D7;
-        color: #822727;
-    }
-    
-    /* Divider */
-    hr {
-        margin: 2rem 0;
-        border: none;
-        height: 1px;
-        background: linear-gradient(90deg, transparent, #D4C4C9, transparent);
-    }
-    
-    /* Tips expander */
-    .streamlit-expanderHeader {
-        font-weight: 600;
-        color: #5D2E3D;
-    }
-    
-    /* Download button - maroon theme */
-    .stDownloadButton > button {
-        border-radius: 8px;
-        border: 2px solid #8B4557;
-        color: #8B4557;
-        background: transparent;
-        transition: all 0.3s ease;
-    }
-    
-    .stDownloadButton > button:hover {
-        background: #8B4557;
-        color: white;
-    }
-    
-    /* Error message box */
-    .error-message {
-        background: #FED7D7;
-        border: 1px solid #FC8181;
-        border-radius: 8px;
-        padding: 1rem;
-        color: #822727;
-        margin-top: 0.5rem;
-    }
-    
-    /* Warning message box */
-    .warning-message {
-        background: #FEEBC8;
-        border: 1px solid #F6AD55;
-        border-radius: 8px;
-        padding: 1rem;
-        color: #744210;
-        margin-top: 0.5rem;
-    }
-    
-    /* Subtitle */
-    .subtitle {
-        color: #7A5A65;
-        font-size: 1.1rem;
-        margin-bottom: 2rem;
-    }
-    
-    /* Profile details box - maroon theme */
-    .profile-details {
-        background: #FAF0F3;
-        border-radius: 8px;
-        padding: 0.75rem;
-        margin-top: 0.5rem;
-        font-size: 0.9rem;
-    }
-    
-    /* Preview container styling */
-    [data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlockBorderWrapper"] {
-        background: #FDF9FA;
-        border-left: 4px solid #8B4557 !important;
-        border-radius: 8px;
-        min-height: 340px;
-    }
-</style>
-""", unsafe_allow_html=True)
-
 # Header
 st.title("✉️ EMaiL Assist")
 st.markdown('<p class="subtitle">AI-Powered Professional Email Generator</p>', unsafe_allow_html=True)
 
-# Keep workflow instance stable
-if "workflow" not in st.session_state:
-    st.session_state.workflow = EmailWorkflow(logger)
-
 # Canonical session state
 if "draft_editor" not in st.session_state:
     st.session_state["draft_editor"] = ""
+if "preview_draft" not in st.session_state:
+    st.session_state["preview_draft"] = ""
 if "validation_report" not in st.session_state:
     st.session_state["validation_report"] = None
 if "last_response" not in st.session_state:
@@ -380,13 +316,11 @@ st.sidebar.markdown('<div style="margin-bottom: 1rem;"></div>', unsafe_allow_htm
 
 # User Profile Dropdown
 st.sidebar.markdown("### 👤 User Profile")
+if st.sidebar.button("↻ Refresh users", help="Reload user profiles from the database"):
+    load_user_profiles.clear()
 user_profiles = load_user_profiles()
 
-# Build options with (default) as first choice
-user_options = {"(default)": "default"}
-for user_id, profile in user_profiles.items():
-    display_name = profile.get("name", f"User {user_id}")
-    user_options[display_name] = user_id
+user_options = build_user_options(user_profiles)
 
 selected_user_display = st.sidebar.selectbox(
     "Select User",
@@ -400,32 +334,12 @@ selected_user_id = user_options.get(selected_user_display)
 # Show selected user details only if not default - with expand/contract animation
 if selected_user_display != "(default)" and selected_user_id in user_profiles:
     profile = user_profiles[selected_user_id]
-    st.sidebar.markdown(f"""
-    <style>
-        @keyframes expandIn {{
-            from {{
-                max-height: 0;
-                opacity: 0;
-                padding: 0 0.75rem;
-            }}
-            to {{
-                max-height: 200px;
-                opacity: 1;
-                padding: 0.75rem;
-            }}
-        }}
-        .profile-details-animated {{
-            animation: expandIn 0.3s ease-out forwards;
-            overflow: hidden;
-        }}
-    </style>
-    <div class="profile-details profile-details-animated">
-        <strong>Name:</strong> {profile.get('name', 'N/A')}<br>
-        <strong>Title:</strong> {profile.get('title', 'N/A')}<br>
-        <strong>Organization:</strong> {profile.get('org', 'N/A')}
-        {"<br><strong>Email:</strong> " + profile.get('email') if profile.get('email') else ""}
-    </div>
-    """, unsafe_allow_html=True)
+    st.sidebar.markdown(
+        render_profile_card(
+            (profile.get("name"), profile.get("title"), profile.get("org"), profile.get("email"))
+        ),
+        unsafe_allow_html=True,
+    )
 else:
     # Empty placeholder to ensure profile details are cleared when switching back to default
     st.sidebar.empty()
@@ -466,66 +380,68 @@ intent_override = None if intent == "(auto)" else intent
 # Build metadata from selected user
 metadata = {"user_id": selected_user_id}
 
-user_query = st.text_area(
-    "What email would you like to write?",
-    placeholder="Example: Ask my manager for a meeting next week to discuss project priorities and deadlines...",
-    height=150,
-    key="user_query",
-)
-
-# Settings summary
-settings_parts = []
-settings_parts.append(f"**Tone:** {tone_override or 'auto'}")
-settings_parts.append(f"**Intent:** {intent_override or 'auto'}")
-if selected_user_id and selected_user_id != "default":
-    settings_parts.append(f"**User:** {selected_user_display}")
-
-st.caption(" · ".join(settings_parts))
-
-col1, col2, col3 = st.columns([1, 1, 4])
-with col1:
-    generate_clicked = st.button(
-        "✨ Generate Email",
-        type="primary",
-        disabled=not bool(user_query.strip()),
-        use_container_width=True
+# Query + Generate are one form: typing doesn't rerun the script, only submitting does
+with st.form("email_req", border=False):
+    user_query = st.text_area(
+        "What email would you like to write?",
+        placeholder="Example: Ask my manager for a meeting next week to discuss project priorities and deadlines...",
+        height=150,
+        key="user_query",
     )
 
-# Cmd/Ctrl+Enter shortcut
-st.components.v1.html(
-    """
-    <script>
-    const streamlitDoc = window.parent.document;
-    streamlitDoc.addEventListener('keydown', function(e) {
-        const isMac = navigator.platform.toUpperCase().indexOf('MAC') >= 0;
-        const metaOrCtrl = isMac ? e.metaKey : e.ctrlKey;
-        if (metaOrCtrl && e.key === 'Enter') {
-            const btns = Array.from(streamlitDoc.querySelectorAll('button'));
-            const target = btns.find(b => (b.innerText || '').includes('Generate Email'));
-            if (target) target.click();
-        }
-    });
-    </script>
-    """,
-    height=0,
-)
+    # Settings summary
+    settings_parts = []
+    settings_parts.append(f"**Tone:** {tone_override or 'auto'}")
+    settings_parts.append(f"**Intent:** {intent_override or 'auto'}")
+    if selected_user_id and selected_user_id != "default":
+        settings_parts.append(f"**User:** {selected_user_display}")
+
+    st.caption(" · ".join(settings_parts))
+
+    col1, col2, col3 = st.columns([1, 1, 4])
+    with col1:
+        submitted = st.form_submit_button(
+            "✨ Generate Email",
+            type="primary",
+            use_container_width=True
+        )
+
+# The query is only known on submit, so an empty one is rejected here rather than by disabling the button
+generate_clicked = submitted and bool(user_query.strip())
+if submitted and not generate_clicked:
+    st.warning("Describe the email you'd like to write first.")
 
 
 # ----------------------------
 # Generate via workflow
 # ----------------------------
 if generate_clicked:
+    response = {}
     with st.spinner("🔄 Generating your email..."):
-        response = run_async(
-            st.session_state.workflow.run_query(
+        workflow = get_workflow()
+        # Show the draft as it is written; the editor/preview get the final text below
+        live_draft = st.empty()
+        streamed = ""
+        for kind, payload in iter_async(
+            workflow.run_query_stream(
                 user_input=user_query,
                 tone=tone_override,
                 intent=intent_override,
                 metadata=metadata,
+                session_id=st.session_state["session_id"],
             )
-        )
-
-    logger.info(f"UI received draft length: {len((response.get('draft') or ''))}")
+        ):
+            if kind == "token":
+                streamed += payload
+                live_draft.markdown(streamed)
+            elif kind == "restart":
+                streamed = ""
+                live_draft.empty()
+            elif kind == "result":
+                response = payload
+        live_draft.empty()
+
+    logger.info("UI received draft length: %d", len(response.get("draft") or ""))
 
     st.session_state["last_response"] = response
     st.session_state["validation_report"] = response.get("validation_report")
@@ -540,6 +456,7 @@ if generate_clicked:
     else:
         draft = response.get("draft") or ""
         st.session_state["draft_editor"] = draft
+    st.session_state["preview_draft"] = st.session_state["draft_editor"]
 
     # If input_parser ended early, show guidance
     messages = response.get("messages", [])
@@ -555,227 +472,182 @@ st.divider()
 # ----------------------------
 # Output section
 # ----------------------------
-left, right = st.columns(2)
+_WORD_RE = re.compile(r"\S+")
+
+_PREVIEW_PLACEHOLDER_HTML = """
+<div class="preview-content">
+    <div class="preview-placeholder">
+        📝 Your email preview will appear here once generated...
+    </div>
+</div>
+"""
+
+def _sync_preview():
+    # Preview follows committed editor changes (blur / Ctrl+Enter), not every widget event
+    st.session_state["preview_draft"] = st.session_state["draft_editor"]
+
 
-with left:
-    st.markdown("### ✏️ Editable Draft")
+@st.fragment
+def render_output_panel():
+    """
+    Editor + preview columns. Runs as a fragment, so editing the draft reruns only this
+    panel instead of the whole script (sidebar, profile lookups, workflow wiring).
+    """
+    left, right = st.columns(2)
+
+    with left:
+        st.markdown("### ✏️ Editable Draft")
     
-    vr = st.session_state.get("validation_report") or {}
-    status = st.session_state.get("validation_status") or ""
+        vr = st.session_state.get("validation_report") or {}
+        status = st.session_state.get("validation_status") or ""
     
-    # Apply error styling if FAIL or BLOCKED
-    if status in ["FAIL", "BLOCKED"]:
-        st.markdown("""
-        <style>
-            div[data-testid="stTextArea"] textarea {
-                border: 2px solid #E53E3E !important;
-                background-color: #FFF5F5 !important;
-            }
-        </style>
-        """, unsafe_allow_html=True)
+        # Apply error styling if FAIL or BLOCKED
+        if status in ["FAIL", "BLOCKED"]:
+            st.markdown("""
+            <style>
+                div[data-testid="stTextArea"] textarea {
+                    border: 2px solid #E53E3E !important;
+                    background-color: #FFF5F5 !important;
+                }
+            </style>
+            """, unsafe_allow_html=True)
     
-    st.text_area(
-        "Edit your email below:",
-        height=340,
-        key="draft_editor",
-        label_visibility="collapsed"
-    )
+        st.text_area(
+            "Edit your email below:",
+            height=340,
+            key="draft_editor",
+            on_change=_sync_preview,
+            label_visibility="collapsed"
+        )
     
-    # Display suggested fix for FAIL or BLOCKED
-    if status == "FAIL":
-        issues = vr.get("issues", [])
-        if issues:
-            suggested_fix = issues[-1].get("suggested_fix", "")
+        # Display suggested fix for FAIL or BLOCKED
+        if status == "FAIL":
+            issues = vr.get("issues", [])
+            if issues:
+                suggested_fix = issues[-1].get("suggested_fix", "")
+                if suggested_fix:
+                    st.markdown(f"""
+                    <div class="warning-message">
+                        <strong>⚠️ Suggested Fix:</strong><br>{suggested_fix}
+                    </div>
+                    """, unsafe_allow_html=True)
+    
+        if status == "BLOCKED":
+            suggested_fix = vr.get("summary", "")
             if suggested_fix:
                 st.markdown(f"""
-                <div class="warning-message">
-                    <strong>⚠️ Suggested Fix:</strong><br>{suggested_fix}
+                <div class="error-message">
+                    <strong>🚫 Blocked:</strong><br>{suggested_fix}
                 </div>
                 """, unsafe_allow_html=True)
     
-    if status == "BLOCKED":
-        suggested_fix = vr.get("summary", "")
-        if suggested_fix:
-            st.markdown(f"""
-            <div class="error-message">
-                <strong>🚫 Blocked:</strong><br>{suggested_fix}
-            </div>
-            """, unsafe_allow_html=True)
-    
-    st.markdown("<br>", unsafe_allow_html=True)
+        st.markdown("<br>", unsafe_allow_html=True)
     
-    draft_content = st.session_state["draft_editor"] or ""
-    has_content = bool(draft_content.strip())
+        draft_content = st.session_state["draft_editor"] or ""
+        has_content = bool(draft_content.strip())
     
-    col_a, col_b, col_c = st.columns([1, 1, 2])
+        col_a, col_b, col_c = st.columns([1, 1, 2])
     
-    with col_a:
-        if has_content:
-            pdf_buffer = generate_pdf(draft_content)
-            st.download_button(
-                "📥 Export PDF",
-                data=pdf_buffer,
-                file_name="email_draft.pdf",
-                mime="application/pdf",
-                use_container_width=True
-            )
-        else:
-            st.download_button(
-                "📥 Export PDF",
-                data="",
-                file_name="email_draft.pdf",
-                mime="application/pdf",
-                disabled=True,
-                use_container_width=True
-            )
-
-    with col_b:
-        # Use st.components.v1.html for proper HTML button rendering with clipboard functionality
-        if has_content:
-            # Escape content for JavaScript - handle backslashes, backticks, and template literals
-            escaped_content = draft_content.replace("\\", "\\\\").replace("`", "\\`").replace("${", "\\${").replace("\n", "\\n").replace("\r", "\\r")
-            
-            st.components.v1.html(f"""
-            <style>
-                html, body {{
-                    margin: 0 !important;
-                    padding: 0 !important;
-                    overflow: hidden;
-                }}
-            </style>
-            <button id="copyBtn" style="
-                width: 100%;
-                padding: 0.5rem 1rem;
-                border-radius: 8px;
-                border: 1px solid rgba(49, 57, 66, 0.2);
-                background: white;
-                color: rgb(49, 51, 63);
-                cursor: pointer;
-                font-weight: 400;
-                font-size: 0.875rem;
-                font-family: 'Source Sans Pro', sans-serif;
-                line-height: 1.6;
-                height: 38px;
-                transition: all 0.2s ease;
-                box-sizing: border-box;
-                margin: 0;
-            "
-            onmouseover="this.style.borderColor='#8B4557'; this.style.color='#8B4557';"
-            onmouseout="if(this.innerText !== '✓ Copied!') {{ this.style.borderColor='rgba(49, 57, 66, 0.2)'; this.style.color='rgb(49, 51, 63)'; }}"
-            onclick="
-                const content = '{escaped_content}';
-                navigator.clipboard.writeText(content).then(() => {{
-                    this.innerText = '✓ Copied!';
-                    this.style.background = '#C6F6D5';
-                    this.style.borderColor = '#22543D';
-                    this.style.color = '#22543D';
-                    setTimeout(() => {{
-                        this.innerText = '📋 Copy';
-                        this.style.background = 'white';
-                        this.style.borderColor = 'rgba(49, 57, 66, 0.2)';
-                        this.style.color = 'rgb(49, 51, 63)';
-                    }}, 1500);
-                }});
-            ">
-                📋 Copy
-            </button>
-            """, height=38)
-        else:
-            st.components.v1.html("""
-            <style>
-                html, body {
-                    margin: 0 !important;
-                    padding: 0 !important;
-                    overflow: hidden;
-                }
-            </style>
-            <button style="
-                width: 100%;
-                padding: 0.5rem 1rem;
-                border-radius: 8px;
-                border: 1px solid rgba(49, 57, 66, 0.2);
-                background: white;
-                color: rgb(49, 51, 63);
-                font-weight: 400;
-                font-size: 0.875rem;
-                font-family: 'Source Sans Pro', sans-serif;
-                line-height: 1.6;
-                height: 38px;
-                opacity: 0.5;
-                cursor: not-allowed;
-                box-sizing: border-box;
-                margin: 0;
-            " disabled>
-                📋 Copy
-            </button>
-            """, height=38)
-
-    if debug_mode:
-        with st.expander("🔍 Agent Trace (Debug)", expanded=False):
-            resp = st.session_state.get("last_response") or {}
-            vr = st.session_state.get("validation_report")
-
-            if not resp:
-                st.caption("No debug data yet. Generate an email to populate the trace.")
+        with col_a:
+            if has_content:
+                st.download_button(
+                    "📥 Export PDF",
+                    data=get_pdf_bytes(draft_content),
+                    file_name="email_draft.pdf",
+                    mime="application/pdf",
+                    use_container_width=True
+                )
             else:
-                st.caption(f"**Response keys:** {', '.join(sorted(resp.keys()))}")
-
-                # Intent debug
-                intent_val = resp.get("intent")
-                intent_conf = resp.get("intent_confidence")
-                intent_src = resp.get("intent_source")
-
-                if intent_val:
-                    st.markdown("#### Intent Detection")
-                    cols = st.columns(3)
-                    cols[0].markdown(f"**Intent:** `{intent_val}`")
-                    if intent_conf is not None:
-                        try:
-                            cols[1].markdown(f"**Confidence:** `{float(intent_conf):.2f}`")
-                        except Exception:
-                            cols[1].markdown(f"**Confidence:** `{intent_conf}`")
-                    if intent_src:
-                        cols[2].markdown(f"**Source:** `{intent_src}`")
-
-                st.divider()
-
-                # Validation report
-                if isinstance(vr, dict):
-                    st.markdown("#### Validation Report")
-                    
-                    status = (vr.get("status") or "").upper()
-                    if status == "PASS":
-                        st.markdown('<span class="status-badge status-success">✓ PASS</span>', unsafe_allow_html=True)
-                    elif status == "FAIL":
-                        st.markdown('<span class="status-badge status-warning">⚠ FAIL</span>', unsafe_allow_html=True)
-                    elif status == "BLOCKED":
-                        st.markdown('<span class="status-badge status-error">✗ BLOCKED</span>', unsafe_allow_html=True)
+                st.download_button(
+                    "📥 Export PDF",
+                    data="",
+                    file_name="email_draft.pdf",
+                    mime="application/pdf",
+                    disabled=True,
+                    use_container_width=True
+                )
+
+        with col_b:
+            # Use st.components.v1.html for proper HTML button rendering with clipboard functionality
+            if has_content:
+                # Rebuild the button HTML only when the draft text changed
+                draft_hash = _content_hash(draft_content)
+                copy_html = st.session_state.get("copy_button_html")
+                if not copy_html or st.session_state.get("last_draft_hash") != draft_hash:
+                    copy_html = build_copy_button_html(draft_content)
+                    st.session_state["copy_button_html"] = copy_html
+                    st.session_state["last_draft_hash"] = draft_hash
+                st.components.v1.html(copy_html, height=38)
+            else:
+                st.components.v1.html(_COPY_BUTTON_DISABLED_HTML, height=38)
+
+        if debug_mode:
+            with st.expander("🔍 Agent Trace (Debug)", expanded=False):
+                resp = st.session_state.get("last_response") or {}
+                vr = st.session_state.get("validation_report")
+
+                if not resp:
+                    st.caption("No debug data yet. Generate an email to populate the trace.")
+                else:
+                    st.caption(f"**Response keys:** {', '.join(sorted(resp.keys()))}")
+
+                    # Intent debug
+                    intent_val = resp.get("intent")
+                    intent_conf = resp.get("intent_confidence")
+                    intent_src = resp.get("intent_source")
+
+                    if intent_val:
+                        st.markdown("#### Intent Detection")
+                        cols = st.columns(3)
+                        cols[0].markdown(f"**Intent:** `{intent_val}`")
+                        if intent_conf is not None:
+                            try:
+                                cols[1].markdown(f"**Confidence:** `{float(intent_conf):.2f}`")
+                            except Exception:
+                                cols[1].markdown(f"**Confidence:** `{intent_conf}`")
+                        if intent_src:
+                            cols[2].markdown(f"**Source:** `{intent_src}`")
+
+                    st.divider()
+
+                    # Validation report
+                    if isinstance(vr, dict):
+                        st.markdown("#### Validation Report")
+
+                        # status: normalized once per generation (session_state["validation_status"])
+                        if status == "PASS":
+                            st.markdown('<span class="status-badge status-success">✓ PASS</span>', unsafe_allow_html=True)
+                        elif status == "FAIL":
+                            st.markdown('<span class="status-badge status-warning">⚠ FAIL</span>', unsafe_allow_html=True)
+                        elif status == "BLOCKED":
+                            st.markdown('<span class="status-badge status-error">✗ BLOCKED</span>', unsafe_allow_html=True)
                     
-                    st.json(vr)
-                elif vr is not None:
-                    st.markdown("#### Validation Report")
-                    st.code(str(vr))
+                        st.json(vr)
+                    elif vr is not None:
+                        st.markdown("#### Validation Report")
+                        st.code(str(vr))
 
-with right:
-    st.markdown("### 👁️ Real-time Preview")
-    
-    draft_text = st.session_state.get("draft_editor") or ""
+    with right:
+        st.markdown("### 👁️ Real-time Preview")
     
-    if draft_text.strip():
-        # Use st.container for the preview with custom CSS applied via class
-        preview_container = st.container(border=True)
-        with preview_container:
-            st.markdown(draft_text)
+        draft_text = st.session_state.get("preview_draft") or ""
+
+        # One slot for the preview: either the bordered draft container or the placeholder
+        preview_slot = st.empty()
+
+        if draft_text.strip():
+            with preview_slot.container(border=True):
+                st.markdown(draft_text)
         
-        # Word/character count
-        word_count = len(draft_text.split())
-        char_count = len(draft_text)
-        st.caption(f"📊 **{word_count}** words · **{char_count}** characters")
-    else:
-        st.markdown("""
-        <div class="preview-content">
-            <div class="preview-placeholder">
-                📝 Your email preview will appear here once generated...
-            </div>
-        </div>
-        """, unsafe_allow_html=True)
\ No newline at end of file
+            # Word/character count (recomputed only when the text changes)
+            cached_counts = st.session_state.get("_preview_counts")
+            if cached_counts is None or cached_counts[0] != draft_text:
+                cached_counts = (draft_text, sum(1 for _ in _WORD_RE.finditer(draft_text)), len(draft_text))
+                st.session_state["_preview_counts"] = cached_counts
+            _, word_count, char_count = cached_counts
+            st.caption(f"📊 **{word_count}** words · **{char_count}** characters")
+        else:
+            preview_slot.markdown(_PREVIEW_PLACEHOLDER_HTML, unsafe_allow_html=True)
+
+
+render_output_panel()
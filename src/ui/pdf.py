@@ -0,0 +1,44 @@
+from __future__ import annotations
+
+import re
+import tempfile
+from html import escape as _html_escape
+from typing import IO
+
+from reportlab.lib.pagesizes import letter
+from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
+from reportlab.platypus import SimpleDocTemplate, Paragraph
+from reportlab.lib.units import inch
+
+
+# Built once at import (app.py itself is re-executed on every Streamlit rerun).
+_STYLES = getSampleStyleSheet()
+_EMAIL_STYLE = ParagraphStyle(
+    "EmailStyle",
+    parent=_STYLES["Normal"],
+    fontSize=11,
+    leading=16,
+    spaceAfter=12,
+)
+
+# 4+ blank lines (whitespace-only lines count as blank)
+_BLANK_RUN_RE = re.compile(r"\n(?:[ \t]*\n){4,}")
+
+# PDFs up to this size stay in memory; larger ones spill to a temp file.
+_SPOOL_MAX_BYTES = 64 * 1024
+
+
+def generate_pdf(text: str) -> IO[bytes]:
+    """Generate a PDF from the email draft text. Returns a file object rewound to the start."""
+    buffer = tempfile.SpooledTemporaryFile(max_size=_SPOOL_MAX_BYTES)
+    doc = SimpleDocTemplate(buffer, pagesize=letter, topMargin=1*inch, bottomMargin=1*inch)
+
+    # One Paragraph for the whole draft: escape once, newlines become <br/>, and runs of
+    # blank lines are capped at three (ReportLab wraps and splits across pages itself).
+    safe_text = _html_escape(text.strip("\n"), quote=False)
+    safe_text = _BLANK_RUN_RE.sub("\n\n\n\n", safe_text)
+    story = [Paragraph(safe_text.replace("\n", "<br/>"), _EMAIL_STYLE)]
+
+    doc.build(story)
+    buffer.seek(0)
+    return buffer
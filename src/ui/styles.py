@@ -0,0 +1,266 @@
+"""
+Page CSS for the Streamlit UI.
+
+Kept in an imported module so the strings are built once per process; app.py itself
+is re-executed on every rerun.
+"""
+
+import re
+
+# Hides Streamlit chrome (header, menu, toolbar); skipped when ?debug=1.
+HEADER_CSS = """
+<style>
+    /* Hide Streamlit header and menu */
+    header {display: none !important;}
+    #MainMenu {display: none !important;}
+    footer {display: none !important;}
+    .stDeployButton {display: none !important;}
+    div[data-testid="stToolbar"] {display: none !important;}
+    div[data-testid="stDecoration"] {display: none !important;}
+    div[data-testid="stStatusWidget"] {display: none !important;}
+    div[data-testid="stSidebarHeader"] {display: none !important;}
+    section[data-testid="stSidebar"] > div:first-child {padding-top: 2rem;}
+    .main .block-container {padding-top: 1rem !important;}
+
+    /* Target the header more specifically */
+    header[data-testid="stHeader"] {
+        display: none !important;
+        height: 0 !important;
+        visibility: hidden !important;
+    }
+
+    /* Remove any top spacing from the app */
+    .stApp > header {
+        display: none !important;
+    }
+    .appview-container {
+        padding-top: 0 !important;
+    }
+    .block-container {
+        padding-top: 1rem !important;
+    }
+</style>
+"""
+
+# Maroon theme, cards, preview and profile-card animation.
+THEME_CSS = """
+<style>
+    /* Main container styling */
+    .main .block-container {
+        padding-bottom: 2rem;
+        max-width: 1200px;
+    }
+
+    /* Header styling */
+    h1 {
+        color: #5D2E3D;
+        font-weight: 700;
+        margin-bottom: 0.5rem;
+    }
+
+    h2, h3 {
+        color: #6B3A4A;
+        font-weight: 600;
+    }
+
+    /* Sidebar styling - maroon theme */
+    [data-testid="stSidebar"] {
+        background: linear-gradient(180deg, #FAF5F7 0%, #F0E4E8 100%);
+    }
+
+    [data-testid="stSidebar"] .stSelectbox label,
+    [data-testid="stSidebar"] .stTextArea label {
+        font-weight: 600;
+        color: #5D2E3D;
+    }
+
+    /* Button styling - maroon theme with WHITE text */
+    .stButton > button[kind="primary"],
+    .stFormSubmitButton > button[kind="primaryFormSubmit"] {
+        background: linear-gradient(90deg, #8B4557 0%, #6B3A4A 100%);
+        border: none;
+        border-radius: 8px;
+        padding: 0.75rem 2rem;
+        font-weight: 600;
+        transition: all 0.3s ease;
+        color: white !important;
+    }
+
+    .stButton > button[kind="primary"]:hover,
+    .stFormSubmitButton > button[kind="primaryFormSubmit"]:hover {
+        background: linear-gradient(90deg, #6B3A4A 0%, #5D2E3D 100%);
+        box-shadow: 0 4px 12px rgba(107, 58, 74, 0.4);
+        color: white !important;
+    }
+
+    .stButton > button[kind="primary"] p,
+    .stFormSubmitButton > button[kind="primaryFormSubmit"] p {
+        color: white !important;
+    }
+
+    /* Text area styling - maroon theme */
+    .stTextArea textarea {
+        border-radius: 8px;
+        border: 2px solid #E8D8DD;
+        background-color: #FDF9FA;
+        transition: border-color 0.3s ease;
+    }
+
+    .stTextArea textarea:focus {
+        border-color: #8B4557;
+        box-shadow: 0 0 0 3px rgba(139, 69, 87, 0.1);
+    }
+
+    /* Card-like containers */
+    .output-card {
+        background: #FFFFFF;
+        border-radius: 12px;
+        padding: 1.5rem;
+        box-shadow: 0 2px 8px rgba(0, 0, 0, 0.08);
+        border: 1px solid #E8D8DD;
+    }
+
+    /* Preview section - maroon theme */
+    .preview-content {
+        background: #FDF9FA;
+        border-radius: 8px;
+        padding: 1.5rem;
+        border-left: 4px solid #8B4557;
+        min-height: 340px;
+        font-family: 'Georgia', serif;
+        line-height: 1.6;
+        color: #4A3540;
+    }
+
+    .preview-placeholder {
+        color: #A08890;
+        font-style: italic;
+        text-align: center;
+        padding: 2rem;
+    }
+
+    /* Status badges */
+    .status-badge {
+        display: inline-block;
+        padding: 0.25rem 0.75rem;
+        border-radius: 20px;
+        font-size: 0.85rem;
+        font-weight: 600;
+    }
+
+    .status-success {
+        background: #C6F6D5;
+        color: #22543D;
+    }
+
+    .status-warning {
+        background: #FEEBC8;
+        color: #744210;
+    }
+
+    .status-error {
+        background: #FED7D7;
+        color: #822727;
+    }
+
+    /* Divider */
+    hr {
+        margin: 2rem 0;
+        border: none;
+        height: 1px;
+        background: linear-gradient(90deg, transparent, #D4C4C9, transparent);
+    }
+
+    /* Tips expander */
+    .streamlit-expanderHeader {
+        font-weight: 600;
+        color: #5D2E3D;
+    }
+
+    /* Download button - maroon theme */
+    .stDownloadButton > button {
+        border-radius: 8px;
+        border: 2px solid #8B4557;
+        color: #8B4557;
+        background: transparent;
+        transition: all 0.3s ease;
+    }
+
+    .stDownloadButton > button:hover {
+        background: #8B4557;
+        color: white;
+    }
+
+    /* Error message box */
+    .error-message {
+        background: #FED7D7;
+        border: 1px solid #FC8181;
+        border-radius: 8px;
+        padding: 1rem;
+        color: #822727;
+        margin-top: 0.5rem;
+    }
+
+    /* Warning message box */
+    .warning-message {
+        background: #FEEBC8;
+        border: 1px solid #F6AD55;
+        border-radius: 8px;
+        padding: 1rem;
+        color: #744210;
+        margin-top: 0.5rem;
+    }
+
+    /* Subtitle */
+    .subtitle {
+        color: #7A5A65;
+        font-size: 1.1rem;
+        margin-bottom: 2rem;
+    }
+
+    /* Profile details box - maroon theme */
+    .profile-details {
+        background: #FAF0F3;
+        border-radius: 8px;
+        padding: 0.75rem;
+        margin-top: 0.5rem;
+        font-size: 0.9rem;
+    }
+
+    /* Profile card expand/contract animation */
+    @keyframes expandIn {
+        from {
+            max-height: 0;
+            opacity: 0;
+            padding: 0 0.75rem;
+        }
+        to {
+            max-height: 200px;
+            opacity: 1;
+            padding: 0.75rem;
+        }
+    }
+    .profile-details-animated {
+        animation: expandIn 0.3s ease-out forwards;
+        overflow: hidden;
+    }
+
+    /* Preview container styling */
+    [data-testid="stVerticalBlock"] > div[data-testid="stVerticalBlockBorderWrapper"] {
+        background: #FDF9FA;
+        border-left: 4px solid #8B4557 !important;
+        border-radius: 8px;
+        min-height: 340px;
+    }
+</style>
+"""
+
+
+def _minify(css: str) -> str:
+    css = re.sub(r"/\*.*?\*/", "", css, flags=re.S)
+    return re.sub(r"\s+", " ", css).strip()
+
+
+# What app.py injects: one minified <style> element per rerun.
+PAGE_CSS = _minify(HEADER_CSS + THEME_CSS).replace("</style> <style>", " ")
+PAGE_CSS_DEBUG = _minify(THEME_CSS)
@@ -0,0 +1,63 @@
+from __future__ import annotations
+
+import asyncio
+import atexit
+import concurrent.futures
+import threading
+from typing import Any, Awaitable, Callable, Coroutine, List, Optional
+
+
+class AsyncRuntime:
+    """
+    One asyncio event loop running forever on a daemon thread.
+
+    Sync callers (e.g. Streamlit reruns) submit coroutines here instead of spinning up a
+    loop per call, so loop-bound resources (HTTP keep-alive pools, LangGraph internals)
+    live for the whole process.
+    """
+
+    _instance: Optional["AsyncRuntime"] = None
+    _lock = threading.Lock()
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._shutdown_hooks: List[Callable[[], Awaitable[Any]]] = []
+        self._thread = threading.Thread(target=self._run, name="AsyncRuntime", daemon=True)
+        self._thread.start()
+
+    def _run(self) -> None:
+        asyncio.set_event_loop(self.loop)
+        self.loop.run_forever()
+
+    @classmethod
+    def get(cls) -> "AsyncRuntime":
+        with cls._lock:
+            if cls._instance is None or cls._instance.loop.is_closed():
+                cls._instance = cls()
+                atexit.register(cls._instance.stop)
+            return cls._instance
+
+    def submit(self, coro: Coroutine[Any, Any, Any]) -> concurrent.futures.Future:
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def run(self, coro: Coroutine[Any, Any, Any]) -> Any:
+        """Block the calling thread until coro finishes on the runtime loop."""
+        return self.submit(coro).result()
+
+    def add_shutdown_hook(self, hook: Callable[[], Awaitable[Any]]) -> None:
+        """Coroutine function awaited on the loop by stop(), e.g. to close loop-bound clients."""
+        self._shutdown_hooks.append(hook)
+
+    def stop(self) -> None:
+        if self.loop.is_closed():
+            return
+        for hook in reversed(self._shutdown_hooks):
+            try:
+                self.submit(hook()).result(timeout=5)
+            except Exception:
+                pass  # best effort at interpreter exit
+        self._shutdown_hooks.clear()
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+        if not self._thread.is_alive():
+            self.loop.close()
@@ -0,0 +1,36 @@
+from __future__ import annotations
+
+import json
+from typing import Any
+
+try:
+    import orjson
+except ImportError:  # optional speedup; stdlib json produces the same compact output
+    orjson = None
+
+
+def dumps_bytes(obj: Any, *, sort_keys: bool = False) -> bytes:
+    """Compact UTF-8 JSON; unsupported values are stringified (like json.dumps(default=str))."""
+    if orjson is not None:
+        option = orjson.OPT_NON_STR_KEYS | (orjson.OPT_SORT_KEYS if sort_keys else 0)
+        try:
+            return orjson.dumps(obj, default=str, option=option)
+        except TypeError:  # e.g. ints beyond 64 bits, which json handles
+            pass
+    return json.dumps(
+        obj, sort_keys=sort_keys, separators=(",", ":"), ensure_ascii=False, default=str
+    ).encode("utf-8")
+
+
+def dumps(obj: Any, *, sort_keys: bool = False) -> str:
+    return dumps_bytes(obj, sort_keys=sort_keys).decode("utf-8")
+
+
+def loads(data: str | bytes) -> Any:
+    """json.loads, via orjson when available; input orjson rejects (NaN, huge ints, invalid) goes to json."""
+    if orjson is not None:
+        try:
+            return orjson.loads(data)
+        except orjson.JSONDecodeError:
+            pass
+    return json.loads(data)
@@ -1,17 +1,20 @@
 import logging
 import sys
 import contextvars
-from colorlog import ColoredFormatter
 
 # -------------------------------------------------
 # Async-safe correlation ID (ECID)
 # -------------------------------------------------
 ecid_var = contextvars.ContextVar("ecid", default="-")
+_get_ecid = ecid_var.get  # bound once; filter() runs for every record
+
+# Set after the first setup_logging(); later calls (Streamlit reruns) return immediately
+_CONFIGURED = False
 
 
 class ECIDFilter(logging.Filter):
     def filter(self, record: logging.LogRecord) -> bool:
-        record.ecid = ecid_var.get()
+        record.ecid = _get_ecid()
         return True
 
 
@@ -20,21 +23,28 @@ def setup_logging(
     silence_third_party: bool = True,
 ) -> logging.Logger:
     """
-    Configure colored terminal logging with ECID support.
-    Safe to call multiple times (Streamlit reruns).
+    Configure terminal logging with ECID support (colored when stderr is a TTY).
+    Safe to call multiple times (Streamlit reruns): only the first call configures anything.
     """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return logging.getLogger("EmailAssist")
+    _CONFIGURED = True
 
     root = logging.getLogger()
     root.setLevel(level)
 
-    if not any(isinstance(h, logging.StreamHandler) for h in root.handlers):
+    # Marker on the root logger survives a reload of this module (Streamlit dev reloads)
+    if not getattr(root, "_ecid_installed", False):
         handler = logging.StreamHandler(sys.stderr)
         handler.setLevel(level)
 
         handler.addFilter(ECIDFilter())
 
-        handler.setFormatter(
-            ColoredFormatter(
+        if sys.stderr.isatty():
+            from colorlog import ColoredFormatter
+
+            formatter = ColoredFormatter(
                 "%(asctime)s %(log_color)s%(levelname)-8s%(reset)s "
                 "%(light_black)secid=%(ecid)s%(reset)s %(name)s:%(message)s",
                 datefmt="%Y-%m-%d %H:%M:%S",
@@ -46,9 +56,16 @@ def setup_logging(
                     "CRITICAL": "bold_red",
                 },
             )
-        )
+        else:
+            # Piped/containerized output: no ANSI escapes in the log stream
+            formatter = logging.Formatter(
+                "%(asctime)s %(levelname)-8s ecid=%(ecid)s %(name)s:%(message)s",
+                datefmt="%Y-%m-%d %H:%M:%S",
+            )
+        handler.setFormatter(formatter)
 
         root.addHandler(handler)
+        root._ecid_installed = True
 
     if silence_third_party:
         logging.getLogger("httpcore").setLevel(logging.WARNING)
@@ -57,6 +74,8 @@ def setup_logging(
         logging.getLogger("asyncio").setLevel(logging.WARNING)
         logging.getLogger("langchain").setLevel(logging.INFO)
         logging.getLogger("langgraph").setLevel(logging.INFO)
+        logging.getLogger("LiteLLM").setLevel(logging.INFO)
+        logging.getLogger("LiteLLM Router").setLevel(logging.INFO)
 
     logger = logging.getLogger("EmailAssist")
     logger.setLevel(level)
@@ -1,4 +1,5 @@
 import hashlib
+from functools import lru_cache
 from typing import Any, Dict, Optional
 
 KNOWN_META_KEYS = {
@@ -20,42 +21,52 @@ def _meta_get(meta: Optional[dict], key: str) -> Optional[str]:
     return s or None
 
 def normalize_recipient(parsed_recipient: Optional[dict], metadata: Optional[dict]) -> Dict[str, Any]:
-    parsed_recipient = parsed_recipient or {}
-    if not isinstance(parsed_recipient, dict):
-        parsed_recipient = {}
-
-    # Metadata overlay (authoritative)
-    email = _meta_get(metadata, "recipient_email")
-    name = _meta_get(metadata, "recipient_name") or (parsed_recipient.get("name") or None)
-    org = _meta_get(metadata, "recipient_org")
-    role = _meta_get(metadata, "recipient_role") or (parsed_recipient.get("role") or None)
-    relationship = _meta_get(metadata, "recipient_relationship") or (parsed_recipient.get("relationship") or None)
-
-    def _clean(x):
-        if x is None:
-            return None
-        s = str(x).strip()
-        return s or None
-
+    # Metadata overlay (authoritative); each value is stripped/None-ified exactly once
     return {
-        "email": _clean(email),
-        "name": _clean(name),
-        "org": _clean(org),
-        "role": _clean(role),
-        "relationship": _clean(relationship),
+        "email": _meta_get(metadata, "recipient_email"),
+        "name": _meta_get(metadata, "recipient_name") or _meta_get(parsed_recipient, "name"),
+        "org": _meta_get(metadata, "recipient_org"),
+        "role": _meta_get(metadata, "recipient_role") or _meta_get(parsed_recipient, "role"),
+        "relationship": (
+            _meta_get(metadata, "recipient_relationship") or _meta_get(parsed_recipient, "relationship")
+        ),
     }
 
 def compute_recipient_key(recipient: Dict[str, Any]) -> str:
-    email = (recipient.get("email") or "").strip().lower()
+    return _recipient_key(
+        recipient.get("email") or "",
+        recipient.get("name") or "",
+        recipient.get("org") or "",
+        recipient.get("role") or "",
+    )
+
+@lru_cache(maxsize=256)
+def _recipient_key(email: str, name: str, org: str, role: str) -> Optional[str]:
+    # Keyed on scalar fields (dicts aren't hashable); users tend to draft repeatedly for the same recipient.
+    # Fields come from normalize_recipient (already stripped), so only case-folding is needed here.
+    email = email.lower()
     if email:
         return f"email:{email}"
 
-    name = (recipient.get("name") or "").strip().lower()
-    org = (recipient.get("org") or "").strip().lower()
-    role = (recipient.get("role") or "").strip().lower()
+    name = name.lower()
+    org = org.lower()
+    role = role.lower()
     if (name and org) or (name and role):
         base = "|".join([name, org, role])
-        digest = hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
+        digest = hashlib.blake2b(base.encode("utf-8"), digest_size=8).hexdigest()
         return f"hash:{digest}"
 
     return None
+
+def compute_legacy_recipient_key(recipient: Dict[str, Any]) -> Optional[str]:
+    """
+    The hash: key as it was computed before BLAKE2b (truncated SHA-256), for summaries saved back then.
+    None when the current key didn't change (email: keys) or there is no key.
+    """
+    key = compute_recipient_key(recipient)
+    if not key or not key.startswith("hash:"):
+        return None
+    base = "|".join(
+        (recipient.get(k) or "").strip().lower() for k in ("name", "org", "role")
+    )
+    return "hash:" + hashlib.sha256(base.encode("utf-8")).hexdigest()[:16]
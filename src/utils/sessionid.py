@@ -1,13 +1,20 @@
 import hashlib
 import os
 
+# Secret salt that only your server knows (store in env variable!).
+# Read once at import and fail fast: a missing salt used to hash as the literal "None".
+SECRET_SALT = os.environ.get("SECRET_SALT")
+if not SECRET_SALT:
+    raise RuntimeError("SECRET_SALT environment variable is not set (see README: Environment vars)")
+
+# BLAKE2b keys are capped at 64 bytes; longer salts are digested down once here
+_SESSION_KEY = SECRET_SALT.encode()
+if len(_SESSION_KEY) > hashlib.blake2b.MAX_KEY_SIZE:
+    _SESSION_KEY = hashlib.blake2b(_SESSION_KEY).digest()
+
+
 # Generate cryptographically secure session ID
 def create_session_id(user_id):
-    # Add a secret salt that only your server knows
-    SECRET_SALT = os.environ.get("SECRET_SALT")  # Store in env variable!
-    
-    # Create hash that's hard to guess
-    session_string = f"{user_id}:{SECRET_SALT}"
-    session_hash = hashlib.sha256(session_string.encode()).hexdigest()
-    
-    return f"session_{session_hash[:16]}"  
\ No newline at end of file
+    # Keyed BLAKE2b (a MAC) that's hard to guess without the salt
+    session_hash = hashlib.blake2b(str(user_id).encode(), digest_size=8, key=_SESSION_KEY).hexdigest()
+    return "session_" + session_hash
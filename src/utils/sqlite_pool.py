@@ -0,0 +1,84 @@
+from __future__ import annotations
+
+import os
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+# Applied to every pooled connection. WAL lets readers proceed while a writer commits;
+# synchronous=NORMAL is the recommended pairing with WAL (no fsync per commit).
+_PRAGMAS = (
+    "PRAGMA journal_mode=WAL;",
+    "PRAGMA synchronous=NORMAL;",
+    "PRAGMA temp_store=MEMORY;",
+    "PRAGMA mmap_size=268435456;",
+)
+
+
+def configure_connection(conn: sqlite3.Connection) -> sqlite3.Connection:
+    """Row factory + the pool's PRAGMAs, for stores that open their own connections."""
+    conn.row_factory = sqlite3.Row
+    for pragma in _PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+@contextmanager
+def connect(db_path: str) -> Iterator[sqlite3.Connection]:
+    """
+    Unpooled counterpart of SQLitePool.connection(): a configured connection that commits on
+    success, rolls back on error, and is closed afterwards. Usable from worker threads.
+    """
+    conn = configure_connection(sqlite3.connect(db_path, check_same_thread=False))
+    try:
+        with conn:
+            yield conn
+    finally:
+        conn.close()
+
+
+class SQLitePool:
+    """
+    Fixed-size pool of connections to one SQLite file, shared by the SQLite-backed stores.
+    Connections are opened lazily (up to `size`) and handed out via `connection()`.
+    """
+
+    def __init__(self, db_path: str, size: Optional[int] = None):
+        self.db_path = db_path
+        self.size = size or min(os.cpu_count() or 1, 8)
+        self._idle: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue()
+        self._opened = 0
+        self._lock = threading.Lock()
+
+    def _open(self) -> sqlite3.Connection:
+        return configure_connection(sqlite3.connect(self.db_path, check_same_thread=False))
+
+    def _acquire(self) -> sqlite3.Connection:
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            if self._opened < self.size:
+                self._opened += 1
+                return self._open()
+        return self._idle.get()
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; like `with sqlite3.connect(...)`, commits on success and rolls back on error."""
+        conn = self._acquire()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._idle.put(conn)
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                break
@@ -1,41 +1,135 @@
+import asyncio
+import logging
+import os
+from collections import Counter, OrderedDict
+from functools import cache
+from pathlib import Path
+from typing import Any, Dict, List
+
+import httpx
+import litellm
+import yaml
 from litellm import Router
+from litellm.integrations.custom_logger import CustomLogger
+
+PROJECT_ROOT = Path(__file__).parent.parent.parent
+
+# Override with ROUTER_CONFIG=/path/to/router.yaml
+ROUTER_CONFIG_PATH = os.environ.get("ROUTER_CONFIG") or str(PROJECT_ROOT / "configs" / "router.yaml")
+
+logger = logging.getLogger("EmailAssist")
+
+
+class CacheStats(CustomLogger):
+    """Counts litellm response-cache hits/misses per model group (logged at DEBUG)."""
+
+    def __init__(self):
+        super().__init__()
+        self.hits: Counter = Counter()
+        self.misses: Counter = Counter()
+
+    async def async_log_success_event(self, kwargs, response_obj, start_time, end_time):
+        metadata = (kwargs.get("litellm_params") or {}).get("metadata") or {}
+        group = metadata.get("model_group") or kwargs.get("model")
+        counter = self.hits if kwargs.get("cache_hit") else self.misses
+        counter[group] += 1
+        logger.debug(
+            "LLM response cache %s: model_group=%s hits=%d misses=%d",
+            "hit" if kwargs.get("cache_hit") else "miss",
+            group,
+            self.hits[group],
+            self.misses[group],
+        )
+
+
+cache_stats = CacheStats()
+
+
+@cache
+def build_router(config_path: str) -> Router:
+    """
+    Build a Router from a YAML config (model_list, fallbacks, router_settings).
+    Memoized per path, so one Router (HTTP clients, rate-limit state) exists per config.
+    """
+    with open(config_path, encoding="utf-8") as f:
+        config = yaml.safe_load(f) or {}
+
+    if (config.get("router_settings") or {}).get("cache_responses") and cache_stats not in litellm.callbacks:
+        litellm.callbacks.append(cache_stats)
+
+    if config.get("http_client"):
+        # Picked up by litellm's OpenAI-compatible clients instead of creating their own
+        litellm.aclient_session = build_http_client(config["http_client"])
+
+    return Router(
+        model_list=config["model_list"],
+        fallbacks=config.get("fallbacks") or [],
+        **(config.get("router_settings") or {}),
+    )
+
+
+def build_http_client(settings: Dict[str, Any]) -> httpx.AsyncClient:
+    """
+    Shared keep-alive client: one pool per process, so LLM calls reuse TLS connections.
+    HTTP/2 (several concurrent requests on one connection) needs the optional `h2` package.
+    """
+    http2 = bool(settings.get("http2"))
+    if http2:
+        try:
+            import h2  # noqa: F401
+        except ImportError:
+            http2 = False
+
+    return httpx.AsyncClient(
+        http2=http2,
+        limits=httpx.Limits(
+            max_connections=settings.get("max_connections", 64),
+            max_keepalive_connections=settings.get("max_keepalive_connections", 32),
+            keepalive_expiry=settings.get("keepalive_expiry", 30),
+        ),
+        timeout=settings.get("timeout", 30),
+        follow_redirects=True,
+    )
+
+
+async def aclose_http_client() -> None:
+    """Close the shared client installed by build_router (process shutdown)."""
+    client, litellm.aclient_session = litellm.aclient_session, None
+    if client is not None:
+        await client.aclose()
+
+
+def get_router() -> Router:
+    """Process-wide Router for the configured ROUTER_CONFIG_PATH."""
+    return build_router(ROUTER_CONFIG_PATH)
+
+
+async def _fetch_embedding(text: str) -> List[float]:
+    response = await get_router().aembedding(model="embedding", input=[text])
+    item = response.data[0]
+    return item["embedding"] if isinstance(item, dict) else item.embedding
+
+
+# text -> embedding task; shared by concurrent callers (e.g. the intent and tone caches
+# both embed raw_input in the same superstep, then the draft cache embeds it again)
+_EMBEDDING_TASKS: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+EMBEDDING_MEMO_SIZE = 256
+
 
-model_list = [
-    {
-        "model_name": "deterministic",
-        "litellm_params": {
-            "model": "gpt-4o-mini",
-            "temperature": 0.2
-        },
-    },
-    {
-        "model_name": "deterministic_fallback",
-        "litellm_params": {
-            "model": "anthropic/claude-3-5-haiku-20241022",
-            "temperature": 0.2
-        },
-    },
-    {
-        "model_name": "creative",
-        "litellm_params": {
-            "model": "gpt-4o-mini",
-            "temperature": 0.7
-        },
-    },
-    {
-        "model_name": "creative_fallback",
-        "litellm_params": {
-            "model": "anthropic/claude-3-5-haiku-20241022",
-            "temperature": 0.7
-        },
-    },
-]
-fallbacks = [
-    {"deterministic": ["deterministic_fallback"]},
-    {"creative": ["creative_fallback"]},
-]
-
-LLM_ROUTER = Router(
-    model_list=model_list,
-    fallbacks=fallbacks
-)
+async def embed_text(text: str) -> List[float]:
+    """Embedding for one text via the router's "embedding" model group (one request per distinct text)."""
+    task = _EMBEDDING_TASKS.get(text)
+    if task is None or (not task.done() and task.get_loop() is not asyncio.get_running_loop()):
+        task = asyncio.ensure_future(_fetch_embedding(text))
+        _EMBEDDING_TASKS[text] = task
+        while len(_EMBEDDING_TASKS) > EMBEDDING_MEMO_SIZE:
+            _EMBEDDING_TASKS.popitem(last=False)
+    else:
+        _EMBEDDING_TASKS.move_to_end(text)
+    try:
+        return await asyncio.shield(task)
+    except Exception:
+        # Failures are not memoized; the next caller retries
+        if _EMBEDDING_TASKS.get(text) is task:
+            del _EMBEDDING_TASKS[text]
+        raise
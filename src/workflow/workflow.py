@@ -1,8 +1,11 @@
-import logging, json
-from typing import Dict, Any
+import asyncio, itertools, logging, json
+from collections import OrderedDict
+from functools import cached_property, lru_cache
+from typing import Any, AsyncIterator, Dict, List, Tuple
 from pathlib import Path
 from langchain_litellm import ChatLiteLLMRouter
-from langchain_core.messages import HumanMessage, SystemMessage
+from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.runnables import RunnableConfig
 from langgraph.graph import StateGraph, END
 from langgraph.checkpoint.memory import MemorySaver
 
@@ -18,80 +21,155 @@ from src.templates.engine import EmailTemplateEngine
 from src.agents.draft_writer_agent import DraftWriterAgent
 from src.profiles.sqlite_profile_store import SQLiteProfileStore
 from src.memory.sqlite_memory_store import SQLiteMemoryStore
+from src.memory.sqlite_draft_cache import SQLiteDraftCache
+from src.memory.sqlite_semantic_cache import SQLiteSemanticCache
 from src.agents.personalization_agent import PersonalizationAgent
 from src.agents.review_validator_agent import ReviewValidatorAgent
+from src.agents.draft_polish_agent import DraftPolishAgent, needs_only_polish
 from src.agents.memory_agent import MemoryAgent
 from src.utils.logging import ecid_var
-from src.utils.recipient import normalize_recipient
 from src.utils.sessionid import create_session_id
-from src.workflow.router import LLM_ROUTER
+from src.utils import fastjson
+from src.utils.sqlite_pool import SQLitePool
+from src.workflow.router import aclose_http_client, embed_text, get_router
 import uuid_utils as uuid
 
 PROJECT_ROOT = Path(__file__).parent.parent.parent
 
+# Redrafts allowed after a FAIL validation; after that the last draft goes to memory as-is
+MAX_RETRIES = 2
+
+# Run concurrently once intent and tone are known
+DRAFT_BRANCHES = ["draft_writer", "profile_prefetch"]
+
+# UI selector values that mean "no override"
+AUTO_VALUES = frozenset({"(auto)", "auto", "none"})
+
+# validation_report["status"] -> next node (default: "memory")
+VALIDATION_ROUTES = {"FAIL": "bump_retry"}
+
+# ECIDs (trace ids): random per-process prefix + counter, 12 hex chars, unique within the process
+_ECID_PREFIX = uuid.uuid4().hex[:4]
+_ECID_COUNTER = itertools.count()
+
+# Memory summaries written concurrently in the background (each is an LLM call + upsert)
+MAX_BACKGROUND_MEMORY_WRITES = 4
+# Memory writes waiting or in flight; past this, new ones are dropped (and logged)
+MAX_PENDING_MEMORY_WRITES = 64
+
+# Conversation threads kept in the in-memory checkpointer; the least recently used is dropped past this
+MAX_CHECKPOINT_THREADS = 256
+
+# Classifier labels (intent, tone) cached for paraphrases expire after this
+CLASSIFIER_CACHE_TTL_SECONDS = 3600
+
+
+@lru_cache(maxsize=512)
+def _request_context(metadata_json: str, tone: str, intent: str) -> str:
+    """
+    Text of the per-request context message (METADATA + UI overrides), or "" if there is none.
+    Only the string is cached: message objects get ids assigned in place by the add_messages reducer.
+    """
+    lines = []
+    if metadata_json:
+        lines.append(f"METADATA: {metadata_json}")
+    # Optional: make UI overrides explicit too
+    if tone:
+        lines.append(f"TONE OVERRIDE: {tone}")
+    if intent:
+        lines.append(f"INTENT OVERRIDE: {intent}")
+    return "REQUEST CONTEXT (authoritative):\n" + "\n".join(lines) if lines else ""
+
+
 class EmailWorkflow:
     def __init__(self, logger: logging.Logger):
         
         # ------------------------------------------------------------------
         # 1. Model setup (explicit and intentional)
         # ------------------------------------------------------------------
-        deterministic_llm = ChatLiteLLMRouter(router=LLM_ROUTER, model_name="deterministic")
-        creative_llm = ChatLiteLLMRouter(router=LLM_ROUTER, model_name="creative")
+        router = get_router()
+        deterministic_llm = ChatLiteLLMRouter(router=router, model_name="deterministic")
+        creative_llm = ChatLiteLLMRouter(router=router, model_name="creative")
 
         # ------------------------------------------------------------------
-        # 2. Agent instantiation
+        # 2. Stores (agents are built on first use; see the properties below)
         # ------------------------------------------------------------------
-        self.input_parser = InputParsingAgent(deterministic_llm, logger)
-        self.intent_detector = IntentDetectionAgent(deterministic_llm, logger)
-        self.tone_stylist = ToneStylistAgent(deterministic_llm, logger)
-
         db_path = "data/email_assist.db"  # or env var
-        template_store = SQLiteTemplateStore(db_path)
-        template_engine = EmailTemplateEngine(template_store)
-        profile_store = SQLiteProfileStore(db_path)
-        memory_store = SQLiteMemoryStore(db_path)
-
-        self.draft_writer = DraftWriterAgent(creative_llm, logger, template_engine)
-
-        self.personalizer = PersonalizationAgent(deterministic_llm, logger, profile_store, memory_store)
-        self.validator = ReviewValidatorAgent(deterministic_llm, logger)
-        self.memory_agent = MemoryAgent(deterministic_llm, logger, memory_store=memory_store)
+        # One WAL-mode connection pool shared by every store on this database
+        self.db_pool = SQLitePool(db_path)
+        self.deterministic_llm = deterministic_llm
+        self.creative_llm = creative_llm
+        # Semantic cache for the classifier agents (intent, tone): paraphrases get the same labels
+        self.classifier_cache = SQLiteSemanticCache(
+            db_path,
+            embed=embed_text,
+            max_entries_per_key=500,
+            pool=self.db_pool,
+            table="classifier_cache",
+            ttl_seconds=CLASSIFIER_CACHE_TTL_SECONDS,
+        )
+        self.template_store = SQLiteTemplateStore(db_path, pool=self.db_pool)
+        self.profile_store = SQLiteProfileStore(db_path, pool=self.db_pool)
+        self.memory_store = SQLiteMemoryStore(db_path, pool=self.db_pool)
+        self.draft_cache = SQLiteDraftCache(db_path, embed=embed_text, pool=self.db_pool)
         self.logger = logger
+        # In-flight memory writes (see memory_node); aclose() drains them
+        self._memory_tasks: set[asyncio.Task] = set()
+        # thread_id -> its latest memory write; the next run on that thread waits for it
+        self._memory_by_thread: Dict[str, asyncio.Task] = {}
+        self._memory_slots = asyncio.Semaphore(MAX_BACKGROUND_MEMORY_WRITES)
+        # Checkpointed thread ids, least recently used first (see _touch_thread)
+        self._threads: OrderedDict[str, None] = OrderedDict()
 
         # ------------------------------------------------------------------
         # 3. Build the LangGraph
         # ------------------------------------------------------------------
         builder = StateGraph(AgentState)
 
-        async def run_agent(agent, state: AgentState) -> Dict[str, Any]:
-            result = await agent.run(state)
-            return {
-                "messages": result.messages,
-                **result.updates,
-            }
-
         # ---- Node definitions (MUST be async defs, not lambdas) ----
 
-        async def input_parser_node(state: AgentState):
-            return await run_agent(self.input_parser, state)
-
-        async def intent_detection_node(state: AgentState):
-            return await run_agent(self.intent_detector, state)
-
-        async def tone_stylist_node(state: AgentState):
-            return await run_agent(self.tone_stylist, state)
-
-        async def draft_writer_node(state: AgentState):
-            return await run_agent(self.draft_writer, state)
-
-        async def personalization_node(state: AgentState):
-            return await run_agent(self.personalizer, state)
-
-        async def review_validator_node(state: AgentState):
-            return await run_agent(self.validator, state)
-
-        async def memory_node(state: AgentState):
-            return await run_agent(self.memory_agent, state)
+        def agent_node(attr: str):
+            # One coroutine frame per node: run the agent, return its state delta.
+            # The agent is looked up per call, so it is only constructed if the node runs.
+            async def node(state: AgentState) -> Dict[str, Any]:
+                return (await getattr(self, attr).run(state)).to_state_delta()
+            return node
+
+        input_parser_node = agent_node("input_parser")
+        intent_detection_node = agent_node("intent_detector")
+        tone_stylist_node = agent_node("tone_stylist")
+        draft_writer_node = agent_node("draft_writer")
+        personalization_node = agent_node("personalizer")
+        review_validator_node = agent_node("validator")
+        polish_draft_node = agent_node("polisher")
+
+        async def memory_node(state: AgentState, config: RunnableConfig) -> Dict[str, Any]:
+            # Persistence only (nothing downstream reads it): write the summary in the
+            # background so the draft is returned without waiting on another LLM call
+            if len(self._memory_tasks) >= MAX_PENDING_MEMORY_WRITES:
+                self.logger.warning(
+                    "Memory write dropped: %d background writes already pending", len(self._memory_tasks)
+                )
+                return {}
+            thread_id = config["configurable"]["thread_id"]
+            task = asyncio.create_task(self._persist_memory(state, {"configurable": {"thread_id": thread_id}}))
+            self._memory_tasks.add(task)
+            task.add_done_callback(self._memory_tasks.discard)
+            self._memory_by_thread[thread_id] = task
+            task.add_done_callback(lambda t: self._forget_memory_write(thread_id, t))
+            return {}
+
+        async def pre_draft_join_node(state: AgentState) -> Dict[str, Any]:
+            # Barrier: runs once both intent_detection and tone_stylist have written their keys
+            return {}
+
+        async def profile_prefetch_node(state: AgentState) -> Dict[str, Any]:
+            # Personalization's DB reads, off the event loop, while draft_writer waits on its LLM
+            # getattr: compile() resolves attribute chains in node closures while looking for
+            # subgraphs, which would build the (lazy) personalizer up front
+            personalizer = getattr(self, "personalizer")
+            context = await asyncio.to_thread(personalizer.load_context, state)
+            return {"personalization_prefetch": context}
 
         async def bump_retry_node(state: AgentState) -> Dict[str, Any]:
             retry_count = (state.get("retry_count") or 0) + 1
@@ -101,43 +179,60 @@ class EmailWorkflow:
         async def apply_revision_hints_node(state: AgentState) -> Dict[str, Any]:
             report = state.get("validation_report") or {}
             res = report.get("constraint_resolution") or {}
-
             if not isinstance(res, dict) or not res:
                 return {}
 
-            constraints = dict(state.get("constraints") or {})
-            tone_params = dict(state.get("tone_params") or {})
+            # Copy-on-write: a dict is copied only once a hint actually changes it, and only
+            # changed keys are returned (LangGraph merges partial updates)
+            constraints_src = state.get("constraints") or {}
+            tone_params_src = state.get("tone_params") or {}
+            updates: Dict[str, Any] = {}
 
             # Drop items from must_include
             drop = res.get("drop_must_include") or []
-            if drop and isinstance(constraints.get("must_include"), list):
-                constraints["must_include"] = [x for x in constraints["must_include"] if x not in drop]
-
-            # Add items to must_avoid
+            must_include = constraints_src.get("must_include")
+            if drop and isinstance(must_include, list):
+                drop_set = frozenset(drop)
+                kept = [x for x in must_include if x not in drop_set]
+                if len(kept) != len(must_include):
+                    updates["constraints"] = {**constraints_src, "must_include": kept}
+
+            # Add items to must_avoid (existing order kept, new items appended once)
             add_avoid = res.get("add_must_avoid") or []
             if add_avoid:
-                existing = constraints.get("must_avoid") or []
+                existing = constraints_src.get("must_avoid") or []
                 if not isinstance(existing, list):
                     existing = []
-                constraints["must_avoid"] = list(dict.fromkeys(existing + add_avoid))
+                merged = list(dict.fromkeys(existing))
+                seen = set(merged)
+                for x in add_avoid:
+                    if x not in seen:
+                        seen.add(x)
+                        merged.append(x)
+                if merged != constraints_src.get("must_avoid"):
+                    updates["constraints"] = {**updates.get("constraints", constraints_src), "must_avoid": merged}
 
             # Override tone label (optional)
             override_tone = res.get("override_tone_label")
             if override_tone and isinstance(override_tone, str) and override_tone.strip():
-                tone_params["tone_label"] = override_tone.strip()
+                if override_tone.strip() != tone_params_src.get("tone_label"):
+                    updates["tone_params"] = {**tone_params_src, "tone_label": override_tone.strip()}
 
-            return {"constraints": constraints, "tone_params": tone_params}
+            return updates
 
         # ---- Register nodes ----
         builder.add_node("input_parser", input_parser_node)
         builder.add_node("intent_detection", intent_detection_node)
         builder.add_node("tone_stylist", tone_stylist_node)
+        builder.add_node("pre_draft_join", pre_draft_join_node, defer=True)
         builder.add_node("draft_writer", draft_writer_node)
+        builder.add_node("profile_prefetch", profile_prefetch_node)
         builder.add_node("personalization", personalization_node)
         builder.add_node("review_validator", review_validator_node)
         builder.add_node("memory", memory_node)
         builder.add_node("bump_retry", bump_retry_node)
         builder.add_node("apply_revision_hints", apply_revision_hints_node)
+        builder.add_node("polish_draft", polish_draft_node)
 
         # Linear flow (first pass)
         builder.set_entry_point("input_parser")
@@ -145,38 +240,50 @@ class EmailWorkflow:
         def input_parser_router(state: AgentState):
             """
             Routes based on whether the input parser determined
-            that clarification is required.
+            that clarification is required. Otherwise intent detection and
+            tone styling fan out in parallel (independent LLM calls writing
+            disjoint keys) and meet again at pre_draft_join; either is skipped
+            when run_query already seeded it from a UI override.
             """
-            if state.get("requires_clarification"):
-                return END
-            return "intent_detection"
+            if not state.get("requires_clarification"):  # common case first
+                pending = []
+                if state.get("intent_source") != "ui":
+                    pending.append("intent_detection")
+                if state.get("tone_source") != "ui":
+                    pending.append("tone_stylist")
+                return pending or DRAFT_BRANCHES
+            return END
 
         builder.add_conditional_edges(
             "input_parser",
             input_parser_router,
-            {
-                "intent_detection": "intent_detection",
-                END: END,
-            },
+            ["intent_detection", "tone_stylist", *DRAFT_BRANCHES, END],
         )
 
-        builder.add_edge("intent_detection", "tone_stylist")
-        builder.add_edge("tone_stylist", "draft_writer")
+        builder.add_edge("intent_detection", "pre_draft_join")
+        builder.add_edge("tone_stylist", "pre_draft_join")
+        # The profile/memory prefetch only needs parsed input, so it runs alongside the draft;
+        # personalization starts once both have finished (same superstep, so it runs once)
+        for branch in DRAFT_BRANCHES:
+            builder.add_edge("pre_draft_join", branch)
         builder.add_edge("draft_writer", "personalization")
+        builder.add_edge("profile_prefetch", "personalization")
         builder.add_edge("personalization", "review_validator")
 
         # Conditional retry on validation
+        # ReviewValidatorAgent stores status upper-cased; anything but FAIL (PASS, BLOCKED, missing) moves on
         def validation_router(state: AgentState):
-            report = state.get("validation_report", {}) or {}
-            status = (report.get("status") or "").upper()
-            if status == "FAIL":
-                return "bump_retry"
-            return "memory"
+            report = state.get("validation_report") or {}
+            return VALIDATION_ROUTES.get(report.get("status"), "memory")
 
         def retry_router(state: AgentState):
-            if (state.get("retry_count") or 0) < 2:
-                return "apply_revision_hints"
-            return "memory"
+            if (state.get("retry_count") or 0) >= MAX_RETRIES:
+                return "memory"
+            # Minor grammar/clarity fixes only: edit the finished draft in place with the
+            # deterministic model instead of redrafting (creative) and re-personalizing
+            if needs_only_polish(state.get("validation_report") or {}):
+                return "polish_draft"
+            return "apply_revision_hints"
 
         builder.add_conditional_edges(
             "review_validator",
@@ -192,9 +299,11 @@ class EmailWorkflow:
             retry_router,
             {
                 "apply_revision_hints": "apply_revision_hints",
+                "polish_draft": "polish_draft",
                 "memory": "memory",
             },
         )
+        builder.add_edge("polish_draft", "review_validator")
 
         builder.add_edge("apply_revision_hints", "draft_writer")
         builder.add_edge("memory", END)
@@ -209,8 +318,79 @@ class EmailWorkflow:
             self.logger.error(f"Failed to initialize checkpointing: {e}")
             self.app = builder.compile()
 
-    
+    # ----------------------------------------------------------------------
+    # Agents, constructed on first use: runs that short-circuit (clarification,
+    # UI overrides for intent/tone, PASS on the first draft) never build the rest
+    # ----------------------------------------------------------------------
+    @cached_property
+    def input_parser(self) -> InputParsingAgent:
+        return InputParsingAgent(self.deterministic_llm, self.logger)
+
+    @cached_property
+    def intent_detector(self) -> IntentDetectionAgent:
+        return IntentDetectionAgent(self.deterministic_llm, self.logger, response_cache=self.classifier_cache)
+
+    @cached_property
+    def tone_stylist(self) -> ToneStylistAgent:
+        return ToneStylistAgent(self.deterministic_llm, self.logger, response_cache=self.classifier_cache)
+
+    @cached_property
+    def draft_writer(self) -> DraftWriterAgent:
+        return DraftWriterAgent(
+            self.creative_llm,
+            self.logger,
+            EmailTemplateEngine(self.template_store),
+            draft_cache=self.draft_cache,
+            simple_llm=self.deterministic_llm,
+        )
+
+    @cached_property
+    def personalizer(self) -> PersonalizationAgent:
+        return PersonalizationAgent(self.deterministic_llm, self.logger, self.profile_store, self.memory_store)
+
+    @cached_property
+    def validator(self) -> ReviewValidatorAgent:
+        return ReviewValidatorAgent(self.deterministic_llm, self.logger)
+
+    @cached_property
+    def polisher(self) -> DraftPolishAgent:
+        return DraftPolishAgent(self.deterministic_llm, self.logger)
+
+    @cached_property
+    def memory_agent(self) -> MemoryAgent:
+        return MemoryAgent(self.deterministic_llm, self.logger, memory_store=self.memory_store)
+
+    async def _persist_memory(self, state: AgentState, thread: Dict[str, Any]) -> None:
+        async with self._memory_slots:
+            try:
+                response = await self.memory_agent.run(state)
+                if response.messages:
+                    # The run has already returned: add the agent's reply to the thread's
+                    # checkpointed history as the memory node's write
+                    await self.app.aupdate_state(thread, {"messages": response.messages}, as_node="memory")
+            except Exception as e:
+                self.logger.error(f"Background memory write failed: {e}")
+
+    def _forget_memory_write(self, thread_id: str, task: asyncio.Task) -> None:
+        if self._memory_by_thread.get(thread_id) is task:
+            del self._memory_by_thread[thread_id]
+
+    async def _await_thread_memory(self, config: Dict[str, Any]) -> None:
+        """
+        Wait for the thread's pending memory write: its reply is written back into the thread's
+        checkpoint, which must land before the next run on that thread starts from it.
+        """
+        task = self._memory_by_thread.get(config["configurable"]["thread_id"])
+        if task is not None:
+            await asyncio.gather(task, return_exceptions=True)
+
+    async def drain_memory_writes(self) -> None:
+        """Wait for background memory writes started by earlier runs."""
+        if self._memory_tasks:
+            await asyncio.gather(*list(self._memory_tasks), return_exceptions=True)
+
     def close(self):
+        self.db_pool.close()
         try:
             if hasattr(self, "_ckpt_con"):
                 self._ckpt_con.close()
@@ -219,6 +399,15 @@ class EmailWorkflow:
             self.logger.error(f"Error closing checkpointing connection: {e}")
             pass
 
+    async def aclose(self):
+        """
+        Finish pending memory writes and semantic-cache stores, then close(), plus the shared
+        LLM HTTP client (must run on the loop that used it).
+        """
+        await asyncio.gather(self.drain_memory_writes(), self.classifier_cache.drain(), self.draft_cache.drain())
+        await aclose_http_client()
+        self.close()
+
     # ----------------------------------------------------------------------
     # 4. UI-facing entry point
     # ----------------------------------------------------------------------
@@ -227,112 +416,187 @@ class EmailWorkflow:
         user_input: str,
         tone: str | None = None,
         intent: str | None = None,
-        metadata: dict | None = None
+        metadata: dict | None = None,
+        metadata_json: str | None = None,
+        session_id: str | None = None,
     ) -> Dict[str, Any]:
-    
-        self.logger.debug(
-            "run_query inputs: user_input_len=%d tone=%r intent=%r metadata_keys=%s",
-            len(user_input or ""),
-            tone,
-            intent,
-            sorted(metadata.keys()) if isinstance(metadata, dict) else None,
-        )
+        initial_state, config = self._prepare_run(user_input, tone, intent, metadata, metadata_json, session_id)
+        await self._await_thread_memory(config)
+        final_state = await self.app.ainvoke(initial_state, config=config)
+        return self._finalize_run(final_state)
+
+    async def run_queries(self, queries: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """
+        Run several queries concurrently (each item holds run_query keyword arguments).
+        Each runs in its own task, so ECIDs and checkpoint threads stay per-query.
+        """
+        return list(await asyncio.gather(*(self.run_query(**q) for q in queries)))
+
+    async def run_query_stream(
+        self,
+        user_input: str,
+        tone: str | None = None,
+        intent: str | None = None,
+        metadata: dict | None = None,
+        metadata_json: str | None = None,
+        session_id: str | None = None,
+    ) -> AsyncIterator[Tuple[str, Any]]:
+        """
+        Same run as run_query, but yields events while the graph executes:
+          ("restart", None)  - draft_writer started a new pass (validation retry); discard prior tokens
+          ("token", str)     - next chunk of draft text from draft_writer
+          ("result", dict)   - final response (same shape as run_query), always last
+        """
+        initial_state, config = self._prepare_run(user_input, tone, intent, metadata, metadata_json, session_id)
+        await self._await_thread_memory(config)
+
+        final_state: Dict[str, Any] = initial_state
+        draft_step = None
+        async for mode, chunk in self.app.astream(
+            initial_state, config=config, stream_mode=["messages", "values"]
+        ):
+            if mode == "values":
+                final_state = chunk
+                continue
+
+            message, meta = chunk
+            if meta.get("langgraph_node") != "draft_writer" or not isinstance(message, AIMessage):
+                continue
+            if meta.get("langgraph_step") != draft_step:
+                draft_step = meta.get("langgraph_step")
+                yield "restart", None
+            if isinstance(message.content, str) and message.content:
+                yield "token", message.content
+
+        yield "result", self._finalize_run(final_state)
+
+    def _prepare_run(
+        self,
+        user_input: str,
+        tone: str | None,
+        intent: str | None,
+        metadata: dict | None,
+        metadata_json: str | None = None,
+        session_id: str | None = None,
+    ) -> Tuple[AgentState, Dict[str, Any]]:
+        """
+        metadata_json: the caller's serialized form of `metadata` (e.g. a raw HTTP body), used verbatim
+        in the prompt instead of re-serializing the dict. If only the string is given, it is parsed.
+        session_id: caller's conversation id (e.g. one per browser session). The checkpointed thread is
+        per user and session, so callers sharing one workflow never see each other's history.
+        """
+        if metadata is None and metadata_json:
+            metadata = json.loads(metadata_json)
+        debug = self.logger.isEnabledFor(logging.DEBUG)
+        if debug:
+            self.logger.debug(
+                "run_query inputs: user_input_len=%d tone=%r intent=%r metadata_keys=%s",
+                len(user_input or ""),
+                tone,
+                intent,
+                sorted(metadata.keys()) if isinstance(metadata, dict) else None,
+            )
         #initialize ecid for tracing
-        ecid_var.set(uuid.uuid7().hex[:12])
-        # Normalize optional inputs
-        tone_params = {}
-        if tone and tone.strip() and tone.strip().lower() not in {"(auto)", "auto", "none"}:
-            tone_params = {"tone_label": tone.strip()}
+        ecid_var.set(f"{_ECID_PREFIX}{next(_ECID_COUNTER):08x}")
+        # Normalize optional inputs ("auto"/"none" mean no override)
+        tone_label = tone.strip() if tone and tone.strip().lower() not in AUTO_VALUES else ""
+        intent_override = intent.strip() if intent and intent.strip().lower() not in AUTO_VALUES else ""
 
         metadata_dict = metadata if isinstance(metadata, dict) else {}
 
-        user_id = "default" #for personalization
-        messages = []
-        initial_constraints: Dict[str, Any] = {}
-        recipient = {}
-
-        if metadata_dict:
-            initial_constraints.update(metadata_dict)
-            user_id = (metadata.get("user_id") or user_id)
-            if "recipient" in metadata_dict and isinstance(metadata_dict["recipient"], dict):
-                recipient = normalize_recipient(recipient, metadata_dict["recipient"])
-            messages.append(SystemMessage(content=f"METADATA (authoritative): {json.dumps(metadata)}"))
+        initial_constraints: Dict[str, Any] = dict(metadata_dict)
         if intent:
             # Optional: keep the UI override visible in state for debugging
             initial_constraints["intent_override"] = intent
         if tone:
             initial_constraints["tone_override"] = tone
 
-        # Optional: make UI overrides explicit too
-        if tone:
-            messages.append(SystemMessage(content=f"TONE OVERRIDE (authoritative): {tone}"))
-        if intent:
-            messages.append(SystemMessage(content=f"INTENT OVERRIDE (authoritative): {intent}"))
-
+        # Per-request context goes in one user-role message ahead of the request, so the
+        # system-role prefix of every agent prompt stays static (providers cache prompt prefixes;
+        # litellm hoists system messages into the Anthropic system block). The request itself
+        # remains the most recent HumanMessage, as the agent prompts expect.
+        # Canonical (sorted, compact) metadata JSON: identical metadata yields an identical prompt
+        # prefix regardless of key order, and doubles as the cache key for the context text.
+        if not metadata_dict:
+            metadata_json = ""
+        elif not metadata_json:
+            metadata_json = fastjson.dumps(metadata_dict, sort_keys=True)
+        context = _request_context(metadata_json, tone or "", intent or "")
+        messages = [HumanMessage(content=context)] if context else []
         messages.append(HumanMessage(content=user_input))
 
+        # UI overrides are authoritative: seed them so the graph can skip those nodes
         initial_state: AgentState = {
             "messages": messages,
             "raw_input": user_input,
             "requires_clarification": False,
             "parsed_input": {},
             "constraints": initial_constraints,   # <-- now includes optional metadata/overrides
-            "intent": "",               
-            "intent_confidence": 0.0,
-            "intent_source": "",
-            "tone_source": "",             
-            "user_intent_override": "",      
-            "tone_params": tone_params,           # <-- UI override if provided
+            "intent": intent_override,
+            "intent_confidence": 1.0 if intent_override else 0.0,
+            "intent_source": "ui" if intent_override else "",
+            "tone_source": "ui" if tone_label else "",
+            "user_intent_override": intent_override,
+            "tone_params": {"tone_label": tone_label} if tone_label else {},   # <-- UI override if provided
             "draft": "",
             "personalized_draft": "",
-            "user_id": user_id,
+            "user_id": metadata_dict.get("user_id") or "default",   # for personalization
             "user_context": {},
             "memory_updates": {},
             "is_valid": True,
             "validation_report": {},
             "retry_count": 0,
+            "personalization_prefetch": {},
         }
 
-        if intent and intent.lower() not in {"auto", "(auto)"}:
-            initial_state["user_intent_override"] = intent.strip()
-
-        self.logger.debug(
-            "run_query initial_state keys=%s intent_source=%r user_intent_override=%r id=%s",
-            sorted(initial_state.keys()),
-            initial_state.get("intent_source"),
-            initial_state.get("user_intent_override"),
-            id(self),
-        )
-
-        thread_id =create_session_id(user_id)
-
-        final_state = await self.app.ainvoke(
-            initial_state,
-            config={"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
-        )
-
-        if hasattr(self.checkpointer, 'storage'):
-            checkpoints = list(self.checkpointer.storage.keys())
-            self.logger.debug(f"Checkpoints after query: {checkpoints}")
-            self.logger.debug(f"Total checkpoints: {len(self.checkpointer.storage)}")
-
-        debug_snapshot = {
-            "intent": final_state.get("intent"),
-            "intent_confidence": final_state.get("intent_confidence"),
-            "intent_source": final_state.get("intent_source"),
-            "tone_source": final_state.get("tone_source"),
-            "tone_label": (final_state.get("tone_params") or {}).get("tone_label"),
-            "template_id": final_state.get("template_id"),
-            "template_plan": final_state.get("template_plan"),
-            "user_id": final_state.get("user_id"),
-            "draft_len": len(final_state.get("draft") or ""),
-            "personalized_draft_len": len(final_state.get("personalized_draft") or ""),
-            "retry_count": final_state.get("retry_count"),
-            "is_valid": final_state.get("is_valid"),
-            "validation_status": (final_state.get("validation_report") or {}).get("status"),
-        }
+        if debug:
+            self.logger.debug(
+                "run_query initial_state keys=%s intent_source=%r user_intent_override=%r id=%s",
+                sorted(initial_state.keys()),
+                initial_state.get("intent_source"),
+                initial_state.get("user_intent_override"),
+                id(self),
+            )
+
+        user_id = initial_state["user_id"]
+        thread_id = create_session_id(f"{user_id}:{session_id}" if session_id else user_id)
+        self._touch_thread(thread_id)
+        return initial_state, {"configurable": {"thread_id": thread_id}, "recursion_limit": 50}
+
+    def _touch_thread(self, thread_id: str) -> None:
+        """Mark thread_id as used; past MAX_CHECKPOINT_THREADS the stalest thread's checkpoints are deleted."""
+        self._threads[thread_id] = None
+        self._threads.move_to_end(thread_id)
+        while len(self._threads) > MAX_CHECKPOINT_THREADS:
+            stale, _ = self._threads.popitem(last=False)
+            if getattr(self, "checkpointer", None) is not None:
+                self.checkpointer.delete_thread(stale)
+
+    def _finalize_run(self, final_state: Dict[str, Any]) -> Dict[str, Any]:
+        # Snapshot is only built when DEBUG is on; it is pure overhead otherwise
+        if self.logger.isEnabledFor(logging.DEBUG):
+            if hasattr(self.checkpointer, 'storage'):
+                checkpoints = list(self.checkpointer.storage.keys())
+                self.logger.debug(f"Checkpoints after query: {checkpoints}")
+                self.logger.debug(f"Total checkpoints: {len(self.checkpointer.storage)}")
+
+            debug_snapshot = {
+                "intent": final_state.get("intent"),
+                "intent_confidence": final_state.get("intent_confidence"),
+                "intent_source": final_state.get("intent_source"),
+                "tone_source": final_state.get("tone_source"),
+                "tone_label": (final_state.get("tone_params") or {}).get("tone_label"),
+                "template_id": final_state.get("template_id"),
+                "template_plan": final_state.get("template_plan"),
+                "user_id": final_state.get("user_id"),
+                "draft_len": len(final_state.get("draft") or ""),
+                "personalized_draft_len": len(final_state.get("personalized_draft") or ""),
+                "retry_count": final_state.get("retry_count"),
+                "is_valid": final_state.get("is_valid"),
+                "validation_status": (final_state.get("validation_report") or {}).get("status"),
+            }
 
-        self.logger.debug("Workflow end snapshot=%s", debug_snapshot)
+            self.logger.debug("Workflow end snapshot=%s", debug_snapshot)
 
         return {
             "draft": final_state.get("personalized_draft") or final_state.get("draft"),
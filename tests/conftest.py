@@ -0,0 +1,20 @@
+import asyncio
+import os
+
+import pytest
+
+# src.utils.sessionid (imported by the workflow) refuses to load without a salt
+os.environ.setdefault("SECRET_SALT", "test-salt")
+
+try:
+    import uvloop
+except ImportError:  # optional: tests run on the stock asyncio loop without it
+    uvloop = None
+
+
+@pytest.fixture(scope="session")
+def event_loop_policy():
+    # The agents' chains are stubbed, so loop scheduling is most of an async test's cost
+    if uvloop is not None:
+        return uvloop.EventLoopPolicy()
+    return asyncio.get_event_loop_policy()
@@ -0,0 +1,111 @@
+import pytest
+
+from src.memory.sqlite_draft_cache import SQLiteDraftCache
+
+
+VECTORS = {
+    "ask my manager for a meeting next week": [1.0, 0.0, 0.0],
+    "ask my boss for a meeting next week": [0.99, 0.05, 0.0],
+    "thank the recruiter for the interview": [0.0, 1.0, 0.0],
+    "ask my manager for a meeting on the 3rd": [0.0, 0.0, 1.0],
+    "ask my boss for a meeting on the 5th": [0.0, 0.01, 0.99],
+    "tell my manager I can attend the meeting": [0.6, 0.8, 0.0],
+    "tell my manager I can't attend the meeting": [0.6, 0.79, 0.01],
+}
+
+
+async def fake_embed(text):
+    return VECTORS[text]
+
+
+def _key(**overrides):
+    args = {
+        "intent": "scheduling",
+        "tone_params": {"tone_label": "formal"},
+        "constraints": {"must_include": ["agenda", "deadline"]},
+        "parsed_input": {"recipient": {"role": "Manager"}},
+    }
+    args.update(overrides)
+    return SQLiteDraftCache.make_key(**args)
+
+
+@pytest.mark.asyncio
+async def test_draft_cache_hits_on_paraphrase_with_same_key(tmp_path):
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=fake_embed)
+
+    await cache.store(_key(), "ask my manager for a meeting next week", "Subject: Meeting")
+
+    assert await cache.lookup(_key(), "ask my boss for a meeting next week") == "Subject: Meeting"
+
+
+@pytest.mark.asyncio
+async def test_draft_cache_misses_on_dissimilar_text_or_different_key(tmp_path):
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=fake_embed)
+
+    await cache.store(_key(), "ask my manager for a meeting next week", "Subject: Meeting")
+
+    assert await cache.lookup(_key(), "thank the recruiter for the interview") is None
+    assert await cache.lookup(_key(tone_params={"tone_label": "friendly"}), "ask my manager for a meeting next week") is None
+    assert await cache.lookup(_key(constraints={"must_include": ["agenda"]}), "ask my manager for a meeting next week") is None
+
+
+@pytest.mark.asyncio
+async def test_draft_cache_misses_when_numbers_or_negations_differ(tmp_path):
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=fake_embed)
+
+    await cache.store(_key(), "ask my manager for a meeting on the 3rd", "Subject: Meeting on the 3rd")
+    await cache.store(_key(), "tell my manager I can attend the meeting", "Subject: Attending")
+
+    assert await cache.lookup(_key(), "ask my boss for a meeting on the 5th") is None
+    assert await cache.lookup(_key(), "tell my manager I can't attend the meeting") is None
+    assert await cache.lookup(_key(), "tell my manager I can attend the meeting") == "Subject: Attending"
+
+
+def test_draft_cache_key_includes_recipient_name():
+    assert _key(parsed_input={"recipient": {"role": "Manager", "name": "Sam"}}) != _key(
+        parsed_input={"recipient": {"role": "Manager", "name": "Alex"}}
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "overrides",
+    [
+        {"parsed_input": {"recipient": {"role": "Manager"}, "primary_request": "Reject the budget request"}},
+        {"constraints": {"must_include": ["agenda", "deadline"], "length": "short"}},
+        {"constraints": {"must_include": ["agenda", "deadline"], "use_bullets": True, "bullet_count": 3}},
+        {"constraints": {"must_include": ["agenda", "deadline"], "format": "bulleted"}},
+        {"constraints": {"must_include": ["agenda", "deadline"], "audience": "executives"}},
+    ],
+    ids=["primary_request", "length", "bullets", "format", "audience"],
+)
+async def test_draft_cache_misses_when_the_ask_or_format_differs(tmp_path, overrides):
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=fake_embed)
+    stored = {"parsed_input": {"recipient": {"role": "Manager"}, "primary_request": "Approve the budget request"}}
+    await cache.store(_key(**stored), "ask my manager for a meeting next week", "Subject: Approved")
+
+    # Same paraphrase, same key otherwise: a hit
+    assert await cache.lookup(_key(**stored), "ask my boss for a meeting next week") == "Subject: Approved"
+    assert await cache.lookup(_key(**{**stored, **overrides}), "ask my boss for a meeting next week") is None
+
+
+def test_draft_cache_key_normalizes_the_primary_request():
+    a = _key(parsed_input={"primary_request": "Approve the budget request."})
+    b = _key(parsed_input={"primary_request": "  approve  the Budget request"})
+    assert a == b
+
+
+def test_draft_cache_key_ignores_list_order_and_role_case():
+    a = _key(constraints={"must_include": ["agenda", "deadline"]}, parsed_input={"recipient": {"role": "Manager"}})
+    b = _key(constraints={"must_include": ["deadline", "agenda"]}, parsed_input={"recipient": {"role": " manager"}})
+    assert a == b
+
+
+@pytest.mark.asyncio
+async def test_draft_cache_keeps_newest_entries_per_key(tmp_path):
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=fake_embed, max_entries_per_key=1)
+
+    await cache.store(_key(), "ask my manager for a meeting next week", "old")
+    await cache.store(_key(), "ask my manager for a meeting next week", "new")
+
+    assert await cache.lookup(_key(), "ask my manager for a meeting next week") == "new"
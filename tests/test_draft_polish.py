@@ -0,0 +1,44 @@
+import pytest
+
+from src.agents.draft_polish_agent import DraftPolishAgent, needs_only_polish
+from tests.utils.fakes import FakeChain
+from tests.utils.mock_llm import MOCK_LLM
+
+
+class DummyLogger:
+    def debug(self, *args, **kwargs): pass
+    def info(self, *args, **kwargs): pass
+
+
+def test_needs_only_polish_requires_minor_grammar_or_clarity_issues():
+    minor = {"category": "grammar", "severity": "low"}
+    assert needs_only_polish({"issues": [minor, {"category": "Clarity", "severity": "medium"}]})
+    assert not needs_only_polish({"issues": []})
+    assert not needs_only_polish({"issues": [minor, {"category": "tone", "severity": "low"}]})
+    assert not needs_only_polish({"issues": [{"category": "grammar", "severity": "high"}]})
+
+
+@pytest.mark.asyncio
+async def test_polish_replaces_personalized_draft_with_model_output():
+    agent = DraftPolishAgent(llm=MOCK_LLM, logger=DummyLogger())
+    agent.agent = FakeChain("Hi Sam,\n\nThanks for your help.\n\nBest,\nPeter")
+
+    state = {
+        "personalized_draft": "Hi Sam,\n\nThank for you help.\n\nBest,\nPeter",
+        "validation_report": {"status": "FAIL", "issues": [{"category": "grammar", "severity": "low"}]},
+    }
+    _, updates = await agent._execute(state)
+
+    assert updates["personalized_draft"].startswith("Hi Sam,\n\nThanks for your help.")
+    assert agent.agent.last_input["messages"][0].content == state["personalized_draft"]
+    assert "grammar" in agent.agent.last_input["state_json"]
+
+
+@pytest.mark.asyncio
+async def test_polish_keeps_draft_on_empty_output():
+    agent = DraftPolishAgent(llm=MOCK_LLM, logger=DummyLogger())
+    agent.agent = FakeChain("   ")
+
+    _, updates = await agent._execute({"draft": "Hello", "validation_report": {}})
+
+    assert updates["personalized_draft"] == "Hello"
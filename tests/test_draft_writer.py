@@ -1,10 +1,14 @@
+import asyncio
+
 import pytest
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableLambda
 
 from src.agents.draft_writer_agent import DraftWriterAgent
+from src.memory.sqlite_draft_cache import SQLiteDraftCache
 from src.templates.engine import EmailTemplateEngine
+from tests.utils.fakes import FakeChain
 from tests.utils.mock_llm import MOCK_LLM
 
 
@@ -16,18 +20,6 @@ class DummyLogger:
         pass
 
 
-class FakeChain:
-    """Captures payload passed to .ainvoke and returns a fixed AIMessage."""
-
-    def __init__(self, response_text: str):
-        self.response_text = response_text
-        self.last_input = None
-
-    async def ainvoke(self, inp):
-        self.last_input = inp
-        return AIMessage(content=self.response_text)
-
-
 class DummyStore:
     def __init__(self, tpl=None):
         self.tpl = tpl
@@ -136,3 +128,120 @@ async def test_draft_writer_provides_non_empty_state_json_to_model():
     sj = fake.last_input.get("state_json")
     assert isinstance(sj, str)
     assert sj.strip()  # non-empty
+
+
+class DummyDraftCache:
+    def __init__(self, cached=None):
+        self.cached = cached
+        self.stored = []
+
+    def make_key(self, **kwargs):
+        return "key"
+
+    async def lookup(self, cache_key, raw_input):
+        return self.cached
+
+    async def store(self, cache_key, raw_input, draft):
+        self.stored.append((cache_key, raw_input, draft))
+
+    def store_in_background(self, cache_key, raw_input, draft):
+        self.stored.append((cache_key, raw_input, draft))
+        return asyncio.get_running_loop().create_task(asyncio.sleep(0))
+
+
+@pytest.mark.asyncio
+async def test_draft_writer_uses_semantic_cache_on_first_pass_only():
+    engine = EmailTemplateEngine(DummyStore(None))
+    cache = DummyDraftCache(cached="Subject: Cached\n\nHello")
+
+    writer = DraftWriterAgent(llm=MOCK_LLM, logger=DummyLogger(), template_engine=engine, draft_cache=cache)
+    fake = FakeChain("Subject: Fresh\n\nHello")
+    writer.agent = fake
+
+    state = {
+        "messages": [HumanMessage(content="Write an email asking for help.")],
+        "raw_input": "Write an email asking for help.",
+        "intent": "request",
+        "retry_count": 0,
+    }
+
+    _, updates = await writer._execute(state)
+    assert updates["draft"].startswith("Subject: Cached")
+    assert fake.last_input is None  # LLM skipped
+
+    # Retries follow revision instructions, so they always call the model
+    _, updates = await writer._execute({**state, "retry_count": 1})
+    assert updates["draft"].startswith("Subject: Fresh")
+    assert cache.stored == []
+
+
+@pytest.mark.asyncio
+async def test_draft_writer_stores_draft_on_cache_miss():
+    engine = EmailTemplateEngine(DummyStore(None))
+    cache = DummyDraftCache(cached=None)
+
+    writer = DraftWriterAgent(llm=MOCK_LLM, logger=DummyLogger(), template_engine=engine, draft_cache=cache)
+    writer.agent = FakeChain("Subject: Fresh\n\nHello")
+
+    state = {
+        "messages": [HumanMessage(content="Write an email asking for help.")],
+        "raw_input": "Write an email asking for help.",
+        "intent": "request",
+    }
+
+    await writer._execute(state)
+    assert cache.stored == [("key", "Write an email asking for help.", "Subject: Fresh\n\nHello")]
+
+
+@pytest.mark.asyncio
+async def test_draft_writer_returns_before_the_cache_store_finishes(tmp_path):
+    embedded = asyncio.Event()
+
+    async def slow_embed(text):
+        await asyncio.sleep(0.2)
+        embedded.set()
+        return [1.0, 0.0]
+
+    engine = EmailTemplateEngine(DummyStore(None))
+    cache = SQLiteDraftCache(str(tmp_path / "test.db"), embed=slow_embed)
+    writer = DraftWriterAgent(llm=MOCK_LLM, logger=DummyLogger(), template_engine=engine, draft_cache=cache)
+    writer.agent = FakeChain("Subject: Fresh\n\nHello")
+
+    state = {
+        "messages": [HumanMessage(content="Write an email asking for help.")],
+        "raw_input": "Write an email asking for help.",
+        "intent": "request",
+    }
+
+    _, updates = await writer._execute(state)
+    assert updates["draft"].startswith("Subject: Fresh")
+    assert not embedded.is_set()
+
+    await cache.drain()
+    assert await cache.lookup(cache.make_key(intent="request", tone_params={}, constraints={}, parsed_input={}), state["raw_input"])
+
+
+@pytest.mark.asyncio
+async def test_draft_writer_uses_simple_model_for_confident_simple_intents():
+    engine = EmailTemplateEngine(DummyStore(None))
+    writer = DraftWriterAgent(llm=MOCK_LLM, logger=DummyLogger(), template_engine=engine, simple_llm=MOCK_LLM)
+    creative = FakeChain("creative draft")
+    simple = FakeChain("simple draft")
+    writer.agent = creative
+    writer.simple_agent = simple
+
+    state = {
+        "messages": [HumanMessage(content="Thank Sam for the intro.")],
+        "intent": "thank_you",
+        "intent_confidence": 0.95,
+    }
+    _, updates = await writer._execute(state)
+    assert updates["draft"] == "simple draft"
+    assert updates["draft_model_tier"] == "simple"
+
+    _, updates = await writer._execute({**state, "intent_confidence": 0.6})
+    assert updates["draft"] == "creative draft"
+    assert updates["draft_model_tier"] == "creative"
+
+    _, updates = await writer._execute({**state, "intent": "apology"})
+    assert updates["draft"] == "creative draft"
@@ -0,0 +1,25 @@
+import json
+from datetime import date
+
+import pytest
+
+from src.utils import fastjson
+
+
+def test_dumps_is_compact_sorted_and_matches_stdlib():
+    obj = {"b": [1, 2], "a": {"é": "ü"}, "when": date(2024, 1, 2)}
+
+    out = fastjson.dumps(obj, sort_keys=True)
+
+    assert out == json.dumps(obj, sort_keys=True, separators=(",", ":"), ensure_ascii=False, default=str)
+
+
+def test_dumps_bytes_handles_values_orjson_rejects():
+    assert json.loads(fastjson.dumps_bytes({"n": 2**70, 1: "x"})) == {"n": 2**70, "1": "x"}
+
+
+def test_loads_matches_stdlib_and_raises_like_it():
+    assert fastjson.loads('{"status": "PASS", "issues": [], "x": NaN}')["status"] == "PASS"
+    assert fastjson.loads(b'{"n": 1}') == {"n": 1}
+    with pytest.raises(json.JSONDecodeError):
+        fastjson.loads("**PASS** not json")
@@ -5,16 +5,7 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.agents.input_parser_agent import InputParsingAgent
-
-
-class StubRunnable:
-    """Minimal stub for self.agent that supports .ainvoke()."""
-
-    def __init__(self, content: str):
-        self._content = content
-
-    async def ainvoke(self, _input):
-        return AIMessage(content=self._content)
+from tests.utils.fakes import FakeChain
 
 
 @pytest.fixture
@@ -28,7 +19,7 @@ def logger():
 
 @pytest.fixture
 def parser_agent(logger):
-    # Dummy llm (won't be used because we overwrite agent.agent with StubRunnable)
+    # Dummy llm (won't be used because we overwrite agent.agent with FakeChain)
     dummy_llm = lambda x: AIMessage(content="{}")
     agent = InputParsingAgent(llm=dummy_llm, logger=logger)
     return agent
@@ -51,8 +42,8 @@ def _base_state(**overrides):
 
 @pytest.mark.asyncio
 async def test_input_parser_success_no_clarification(parser_agent):
-    parser_agent.agent = StubRunnable(
-        content=json.dumps(
+    parser_agent.agent = FakeChain(
+        json.dumps(
             {
                 "requires_clarification": False,
                 "clarification_questions": [],
@@ -85,8 +76,8 @@ async def test_input_parser_success_no_clarification(parser_agent):
 
 @pytest.mark.asyncio
 async def test_input_parser_requires_clarification(parser_agent):
-    parser_agent.agent = StubRunnable(
-        content=json.dumps(
+    parser_agent.agent = FakeChain(
+        json.dumps(
             {
                 "requires_clarification": True,
                 "clarification_questions": [
@@ -119,7 +110,7 @@ async def test_input_parser_requires_clarification(parser_agent):
 @pytest.mark.asyncio
 async def test_input_parser_non_json_fails_soft(parser_agent):
     # Non-JSON output (common LLM failure) should not crash the graph.
-    parser_agent.agent = StubRunnable(content="**PASS** Not JSON.")
+    parser_agent.agent = FakeChain("**PASS** Not JSON.")
 
     state = _base_state()
     msgs, updates = await parser_agent._execute(state)
@@ -144,8 +135,8 @@ async def test_input_parser_does_not_overwrite_ui_tone(parser_agent):
     This enforces your architectural choice:
     InputParsingAgent should NOT clobber UI-provided tone_params.
     """
-    parser_agent.agent = StubRunnable(
-        content=json.dumps(
+    parser_agent.agent = FakeChain(
+        json.dumps(
             {
                 "requires_clarification": False,
                 "clarification_questions": [],
@@ -4,6 +4,7 @@ from langchain_core.messages import HumanMessage
 
 from src.agents.memory_agent import MemoryAgent
 from src.agents.personalization_agent import PersonalizationAgent
+from tests.utils.fakes import FakeChain
 from tests.utils.mock_llm import MOCK_LLM
 from src.utils.recipient import compute_recipient_key
 
@@ -15,28 +16,12 @@ class DummyLogger:
     def error(self, *args, **kwargs): pass
 
 
-class FakeResp:
-    def __init__(self, content: str):
-        self.content = content
-
-
-class FakeChain:
-    """Simple fake Runnable/Chain that returns fixed .content and captures input."""
-    def __init__(self, content: str):
-        self._content = content
-        self.last_input = None
-
-    async def ainvoke(self, input_, config=None):
-        self.last_input = input_
-        return FakeResp(self._content)
-
-
 class InMemoryStore:
     """Test double matching your sqlite_memory_store interface."""
     def __init__(self):
         self._data = {}
 
-    def get_past_summary(self, user_id: str, recipient_key: str):
+    def get_past_summary(self, user_id: str, recipient_key: str, legacy_key=None):
         return self._data.get((user_id, recipient_key))
 
     def upsert_summary(self, user_id: str, recipient_key: str, summary):
@@ -0,0 +1,42 @@
+import hashlib
+import sqlite3
+
+from src.memory.sqlite_memory_store import SQLiteMemoryStore
+from src.utils.recipient import compute_legacy_recipient_key, compute_recipient_key
+
+RECIPIENT = {"email": None, "name": "Sam Lee", "org": "Acme", "role": "Manager", "relationship": None}
+
+
+def test_legacy_recipient_key_is_the_truncated_sha256_key():
+    digest = hashlib.sha256("sam lee|acme|manager".encode("utf-8")).hexdigest()[:16]
+    assert compute_legacy_recipient_key(RECIPIENT) == f"hash:{digest}"
+    assert compute_legacy_recipient_key(RECIPIENT) != compute_recipient_key(RECIPIENT)
+    # email: keys never changed format
+    assert compute_legacy_recipient_key({**RECIPIENT, "email": "sam@acme.com"}) is None
+
+
+def test_summary_saved_under_legacy_key_is_found_and_rekeyed(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    store = SQLiteMemoryStore(db_path)
+    legacy_key = compute_legacy_recipient_key(RECIPIENT)
+    store.upsert_summary("u1", legacy_key, {"last_topic": "invoice"})
+
+    key = compute_recipient_key(RECIPIENT)
+    assert store.get_past_summary("u1", key) == {}
+    assert store.get_past_summary("u1", key, legacy_key=legacy_key) == {"last_topic": "invoice"}
+
+    # The row now lives under the current key
+    assert store.get_past_summary("u1", key) == {"last_topic": "invoice"}
+    with sqlite3.connect(db_path) as conn:
+        keys = [r[0] for r in conn.execute("SELECT recipient_key FROM email_summaries;")]
+    assert keys == [key]
+
+
+def test_current_key_wins_over_legacy_row(tmp_path):
+    store = SQLiteMemoryStore(str(tmp_path / "test.db"))
+    legacy_key = compute_legacy_recipient_key(RECIPIENT)
+    key = compute_recipient_key(RECIPIENT)
+    store.upsert_summary("u1", legacy_key, {"last_topic": "old"})
+    store.upsert_summary("u1", key, {"last_topic": "new"})
+
+    assert store.get_past_summary("u1", key, legacy_key=legacy_key) == {"last_topic": "new"}
@@ -1,9 +1,10 @@
 import pytest
-from langchain_core.messages import AIMessage, HumanMessage
+from langchain_core.messages import HumanMessage
 
 from src.agents.personalization_agent import PersonalizationAgent
 from src.profiles.sqlite_profile_store import SQLiteProfileStore
 from src.memory.sqlite_memory_store import SQLiteMemoryStore
+from tests.utils.fakes import FakeChain
 from tests.utils.mock_llm import MOCK_LLM
 
 class DummyLogger:
@@ -11,16 +12,6 @@ class DummyLogger:
     def info(self, *args, **kwargs): pass
 
 
-class FakeChain:
-    def __init__(self, response_text: str):
-        self.response_text = response_text
-        self.last_input = None
-
-    async def ainvoke(self, inp):
-        self.last_input = inp
-        return AIMessage(content=self.response_text)
-
-
 @pytest.mark.asyncio
 async def test_personalizer_loads_profile_and_updates_user_context(tmp_path):
     db = tmp_path / "test.db"
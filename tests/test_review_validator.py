@@ -1,46 +1,55 @@
 import json
+import logging
 import pytest
 
 from langchain_core.messages import AIMessage, HumanMessage
 from langchain_core.runnables import RunnableLambda
 
 from src.agents.review_validator_agent import ReviewValidatorAgent
+from tests.utils.fakes import FakeChain
 from tests.utils.mock_llm import MOCK_LLM
 
 
-class DummyLogger:
-    def debug(self, *args, **kwargs): pass
-    def info(self, *args, **kwargs): pass
-    def warning(self, *args, **kwargs): pass
-    def error(self, *args, **kwargs): pass
+# Real logger that drops everything: each call exits at the isEnabledFor check
+_NULL_LOGGER = logging.getLogger("test.review_validator")
+_NULL_LOGGER.addHandler(logging.NullHandler())
+_NULL_LOGGER.disabled = True
 
 
-class FakeChain:
-    """Async stub that mimics .ainvoke() and returns an AIMessage."""
-    def __init__(self, response_text: str):
-        self.response_text = response_text
-        self.last_input = None
+# Request messages reused across tests (the validator only reads them)
+_HM_EMAIL = HumanMessage(content="email")
+_HM_WRITE = HumanMessage(content="Write an email")
+_HM_WRITE_EMAIL = HumanMessage(content="write email")
 
-    async def ainvoke(self, inp):
-        self.last_input = inp
-        return AIMessage(content=self.response_text)
 
+# Keys of the reduced state_json the validator sends to the model
+_REDUCED_KEYS = frozenset({"draft", "tone_params", "intent", "constraints"})
 
-@pytest.mark.asyncio
-async def test_validator_pass_persists_revision_instructions_and_is_valid():  
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
 
-    model_json = {
+# Clean PASS reply shared by the tests that don't care about the report details
+_CLEAN_PASS_JSON = json.dumps(
+    {
         "status": "PASS",
         "summary": "Looks good.",
         "issues": [],
         "suggested_edits": {"apply_minor_fixes": True, "recommended_tone": None},
         "revision_instructions": "",
     }
-    agent.agent = FakeChain(json.dumps(model_json))
+)
+
+
+@pytest.fixture(scope="module")
+def validator_agent():
+    # Built once per module; each test installs its own FakeChain as .agent
+    return ReviewValidatorAgent(llm=MOCK_LLM, logger=_NULL_LOGGER)
+
+
+@pytest.mark.asyncio
+async def test_validator_pass_persists_revision_instructions_and_is_valid(validator_agent):  
+    validator_agent.agent = FakeChain(_CLEAN_PASS_JSON)
 
     state = {
-        "messages": [HumanMessage(content="write email")],
+        "messages": [_HM_WRITE_EMAIL],
         "draft": "Hello\n\nThanks,\nPeter",
         "personalized_draft": "Hello Jordan,\n\nThanks,\nPeter",
         "tone_params": {"tone_label": "formal"},
@@ -48,7 +57,7 @@ async def test_validator_pass_persists_revision_instructions_and_is_valid():
         "constraints": {"length": "short"},
     }
 
-    msgs, updates = await agent._execute(state)
+    msgs, updates = await validator_agent._execute(state)
 
     assert len(msgs) == 1
     assert "validation_report" in updates
@@ -61,9 +70,7 @@ async def test_validator_pass_persists_revision_instructions_and_is_valid():
 
 
 @pytest.mark.asyncio
-async def test_validator_fail_includes_revision_instructions_and_is_invalid():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_fail_includes_revision_instructions_and_is_invalid(validator_agent):
     model_json = {
         "status": "FAIL",
         "summary": "Tone is too aggressive.",
@@ -78,17 +85,17 @@ async def test_validator_fail_includes_revision_instructions_and_is_invalid():
         "suggested_edits": {"apply_minor_fixes": False, "recommended_tone": "professional"},
         "revision_instructions": "Rewrite the email with a calmer, professional tone; remove confrontational phrasing.",
     }
-    agent.agent = FakeChain(json.dumps(model_json))
+    validator_agent.agent = FakeChain(json.dumps(model_json))
 
     state = {
-        "messages": [HumanMessage(content="email")],
+        "messages": [_HM_EMAIL],
         "draft": "Fix this now or else.",
         "tone_params": {"tone_label": "assertive"},
         "intent": "request",
         "constraints": {},
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
 
     report = updates["validation_report"]
     assert report["status"] == "FAIL"
@@ -98,9 +105,7 @@ async def test_validator_fail_includes_revision_instructions_and_is_invalid():
 
 
 @pytest.mark.asyncio
-async def test_validator_high_severity_casing_forces_fail():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_high_severity_casing_forces_fail(validator_agent):
     # Model returns PASS but includes "High" severity issue -> must coerce to FAIL
     model_json = {
         "status": "PASS",
@@ -116,17 +121,17 @@ async def test_validator_high_severity_casing_forces_fail():
         "suggested_edits": {"apply_minor_fixes": False, "recommended_tone": None},
         "revision_instructions": "Clarify the request and make the ask explicit.",
     }
-    agent.agent = FakeChain(json.dumps(model_json))
+    validator_agent.agent = FakeChain(json.dumps(model_json))
 
     state = {
-        "messages": [HumanMessage(content="email")],
+        "messages": [_HM_EMAIL],
         "draft": "We should do it.",
         "constraints": {},
         "tone_params": {},
         "intent": "other",
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
 
     report = updates["validation_report"]
     assert report["status"] == "FAIL"
@@ -134,9 +139,7 @@ async def test_validator_high_severity_casing_forces_fail():
 
 
 @pytest.mark.asyncio
-async def test_validator_fail_without_revision_instructions_gets_default():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_fail_without_revision_instructions_gets_default(validator_agent):
     model_json = {
         "status": "FAIL",
         "summary": "Needs work.",
@@ -144,17 +147,17 @@ async def test_validator_fail_without_revision_instructions_gets_default():
         "suggested_edits": {"apply_minor_fixes": False, "recommended_tone": None},
         "revision_instructions": "",
     }
-    agent.agent = FakeChain(json.dumps(model_json))
+    validator_agent.agent = FakeChain(json.dumps(model_json))
 
     state = {
-        "messages": [HumanMessage(content="email")],
+        "messages": [_HM_EMAIL],
         "draft": "Thing.",
         "constraints": {},
         "tone_params": {},
         "intent": "other",
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
     report = updates["validation_report"]
 
     assert report["status"] == "FAIL"
@@ -163,20 +166,42 @@ async def test_validator_fail_without_revision_instructions_gets_default():
 
 
 @pytest.mark.asyncio
-async def test_validator_non_json_output_fails_soft_and_shape_is_stable():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
+async def test_validator_report_carries_constraint_resolution(validator_agent):
+    resolution = {"drop_must_include": ["pricing"], "add_must_avoid": ["slang"], "override_tone_label": "formal"}
+    model_json = {
+        "status": "BLOCKED",
+        "summary": "Conflicting constraints.",
+        "issues": [],
+        "revision_instructions": "Drop the pricing detail.",
+        "constraint_resolution": resolution,
+    }
+    validator_agent.agent = FakeChain(json.dumps(model_json))
+
+    _, updates = await validator_agent._execute({"messages": [_HM_EMAIL], "draft": "Thing."})
+
+    assert updates["validation_report"]["constraint_resolution"] == resolution
+
+    # Anything but an object is dropped rather than passed on to the workflow
+    validator_agent.agent = FakeChain(json.dumps({**model_json, "constraint_resolution": ["slang"]}))
+
+    _, updates = await validator_agent._execute({"messages": [_HM_EMAIL], "draft": "Thing."})
 
-    agent.agent = FakeChain("**PASS** Looks great")  # not JSON
+    assert updates["validation_report"]["constraint_resolution"] == {}
+
+
+@pytest.mark.asyncio
+async def test_validator_non_json_output_fails_soft_and_shape_is_stable(validator_agent):
+    validator_agent.agent = FakeChain("**PASS** Looks great")  # not JSON
 
     state = {
-        "messages": [HumanMessage(content="email")],
+        "messages": [_HM_EMAIL],
         "draft": "Hello",
         "constraints": {},
         "tone_params": {},
         "intent": "info",
     }
 
-    msgs, updates = await agent._execute(state)
+    msgs, updates = await validator_agent._execute(state)
 
     assert updates["is_valid"] is False
     report = updates["validation_report"]
@@ -187,24 +212,12 @@ async def test_validator_non_json_output_fails_soft_and_shape_is_stable():
 
 
 @pytest.mark.asyncio
-async def test_validator_sends_reduced_state_json_payload():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_sends_reduced_state_json_payload(validator_agent):
     # Minimal PASS response
-    agent.agent = FakeChain(
-        json.dumps(
-            {
-                "status": "PASS",
-                "summary": "OK",
-                "issues": [],
-                "suggested_edits": {"apply_minor_fixes": True, "recommended_tone": None},
-                "revision_instructions": "",
-            }
-        )
-    )
+    validator_agent.agent = FakeChain(_CLEAN_PASS_JSON)
 
     state = {
-        "messages": [HumanMessage(content="email")],
+        "messages": [_HM_EMAIL],
         "draft": "draft",
         "personalized_draft": "personalized",
         "tone_params": {"tone_label": "formal"},
@@ -214,36 +227,29 @@ async def test_validator_sends_reduced_state_json_payload():
         "memory_updates": {"foo": "bar"},   # should NOT be included
     }
 
-    await agent._execute(state)
+    await validator_agent._execute(state)
 
     # Validate that the agent invoked the chain with state_json that only contains the reduced keys.
-    assert agent.agent.last_input is not None
-    assert "state_json" in agent.agent.last_input
-
-    raw_state_json = agent.agent.last_input["state_json"]
-    payload = raw_state_json if isinstance(raw_state_json, dict) else json.loads(raw_state_json)
-    assert set(payload.keys()) == {"draft", "tone_params", "intent", "constraints"}
-    assert payload["draft"] == "personalized"
+    assert validator_agent.agent.last_input is not None
+    assert "state_json" in validator_agent.agent.last_input
+
+    # Passed as a dict; the prompt template renders it (no JSON encode/decode in between)
+    payload = validator_agent.agent.last_input["state_json"]
+    assert payload.keys() == _REDUCED_KEYS
+    assert payload == {
+        "draft": "personalized",
+        "tone_params": {"tone_label": "formal"},
+        "intent": "follow_up",
+        "constraints": {"length": "short"},
+    }
 
 @pytest.mark.asyncio
-async def test_validator_passes_on_clean_draft():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_passes_on_clean_draft(validator_agent):
     # Force the agent to use our stub chain instead of a real LLM runnable
-    agent.agent = FakeChain(
-        json.dumps(
-            {
-                "status": "PASS",
-                "summary": "Looks good.",
-                "issues": [],
-                "suggested_edits": {"apply_minor_fixes": True, "recommended_tone": None},
-                "revision_instructions": "",
-            }
-        )
-    )
+    validator_agent.agent = FakeChain(_CLEAN_PASS_JSON)
 
     state = {
-        "messages": [HumanMessage(content="Write an email")],
+        "messages": [_HM_WRITE],
         "draft": "Hello Jordan,\n\nCould you please replace the item?\n\nThanks,\nPeter",
         "personalized_draft": "",
         "tone_params": {"tone_label": "formal"},
@@ -251,7 +257,7 @@ async def test_validator_passes_on_clean_draft():
         "constraints": {},
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
 
     report = updates["validation_report"]
     assert report["status"] == "PASS"
@@ -260,9 +266,8 @@ async def test_validator_passes_on_clean_draft():
 
 
 @pytest.mark.asyncio
-async def test_validator_fails_when_high_severity_issue_present():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-    agent.agent = FakeChain(
+async def test_validator_fails_when_high_severity_issue_present(validator_agent):
+    validator_agent.agent = FakeChain(
         json.dumps(
             {
                 "status": "PASS",  # model claims PASS
@@ -282,14 +287,14 @@ async def test_validator_fails_when_high_severity_issue_present():
     )
 
     state = {
-        "messages": [HumanMessage(content="Write an email")],
+        "messages": [_HM_WRITE],
         "draft": "You are an idiot. Replace it now.",
         "tone_params": {"tone_label": "assertive"},
         "intent": "request",
         "constraints": {},
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
     report = updates["validation_report"]
 
     # Your agent enforces FAIL if any high severity issue exists
@@ -298,21 +303,19 @@ async def test_validator_fails_when_high_severity_issue_present():
 
 
 @pytest.mark.asyncio
-async def test_validator_non_json_output_fails_soft_and_shape_is_stable():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-
+async def test_validator_non_json_output_fails_soft_and_shape_is_stable(validator_agent):
     # Return non-JSON on purpose
-    agent.agent = FakeChain("**PASS** Looks fine")  # invalid JSON
+    validator_agent.agent = FakeChain("**PASS** Looks fine")  # invalid JSON
 
     state = {
-        "messages": [HumanMessage(content="Write an email")],
+        "messages": [_HM_WRITE],
         "draft": "Hello Jordan,\n\nThanks.\n\nPeter",
         "tone_params": {"tone_label": "formal"},
         "intent": "info",
         "constraints": {},
     }
 
-    _, updates = await agent._execute(state)
+    _, updates = await validator_agent._execute(state)
     report = updates["validation_report"]
 
     assert report["status"] == "FAIL"
@@ -325,22 +328,11 @@ async def test_validator_non_json_output_fails_soft_and_shape_is_stable():
 
 
 @pytest.mark.asyncio
-async def test_validator_reduced_payload_contains_expected_keys():
-    agent = ReviewValidatorAgent(llm=MOCK_LLM, logger=DummyLogger())
-    agent.agent = FakeChain(
-        json.dumps(
-            {
-                "status": "PASS",
-                "summary": "OK",
-                "issues": [],
-                "suggested_edits": {"apply_minor_fixes": True, "recommended_tone": None},
-                "revision_instructions": "",
-            }
-        )
-    )
+async def test_validator_reduced_payload_contains_expected_keys(validator_agent):
+    validator_agent.agent = FakeChain(_CLEAN_PASS_JSON)
 
     state = {
-        "messages": [HumanMessage(content="Write an email")],
+        "messages": [_HM_WRITE],
         "draft": "DRAFT",
         "personalized_draft": "PERSONALIZED",
         "tone_params": {"tone_label": "friendly"},
@@ -348,12 +340,84 @@ async def test_validator_reduced_payload_contains_expected_keys():
         "constraints": {"use_bullets": False},
     }
 
-    await agent._execute(state)
+    await validator_agent._execute(state)
 
     # The validator should see only the reduced payload as state_json
-    raw_state_json = agent.agent.last_input["state_json"]
-    payload = raw_state_json if isinstance(raw_state_json, dict) else json.loads(raw_state_json)
-
-    assert set(payload.keys()) == {"draft", "tone_params", "intent", "constraints"}
+    payload = validator_agent.agent.last_input["state_json"]
+    assert isinstance(payload, dict)
+    assert payload.keys() == _REDUCED_KEYS
     assert payload["draft"] == "PERSONALIZED"
-    assert payload["constraints"]["use_bullets"] is False
\ No newline at end of file
+    assert payload["constraints"]["use_bullets"] is False
+
+
+@pytest.mark.asyncio
+async def test_validator_stops_streaming_on_clean_pass(validator_agent):
+    text = json.dumps(
+        {
+            "status": "PASS",
+            "summary": "Clear and \"polite\".",
+            "issues": [],
+            "suggested_edits": {"apply_minor_fixes": False, "recommended_tone": None},
+            "revision_instructions": "",
+            "user_message": "Looks good to send.",
+        }
+    )
+    validator_agent.agent = FakeChain(text)
+
+    _, updates = await validator_agent._execute({"messages": [], "draft": "Hello"})
+
+    assert validator_agent.agent.streamed < len(text)
+    assert updates["is_valid"] is True
+    assert updates["validation_report"]["summary"] == 'Clear and "polite".'
+
+
+@pytest.mark.asyncio
+async def test_validator_reads_full_pass_with_issues(validator_agent):
+    text = json.dumps(
+        {
+            "status": "PASS",
+            "summary": "OK",
+            "issues": [{"category": "tone", "severity": "high", "detail": "Too curt.", "suggested_fix": None}],
+            "revision_instructions": "Soften the opening.",
+        }
+    )
+    validator_agent.agent = FakeChain(text)
+
+    _, updates = await validator_agent._execute({"messages": [], "draft": "Hello"})
+
+    assert validator_agent.agent.streamed == len(text)
+    assert updates["validation_report"]["status"] == "FAIL"
+    assert updates["validation_report"]["revision_instructions"] == "Soften the opening."
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "text, status, valid",
+    [
+        (_CLEAN_PASS_JSON, "PASS", True),
+        (json.dumps({"status": "fail", "summary": "Vague.", "issues": [], "revision_instructions": "Be specific."}), "FAIL", False),
+        (json.dumps({"status": "PASS", "summary": "Rude.", "issues": [{"category": "tone", "severity": "HIGH"}]}), "FAIL", False),
+        (
+            json.dumps({"status": "BLOCKED", "summary": "Harassment.", "issues": [{"category": "policy", "severity": "high"}]}),
+            "BLOCKED",
+            False,
+        ),
+        ("**PASS** not json", "FAIL", False),
+        (json.dumps(["PASS"]), "FAIL", False),
+    ],
+    ids=["clean_pass", "lowercase_fail", "high_severity_pass", "blocked", "not_json", "json_array"],
+)
+async def test_validator_status_matrix(validator_agent, text, status, valid):
+    validator_agent.agent = FakeChain(text)
+    state = {
+        "messages": [_HM_EMAIL],
+        "draft": "Hello,\n\nPlease review.\n\nThanks",
+        "tone_params": {"tone_label": "neutral"},
+        "intent": "request",
+        "constraints": {},
+    }
+
+    _, updates = await validator_agent._execute(state)
+
+    assert updates["validation_report"]["status"] == status
+    assert updates["is_valid"] is valid
@@ -0,0 +1,95 @@
+import pytest
+
+from src.workflow.router import ROUTER_CONFIG_PATH, build_router, get_router
+
+
+def test_default_router_config_defines_model_groups_and_fallbacks():
+    router = build_router(ROUTER_CONFIG_PATH)
+
+    names = set(router.get_model_names())
+    assert {"deterministic", "deterministic_fallback", "creative", "creative_fallback"} <= names
+    assert {"deterministic": ["deterministic_fallback"]} in router.fallbacks
+    assert {"creative": ["creative_fallback"]} in router.fallbacks
+
+
+def test_get_router_is_process_wide():
+    assert get_router() is get_router()
+    assert get_router() is build_router(ROUTER_CONFIG_PATH)
+
+
+def test_build_router_reads_given_yaml(tmp_path):
+    cfg = tmp_path / "router.yaml"
+    cfg.write_text(
+        "model_list:\n"
+        "  - model_name: only\n"
+        "    litellm_params:\n"
+        "      model: gpt-4o-mini\n"
+    )
+
+    router = build_router(str(cfg))
+
+    assert router.get_model_names() == ["only"]
+    assert build_router(str(cfg)) is router
+
+
+def test_build_router_installs_shared_http_client(tmp_path, monkeypatch):
+    import httpx
+    import litellm
+
+    monkeypatch.setattr(litellm, "aclient_session", None)
+    cfg = tmp_path / "router.yaml"
+    cfg.write_text(
+        "model_list:\n"
+        "  - model_name: only\n"
+        "    litellm_params:\n"
+        "      model: gpt-4o-mini\n"
+        "http_client:\n"
+        "  max_connections: 8\n"
+    )
+
+    build_router(str(cfg))
+
+    assert isinstance(litellm.aclient_session, httpx.AsyncClient)
+
+
+def test_default_router_caches_deterministic_groups_only():
+    import litellm
+
+    from src.workflow.router import cache_stats
+
+    router = build_router(ROUTER_CONFIG_PATH)
+
+    assert router.cache_responses
+    assert cache_stats in litellm.callbacks
+    params = {d["model_name"]: d["litellm_params"] for d in router.model_list}
+    assert "cache" not in params["deterministic"]
+    for group in ("creative", "creative_fallback"):
+        assert params[group]["cache"] == {"no-cache": True, "no-store": True}
+
+
+@pytest.mark.asyncio
+async def test_embed_text_shares_one_request_per_text(monkeypatch):
+    import asyncio
+
+    from src.workflow import router as router_mod
+
+    calls = []
+
+    async def fake_fetch(text):
+        calls.append(text)
+        await asyncio.sleep(0)
+        return [float(len(text))]
+
+    monkeypatch.setattr(router_mod, "_fetch_embedding", fake_fetch)
+    monkeypatch.setattr(router_mod, "_EMBEDDING_TASKS", type(router_mod._EMBEDDING_TASKS)())
+
+    results = await asyncio.gather(
+        router_mod.embed_text("hello"),
+        router_mod.embed_text("hello"),
+        router_mod.embed_text("bye"),
+    )
+    again = await router_mod.embed_text("hello")
+
+    assert results == [[5.0], [5.0], [3.0]]
+    assert again == [5.0]
+    assert calls == ["hello", "bye"]
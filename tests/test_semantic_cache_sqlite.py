@@ -0,0 +1,105 @@
+import sqlite3
+
+import pytest
+
+from src.memory.sqlite_draft_cache import SQLiteDraftCache
+from src.memory.sqlite_semantic_cache import SQLiteSemanticCache
+
+
+VECTORS = {
+    "follow up with sam about the invoice": [1.0, 0.0],
+    "follow up with sam regarding the invoice": [0.99, 0.05],
+    "thank the recruiter for the interview": [0.0, 1.0],
+}
+
+
+async def fake_embed(text):
+    return VECTORS[text]
+
+
+def _row_count(db_path, table):
+    with sqlite3.connect(db_path) as conn:
+        return conn.execute(f"SELECT COUNT(*) FROM {table};").fetchone()[0]
+
+
+def _age_rows(db_path, table, seconds):
+    with sqlite3.connect(db_path) as conn:
+        conn.execute(f"UPDATE {table} SET created_at = datetime('now', ?);", (f"-{seconds} seconds",))
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_hits_on_paraphrase_with_same_key(tmp_path):
+    cache = SQLiteSemanticCache(str(tmp_path / "test.db"), embed=fake_embed, table="classifier_cache")
+
+    await cache.store('["IntentDetection"]', "follow up with sam about the invoice", '{"intent": "follow_up"}')
+
+    assert await cache.lookup('["IntentDetection"]', "follow up with sam regarding the invoice") == '{"intent": "follow_up"}'
+    assert await cache.lookup('["ToneStylist"]', "follow up with sam regarding the invoice") is None
+    assert await cache.lookup('["IntentDetection"]', "thank the recruiter for the interview") is None
+
+
+@pytest.mark.asyncio
+async def test_semantic_caches_keep_separate_tables(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    classifier = SQLiteSemanticCache(db_path, embed=fake_embed, table="classifier_cache")
+    drafts = SQLiteDraftCache(db_path, embed=fake_embed)
+
+    await classifier.store("k", "follow up with sam about the invoice", "label")
+    await drafts.store("k", "follow up with sam about the invoice", "Subject: Invoice")
+
+    assert _row_count(db_path, "classifier_cache") == 1
+    assert _row_count(db_path, "draft_cache") == 1
+    assert await classifier.lookup("k", "follow up with sam about the invoice") == "label"
+    assert await drafts.lookup("k", "follow up with sam about the invoice") == "Subject: Invoice"
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_ignores_and_prunes_expired_entries(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    cache = SQLiteSemanticCache(db_path, embed=fake_embed, table="classifier_cache", ttl_seconds=3600)
+
+    await cache.store("k", "follow up with sam about the invoice", "old")
+    _age_rows(db_path, "classifier_cache", 7200)
+
+    assert await cache.lookup("k", "follow up with sam about the invoice") is None
+
+    await cache.store("k", "follow up with sam about the invoice", "new")
+
+    assert await cache.lookup("k", "follow up with sam about the invoice") == "new"
+    assert _row_count(db_path, "classifier_cache") == 1
+
+
+@pytest.mark.asyncio
+async def test_semantic_cache_without_ttl_keeps_old_entries(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    cache = SQLiteSemanticCache(db_path, embed=fake_embed)
+
+    await cache.store("k", "follow up with sam about the invoice", "old")
+    _age_rows(db_path, SQLiteSemanticCache.TABLE, 7200)
+
+    assert await cache.lookup("k", "follow up with sam about the invoice") == "old"
+
+
+def test_semantic_cache_rejects_invalid_table_name(tmp_path):
+    with pytest.raises(ValueError):
+        SQLiteSemanticCache(str(tmp_path / "test.db"), embed=fake_embed, table="cache; DROP TABLE x")
+
+
+@pytest.mark.asyncio
+async def test_store_in_background_is_visible_after_drain(tmp_path):
+    cache = SQLiteSemanticCache(str(tmp_path / "test.db"), embed=fake_embed)
+
+    task = cache.store_in_background("k", "follow up with sam about the invoice", "label")
+    assert not task.done()
+
+    await cache.drain()
+
+    assert await cache.lookup("k", "follow up with sam about the invoice") == "label"
+
+
+def test_unpooled_cache_uses_wal_mode(tmp_path):
+    db_path = str(tmp_path / "test.db")
+    SQLiteSemanticCache(db_path, embed=fake_embed)
+
+    with sqlite3.connect(db_path) as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
@@ -0,0 +1,19 @@
+from langchain_core.messages import AIMessage, HumanMessage
+
+from src.agents.state import MAX_MESSAGES, add_messages_capped
+
+
+def test_add_messages_capped_keeps_most_recent_messages():
+    history = [HumanMessage(content=f"m{i}", id=str(i)) for i in range(MAX_MESSAGES)]
+
+    merged = add_messages_capped(history, [AIMessage(content="new", id="new")])
+
+    assert len(merged) == MAX_MESSAGES
+    assert merged[0].content == "m1"
+    assert merged[-1].content == "new"
+
+
+def test_add_messages_capped_still_replaces_by_id():
+    merged = add_messages_capped([HumanMessage(content="old", id="a")], [HumanMessage(content="edited", id="a")])
+
+    assert [m.content for m in merged] == ["edited"]
@@ -1,13 +1,15 @@
 import pytest
 
-from src.templates.engine import EmailTemplateEngine
+from src.templates.engine import EmailTemplateEngine, _compile_body
 
 
 class DummyStore:
     def __init__(self, tpl=None):
         self.tpl = tpl
+        self.calls = 0
 
     def get_best_template(self, *, intent, tone_label, constraints):
+        self.calls += 1
         return self.tpl
 
 
@@ -52,3 +54,115 @@ def test_engine_defaults_when_no_template_found():
     assert plan["tone_label"] == "neutral"
     # default length should be medium
     assert plan["length_hint"] in {"medium", "short"}  # per your v1 mapping
+
+
+def test_engine_only_suggests_placeholders_present_in_body():
+    tpl = {
+        "template_id": "tiny_v1",
+        "intent": "other",
+        "tone_label": "neutral",
+        "name": "Tiny",
+        "body": "{{greeting}}\n\n{{unknown}}\n{{signature}}\n",
+        "meta": {},
+    }
+    engine = EmailTemplateEngine(DummyStore(tpl))
+
+    plan = engine.build_plan(
+        intent="other",
+        tone_params={},
+        constraints={},
+        parsed_input={"recipient": {"name": "Sam"}},
+    )
+
+    assert set(plan["placeholders"]) == {"greeting", "signature"}
+    # unknown placeholders are left as-is
+    assert plan["rendered_skeleton"] == "Hi Sam,\n\n{{unknown}}\n[Your Name]\n"
+
+
+def test_engine_plan_renders_skeleton_lazily():
+    engine = EmailTemplateEngine(DummyStore(None))
+    calls = []
+    render = engine._render
+    engine._render = lambda body, values: calls.append(body) or render(body, values)
+
+    plan = engine.build_plan(intent="other", tone_params={}, constraints={}, parsed_input={})
+    assert plan["placeholders"]["signature"] == "[Your Name]"
+    assert calls == []
+
+    first = plan["rendered_skeleton"]
+    assert plan.get("rendered_skeleton") is first
+    assert len(calls) == 1
+
+    as_dict = plan.to_dict()
+    assert isinstance(as_dict, dict)
+    assert as_dict["rendered_skeleton"] == first
+    assert len(calls) == 1
+
+
+def test_engine_looks_up_each_template_key_once():
+    store = DummyStore(None)
+    engine = EmailTemplateEngine(store)
+    constraints = {"length": "short", "must_include": ["agenda"]}
+
+    for _ in range(3):
+        engine.build_plan(intent="request", tone_params={"tone_label": "formal"}, constraints=constraints, parsed_input={})
+    # Same constraints in another key order hit the same entry
+    engine.build_plan(
+        intent="request",
+        tone_params={"tone_label": "formal"},
+        constraints={"must_include": ["agenda"], "length": "short"},
+        parsed_input={},
+    )
+    assert store.calls == 1
+
+    engine.build_plan(intent="request", tone_params={"tone_label": "friendly"}, constraints=constraints, parsed_input={})
+    assert store.calls == 2
+
+    engine.clear_template_cache()
+    engine.build_plan(intent="request", tone_params={"tone_label": "formal"}, constraints=constraints, parsed_input={})
+    assert store.calls == 3
+
+
+def test_engine_template_cache_ignores_request_metadata():
+    store = DummyStore(None)
+    engine = EmailTemplateEngine(store)
+
+    for user_id in ("u1", "u2", "u3"):
+        engine.build_plan(
+            intent="request", tone_params={"tone_label": "formal"}, constraints={"user_id": user_id}, parsed_input={}
+        )
+    assert store.calls == 1
+
+
+def test_engine_template_cache_entries_expire():
+    store = DummyStore({"template_id": "t1", "body": "Hi"})
+    engine = EmailTemplateEngine(store, cache_ttl_seconds=0)
+
+    engine.build_plan(intent="request", tone_params={"tone_label": "formal"}, constraints={}, parsed_input={})
+    store.tpl = {"template_id": "t2", "body": "Hello"}
+    plan = engine.build_plan(intent="request", tone_params={"tone_label": "formal"}, constraints={}, parsed_input={})
+
+    assert store.calls == 2
+    assert plan["template_id"] == "t2"
+
+
+def test_engine_compiles_each_template_body_once():
+    tpl = {
+        "template_id": "request_formal_v1",
+        "intent": "request",
+        "tone_label": "formal",
+        "name": "Request Formal",
+        "body": "Subject: {{subject}}\n\n{{greeting}}\n\n{{ask}}\n\n{{closing}}\n{{signature}}\n",
+        "meta": {"version": 1},
+    }
+    engine = EmailTemplateEngine(DummyStore(tpl))
+    _compile_body.cache_clear()
+
+    for i in range(100):
+        plan = engine.build_plan(
+            intent="request", tone_params={"tone_label": "formal"}, constraints={}, parsed_input={"ask": f"x{i}"}
+        )
+        assert f"x{i}" in plan["rendered_skeleton"]
+
+    # Split into literals/keys on the first build; every later build and render reuses it
+    assert _compile_body.cache_info().misses == 1
@@ -0,0 +1,65 @@
+import pytest
+
+from src.templates.engine import EmailTemplateEngine
+from src.templates.fixtures.templates import TEMPLATES, TEMPLATES_BY_KEY
+from src.templates.memory_template_store import InMemoryTemplateStore
+
+
+def test_templates_by_key_indexes_every_fixture():
+    assert len(TEMPLATES_BY_KEY) == len(TEMPLATES)
+    assert TEMPLATES_BY_KEY[("request", "formal")]["template_id"] == "request_formal_v1"
+
+
+def test_memory_template_store_selects_exact_match():
+    store = InMemoryTemplateStore()
+
+    tpl = store.get_best_template(intent="request", tone_label="formal", constraints={})
+    assert tpl is not None
+    assert tpl["template_id"] == "request_formal_v1"
+    assert tpl["intent"] == "request"
+    assert tpl["tone_label"] == "formal"
+
+
+def test_memory_template_store_fallbacks_to_neutral_then_other():
+    store = InMemoryTemplateStore()
+
+    tpl = store.get_best_template(intent="follow_up", tone_label="assertive", constraints={})
+    assert tpl["template_id"] == "follow_up_neutral_v1"
+
+    tpl = store.get_best_template(intent="nonexistent_intent", tone_label="formal", constraints={})
+    assert tpl["template_id"] == "other_neutral_v1"
+
+
+def test_memory_template_store_returns_none_when_empty():
+    store = InMemoryTemplateStore({})
+    assert store.get_best_template(intent="other", tone_label="neutral", constraints={}) is None
+
+
+def test_memory_template_store_upsert_does_not_mutate_fixtures():
+    store = InMemoryTemplateStore()
+    store.upsert_template(
+        {
+            "template_id": "follow_up_friendly_v1",
+            "intent": "follow_up",
+            "tone_label": "friendly",
+            "name": "Follow-up Friendly",
+            "body": "Subject: {{subject}}\n\n{{greeting}}\n",
+            "meta": {"version": 1},
+        }
+    )
+
+    assert store.get_best_template(intent="follow_up", tone_label="friendly", constraints={})["template_id"] == "follow_up_friendly_v1"
+    assert ("follow_up", "friendly") not in TEMPLATES_BY_KEY
+
+
+def test_engine_defaults_to_in_memory_store():
+    engine = EmailTemplateEngine()
+    assert isinstance(engine.store, InMemoryTemplateStore)
+
+    plan = engine.build_plan(
+        intent="request",
+        tone_params={"tone_label": "formal"},
+        constraints={},
+        parsed_input={"ask": "review the doc"},
+    )
+    assert plan["template_id"] == "request_formal_v1"
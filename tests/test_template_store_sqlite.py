@@ -1,12 +1,20 @@
 import pytest
 
 from src.templates.sqlite_template_store import SQLiteTemplateStore
+from src.utils.sqlite_pool import SQLitePool
 
 
-def test_sqlite_template_store_selects_exact_match(tmp_path):
-    db = tmp_path / "test.db"
-    store = SQLiteTemplateStore(str(db))
+@pytest.fixture(scope="module")
+def store():
+    # In-memory database, kept alive by the pool's single connection. Schema is created once;
+    # each test upserts its own (intent, tone) template, and the lookups below resolve the
+    # same way whichever of them already exist
+    pool = SQLitePool(":memory:", size=1)
+    yield SQLiteTemplateStore(pool.db_path, pool=pool)
+    pool.close()
 
+
+def test_sqlite_template_store_selects_exact_match(store):
     store.upsert_template(
         {
             "template_id": "follow_up_friendly_v1",
@@ -25,10 +33,7 @@ def test_sqlite_template_store_selects_exact_match(tmp_path):
     assert tpl["tone_label"] == "friendly"
 
 
-def test_sqlite_template_store_fallbacks_to_neutral(tmp_path):
-    db = tmp_path / "test.db"
-    store = SQLiteTemplateStore(str(db))
-
+def test_sqlite_template_store_fallbacks_to_neutral(store):
     store.upsert_template(
         {
             "template_id": "follow_up_neutral_v1",
@@ -47,10 +52,7 @@ def test_sqlite_template_store_fallbacks_to_neutral(tmp_path):
     assert tpl["tone_label"] == "neutral"
 
 
-def test_sqlite_template_store_fallbacks_to_other(tmp_path):
-    db = tmp_path / "test.db"
-    store = SQLiteTemplateStore(str(db))
-
+def test_sqlite_template_store_fallbacks_to_other(store):
     store.upsert_template(
         {
             "template_id": "other_neutral_v1",
@@ -67,3 +69,56 @@ def test_sqlite_template_store_fallbacks_to_other(tmp_path):
     assert tpl["template_id"] == "other_neutral_v1"
     assert tpl["intent"] == "other"
     assert tpl["tone_label"] == "neutral"
+
+
+def test_sqlite_template_store_works_with_shared_pool(tmp_path):
+    pool = SQLitePool(str(tmp_path / "test.db"), size=2)
+    store = SQLiteTemplateStore(pool.db_path, pool=pool)
+
+    store.upsert_template(
+        {
+            "template_id": "follow_up_friendly_v1",
+            "intent": "follow_up",
+            "tone_label": "friendly",
+            "name": "Follow-up Friendly",
+            "body": "Subject: {{subject}}\n\n{{ask}}\n",
+        }
+    )
+
+    # A second store on the same pool sees the committed row
+    other = SQLiteTemplateStore(pool.db_path, pool=pool)
+    tpl = other.get_best_template(intent="follow_up", tone_label="friendly", constraints={})
+    assert tpl is not None
+    assert tpl["template_id"] == "follow_up_friendly_v1"
+    assert pool._opened <= 2
+
+    with pool.connection() as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+    pool.close()
+
+
+def test_sqlite_template_store_uses_wal_without_pool(tmp_path):
+    store = SQLiteTemplateStore(str(tmp_path / "test.db"))
+
+    with store._connect() as conn:
+        assert conn.execute("PRAGMA journal_mode;").fetchone()[0] == "wal"
+        assert conn.execute("PRAGMA synchronous;").fetchone()[0] == 1  # NORMAL
+
+
+def test_sqlite_template_store_resolves_fallbacks_in_one_query(tmp_path):
+    pool = SQLitePool(str(tmp_path / "test.db"), size=1)
+    store = SQLiteTemplateStore(pool.db_path, pool=pool)
+    for intent, tone in [("other", "neutral"), ("follow_up", "neutral"), ("follow_up", "friendly")]:
+        store.upsert_template(
+            {"template_id": f"{intent}_{tone}_v1", "intent": intent, "tone_label": tone, "name": "T", "body": "{{ask}}"}
+        )
+
+    statements = []
+    with pool.connection() as conn:
+        conn.set_trace_callback(statements.append)
+
+    assert store.get_best_template(intent="follow_up", tone_label="friendly", constraints={})["template_id"] == "follow_up_friendly_v1"
+    assert store.get_best_template(intent="follow_up", tone_label="formal", constraints={})["template_id"] == "follow_up_neutral_v1"
+    assert store.get_best_template(intent="apology", tone_label="formal", constraints={})["template_id"] == "other_neutral_v1"
+    assert sum("FROM candidates" in s for s in statements) == 3
+    pool.close()
@@ -1,3 +1,4 @@
+import asyncio
 import json
 import logging
 import pytest
@@ -5,19 +6,10 @@ import pytest
 from langchain_core.messages import AIMessage, HumanMessage
 
 from src.agents.tone_stylist_agent import ToneStylistAgent
+from tests.utils.fakes import FakeChain
 
 
-class StubRunnable:
-    """Minimal stub for self.agent that supports .ainvoke()."""
-
-    def __init__(self, content: str):
-        self._content = content
-
-    async def ainvoke(self, _input):
-        return AIMessage(content=self._content)
-
-
-@pytest.fixture
+@pytest.fixture(scope="module")
 def logger():
     lg = logging.getLogger("test.tone_stylist")
     if not lg.handlers:
@@ -26,9 +18,9 @@ def logger():
     return lg
 
 
-@pytest.fixture
+@pytest.fixture(scope="module")
 def tone_agent(logger):
-    # Construct agent with any LLM (will be replaced by StubRunnable anyway)
+    # Construct agent with any LLM (will be replaced by FakeChain anyway)
     # We pass a trivial callable so BaseAgent __init__ can build a prompt|llm chain
     # but we will override agent.agent in each test for deterministic output.
     dummy_llm = lambda x: AIMessage(content="{}")  # sync callable is fine; we override below
@@ -36,21 +28,23 @@ def tone_agent(logger):
     return agent
 
 
+_BASE_STATE = {
+    "messages": [HumanMessage(content="Please draft an email to my recruiter.")],
+    "raw_input": "Please draft an email to my recruiter.",
+    "parsed_input": {},
+    "constraints": {},
+    "tone_params": {},
+    "requires_clarification": False,
+    "draft": "",
+    "personalized_draft": "",
+    "validation_report": {},
+    "retry_count": 0,
+}
+
+
 def _base_state(**overrides):
-    state = {
-        "messages": [HumanMessage(content="Please draft an email to my recruiter.")],
-        "raw_input": "Please draft an email to my recruiter.",
-        "parsed_input": {},
-        "constraints": {},
-        "tone_params": {},
-        "requires_clarification": False,
-        "draft": "",
-        "personalized_draft": "",
-        "validation_report": {},
-        "retry_count": 0,
-    }
-    state.update(overrides)
-    return state
+    # Fresh top-level dict and messages list per test; the agent doesn't mutate the rest
+    return {**_BASE_STATE, "messages": list(_BASE_STATE["messages"]), **overrides}
 
 
 @pytest.mark.asyncio
@@ -59,8 +53,8 @@ async def test_tone_ui_override_used(tone_agent):
     state = _base_state(tone_params={"tone_label": "formal"})
 
     # Even if model would say something else, override should win.
-    tone_agent.agent = StubRunnable(
-        content=json.dumps(
+    tone_agent.agent = FakeChain(
+        json.dumps(
             {
                 "tone_params": {
                     "tone_label": "friendly",
@@ -84,8 +78,8 @@ async def test_tone_ui_override_used(tone_agent):
 @pytest.mark.asyncio
 async def test_tone_model_json_normalizes_fields(tone_agent):
     # Model returns valid JSON but with missing / weird fields; agent should normalize/clamp.
-    tone_agent.agent = StubRunnable(
-        content=json.dumps(
+    tone_agent.agent = FakeChain(
+        json.dumps(
             {
                 "tone_params": {
                     "tone_label": "friendly",
@@ -114,7 +108,7 @@ async def test_tone_model_json_normalizes_fields(tone_agent):
 @pytest.mark.asyncio
 async def test_tone_non_json_fails_soft_to_default(tone_agent):
     # Model returns non-JSON -> agent should fail-soft to default neutral
-    tone_agent.agent = StubRunnable(content="**PASS** this is not JSON")
+    tone_agent.agent = FakeChain("**PASS** this is not JSON")
 
     state = _base_state(tone_params={})
     msgs, updates = await tone_agent._execute(state)
@@ -126,8 +120,8 @@ async def test_tone_non_json_fails_soft_to_default(tone_agent):
 @pytest.mark.asyncio
 async def test_tone_empty_tone_params_fails_soft_to_default(tone_agent):
     # Model returns valid JSON but empty tone_params -> fail-soft to default neutral
-    tone_agent.agent = StubRunnable(
-        content=json.dumps(
+    tone_agent.agent = FakeChain(
+        json.dumps(
             {
                 "tone_params": {},
                 "reason": "Could not determine tone.",
@@ -141,3 +135,110 @@ async def test_tone_empty_tone_params_fails_soft_to_default(tone_agent):
     # This assumes you implemented the "empty tone_params => default" behavior (#3).
     assert updates["tone_source"] == "default"
     assert updates["tone_params"]["tone_label"] == "neutral"
+
+
+class DictResponseCache:
+    """Exact-text stand-in for SQLiteSemanticCache (lookup/store by key + raw_input)."""
+
+    def __init__(self):
+        self.entries = {}
+
+    async def lookup(self, cache_key, raw_input):
+        return self.entries.get((cache_key, raw_input))
+
+    async def store(self, cache_key, raw_input, content):
+        self.entries[(cache_key, raw_input)] = content
+
+    def store_in_background(self, cache_key, raw_input, content):
+        # Stored before returning, so the next lookup in the test sees it
+        self.entries[(cache_key, raw_input)] = content
+        return asyncio.get_running_loop().create_task(asyncio.sleep(0))
+
+
+class CountingRunnable(FakeChain):
+    def __init__(self, response_text: str):
+        super().__init__(response_text)
+        self.calls = 0
+
+    async def ainvoke(self, _input):
+        self.calls += 1
+        return await super().ainvoke(_input)
+
+
+@pytest.mark.asyncio
+async def test_tone_response_cache_skips_model_on_hit(logger):
+    cache = DictResponseCache()
+    agent = ToneStylistAgent(llm=lambda x: AIMessage(content="{}"), logger=logger, response_cache=cache)
+    model_out = {"tone_params": {"tone_label": "formal", "formality": 90}, "reason": "recruiter"}
+    agent.agent = CountingRunnable(json.dumps(model_out))
+
+    _, first = await agent._execute(_base_state())
+    _, second = await agent._execute(_base_state())
+
+    assert agent.agent.calls == 1
+    assert second["tone_params"] == first["tone_params"]
+
+    # A different recipient kind is a different cache entry
+    await agent._execute(_base_state(parsed_input={"recipient": {"relationship": "friend"}}))
+    assert agent.agent.calls == 2
+
+
+@pytest.mark.asyncio
+async def test_tone_response_cache_skips_follow_ups_in_an_ongoing_thread(logger):
+    cache = DictResponseCache()
+    agent = ToneStylistAgent(llm=lambda x: AIMessage(content="{}"), logger=logger, response_cache=cache)
+    agent.agent = CountingRunnable(json.dumps({"tone_params": {"tone_label": "formal"}, "reason": "x"}))
+
+    first_turn = [HumanMessage(content="Draft an email to the recruiter."), AIMessage(content="{}")]
+    follow_up = {"raw_input": "ok, make it shorter", "messages": [HumanMessage(content="ok, make it shorter")]}
+    await agent._execute(_base_state(**follow_up))
+    # Same words, but after an earlier turn the model reads that history: no cached label
+    await agent._execute(_base_state(
+        raw_input="ok, make it shorter",
+        messages=[*first_turn, HumanMessage(content="ok, make it shorter")],
+    ))
+
+    assert agent.agent.calls == 2
+    assert len(cache.entries) == 1
+
+
+@pytest.mark.asyncio
+async def test_tone_response_cache_is_keyed_on_the_request_context(logger):
+    cache = DictResponseCache()
+    agent = ToneStylistAgent(llm=lambda x: AIMessage(content="{}"), logger=logger, response_cache=cache)
+    agent.agent = CountingRunnable(json.dumps({"tone_params": {"tone_label": "formal"}, "reason": "x"}))
+
+    request = _BASE_STATE["messages"][0]
+    await agent._execute(_base_state(messages=[HumanMessage(content="REQUEST CONTEXT: METADATA {}"), request]))
+    await agent._execute(_base_state(messages=[HumanMessage(content="REQUEST CONTEXT: TONE OVERRIDE"), request]))
+
+    assert agent.agent.calls == 2
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "tone_params, expected",
+    [
+        (
+            {"tone_label": "formal", "formality": 90, "warmth": 30, "directness": 70, "confidence": 0.8},
+            {"formality": 90, "warmth": 30, "directness": 70, "confidence": 0.8},
+        ),
+        (
+            {"tone_label": "friendly", "formality": 150.7, "warmth": -3, "directness": "80", "confidence": "2"},
+            {"formality": 100, "warmth": 0, "directness": 80, "confidence": 1.0},
+        ),
+        (
+            {"tone_label": "neutral", "formality": "high", "warmth": None, "directness": [], "confidence": "sure"},
+            {"formality": 70, "warmth": 45, "directness": 65, "confidence": 0.6},
+        ),
+        ({"tone_label": "neutral"}, {"formality": 70, "warmth": 45, "directness": 65, "confidence": 0.6}),
+    ],
+    ids=["in_range", "out_of_range", "unparseable", "missing"],
+)
+async def test_tone_clamps_numeric_params(tone_agent, tone_params, expected):
+    tone_agent.agent = FakeChain(json.dumps({"tone_params": tone_params, "reason": "test"}))
+
+    _, updates = await tone_agent._execute(_base_state())
+
+    assert updates["tone_source"] == "model"
+    assert {k: updates["tone_params"][k] for k in expected} == expected
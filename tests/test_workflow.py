@@ -0,0 +1,394 @@
+import asyncio
+import json
+import logging
+
+import litellm
+import pytest
+from langchain_core.language_models.fake_chat_models import GenericFakeChatModel
+from langchain_core.messages import AIMessage
+
+from src.agents.response import AgentResponse
+from src.agents.review_validator_agent import ReviewValidatorAgent
+from src.utils.sessionid import create_session_id
+from src.workflow import workflow as workflow_module
+from src.workflow.workflow import MAX_RETRIES, EmailWorkflow
+
+PASS = {"validation_report": {"status": "PASS"}, "is_valid": True}
+FAIL = {"validation_report": {"status": "FAIL", "issues": []}, "is_valid": False}
+MINOR_FAIL = {
+    "validation_report": {"status": "FAIL", "issues": [{"category": "grammar", "severity": "low"}]},
+    "is_valid": False,
+}
+
+
+class StubAgent:
+    """Stands in for an agent: records the state of every call, returns canned updates."""
+
+    def __init__(self, *updates, delay: float = 0.0):
+        # One updates dict per call; the last one repeats
+        self.updates = list(updates) or [{}]
+        self.delay = delay
+        self.calls = []
+
+    async def run(self, state):
+        self.calls.append(dict(state))
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        updates = self.updates[min(len(self.calls), len(self.updates)) - 1]
+        return AgentResponse(messages=[], updates=dict(updates))
+
+
+class StubPersonalizer(StubAgent):
+    def __init__(self, *updates, context=None):
+        super().__init__(*updates)
+        self.context = context or {}
+        self.loads = 0
+
+    def load_context(self, state):
+        self.loads += 1
+        return self.context
+
+
+def stub_agents(wf: EmailWorkflow, **overrides) -> dict:
+    agents = {
+        "input_parser": StubAgent({"parsed_input": {"primary_request": "write"}}),
+        "intent_detector": StubAgent({"intent": "follow_up", "intent_source": "model"}),
+        "tone_stylist": StubAgent({"tone_params": {"tone_label": "friendly"}, "tone_source": "model"}),
+        "draft_writer": StubAgent({"draft": "Hi,\n\nDraft.\n\nBest"}),
+        "personalizer": StubPersonalizer(),
+        "validator": StubAgent(PASS),
+        "polisher": StubAgent({"personalized_draft": "Hi,\n\nPolished.\n\nBest"}),
+        "memory_agent": StubAgent(),
+    }
+    agents.update(overrides)
+    for attr, agent in agents.items():
+        setattr(wf, attr, agent)
+    return agents
+
+
+@pytest.fixture
+async def workflow(tmp_path, monkeypatch):
+    # EmailWorkflow opens data/email_assist.db relative to the working directory
+    monkeypatch.chdir(tmp_path)
+    (tmp_path / "data").mkdir()
+    wf = EmailWorkflow(logging.getLogger("test.workflow"))
+    yield wf
+    await wf.drain_memory_writes()
+    wf.close()
+
+
+async def test_intent_and_tone_fan_out_and_join_before_drafting(workflow):
+    agents = stub_agents(
+        workflow,
+        intent_detector=StubAgent({"intent": "follow_up"}, delay=0.2),
+        tone_stylist=StubAgent({"tone_params": {"tone_label": "friendly"}}, delay=0.2),
+    )
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    result = await workflow.run_query("Follow up with Sam", metadata={"user_id": "fan-out"})
+
+    # Both classifiers ran concurrently, not back to back
+    assert loop.time() - start < 0.35
+    assert len(agents["intent_detector"].calls) == 1
+    assert len(agents["tone_stylist"].calls) == 1
+    # The draft ran once, after the barrier, and saw both merged writes
+    assert len(agents["draft_writer"].calls) == 1
+    drafted_from = agents["draft_writer"].calls[0]
+    assert drafted_from["intent"] == "follow_up"
+    assert drafted_from["tone_params"] == {"tone_label": "friendly"}
+    assert result["intent"] == "follow_up"
+    assert result["tone_params"] == {"tone_label": "friendly"}
+    assert result["draft"] == "Hi,\n\nDraft.\n\nBest"
+
+
+async def test_ui_overrides_skip_the_classifier_nodes(workflow):
+    agents = stub_agents(workflow)
+
+    result = await workflow.run_query(
+        "Thank Sam", tone="formal", intent="thank_you", metadata={"user_id": "ui-skip"}
+    )
+
+    assert agents["intent_detector"].calls == []
+    assert agents["tone_stylist"].calls == []
+    assert len(agents["draft_writer"].calls) == 1
+    assert result["intent"] == "thank_you"
+    assert result["intent_source"] == "ui"
+    assert result["tone_params"] == {"tone_label": "formal"}
+
+
+async def test_ui_override_for_one_classifier_still_runs_the_other(workflow):
+    agents = stub_agents(workflow)
+
+    result = await workflow.run_query("Thank Sam", tone="formal", metadata={"user_id": "ui-tone"})
+
+    assert len(agents["intent_detector"].calls) == 1
+    assert agents["tone_stylist"].calls == []
+    assert result["intent"] == "follow_up"
+    assert result["tone_params"] == {"tone_label": "formal"}
+
+
+async def test_clarification_ends_the_run_without_building_later_agents(workflow):
+    input_parser = StubAgent({"requires_clarification": True})
+    workflow.input_parser = input_parser
+
+    result = await workflow.run_query("???", metadata={"user_id": "clarify"})
+
+    assert len(input_parser.calls) == 1
+    assert not result["draft"]
+    # Agents are built on first use; none of these nodes ran
+    for attr in ("intent_detector", "tone_stylist", "draft_writer", "personalizer", "validator", "memory_agent"):
+        assert attr not in workflow.__dict__
+
+
+async def test_profile_prefetch_feeds_personalization(workflow):
+    context = {"profile": {"name": "Pat"}}
+    agents = stub_agents(workflow, personalizer=StubPersonalizer({"personalized_draft": "Hi Sam"}, context=context))
+
+    await workflow.run_query("Follow up with Sam", metadata={"user_id": "prefetch"})
+
+    personalizer = agents["personalizer"]
+    assert personalizer.loads == 1
+    assert len(personalizer.calls) == 1
+    assert personalizer.calls[0]["personalization_prefetch"] == context
+    assert personalizer.calls[0]["draft"] == "Hi,\n\nDraft.\n\nBest"
+
+
+async def test_fail_with_revision_instructions_redrafts(workflow):
+    fail = {**FAIL, "validation_report": {**FAIL["validation_report"], "revision_instructions": "Shorter."}}
+    agents = stub_agents(workflow, validator=StubAgent(fail, PASS))
+
+    result = await workflow.run_query("Follow up with Sam", metadata={"user_id": "redraft"})
+
+    assert len(agents["draft_writer"].calls) == 2
+    assert len(agents["validator"].calls) == 2
+    assert agents["draft_writer"].calls[1]["retry_count"] == 1
+    assert result["validation_report"]["status"] == "PASS"
+
+
+async def test_revision_hints_update_constraints_for_the_redraft(workflow):
+    fail = {
+        **FAIL,
+        "validation_report": {**FAIL["validation_report"], "constraint_resolution": {"add_must_avoid": ["slang"]}},
+    }
+    agents = stub_agents(workflow, validator=StubAgent(fail, PASS))
+
+    await workflow.run_query("Follow up with Sam", metadata={"user_id": "hints"})
+
+    assert len(agents["draft_writer"].calls) == 2
+    assert agents["draft_writer"].calls[1]["constraints"]["must_avoid"] == ["slang"]
+
+
+async def test_validator_constraint_resolution_reaches_the_redraft(workflow):
+    replies = [
+        {
+            "status": "FAIL",
+            "summary": "Uses slang.",
+            "issues": [{"category": "constraints", "severity": "medium", "detail": "E: 'gonna'"}],
+            "revision_instructions": "",
+            "constraint_resolution": {"add_must_avoid": ["slang"], "override_tone_label": "formal"},
+        },
+        {"status": "PASS", "summary": "Fine.", "issues": [], "revision_instructions": ""},
+    ]
+    llm = GenericFakeChatModel(messages=iter([AIMessage(content=json.dumps(r)) for r in replies]))
+    agents = stub_agents(
+        workflow,
+        validator=ReviewValidatorAgent(llm=llm, logger=logging.getLogger("test.workflow")),
+    )
+
+    result = await workflow.run_query("Follow up with Sam", metadata={"user_id": "real-hints"})
+
+    assert len(agents["draft_writer"].calls) == 2
+    redraft = agents["draft_writer"].calls[1]
+    assert redraft["constraints"]["must_avoid"] == ["slang"]
+    assert redraft["tone_params"]["tone_label"] == "formal"
+    assert result["validation_report"]["status"] == "PASS"
+
+
+async def test_retries_stop_at_max_retries(workflow):
+    fail = {**FAIL, "validation_report": {**FAIL["validation_report"], "revision_instructions": "Again."}}
+    agents = stub_agents(workflow, validator=StubAgent(fail))
+
+    await workflow.run_query("Follow up with Sam", metadata={"user_id": "max-retries"})
+
+    # Each FAIL bumps retry_count; the one that reaches MAX_RETRIES ends the run
+    assert len(agents["validator"].calls) == MAX_RETRIES
+    assert len(agents["draft_writer"].calls) == MAX_RETRIES
+
+
+async def test_minor_issues_are_polished_instead_of_redrafted(workflow):
+    agents = stub_agents(workflow, validator=StubAgent(MINOR_FAIL, PASS))
+
+    result = await workflow.run_query("Follow up with Sam", metadata={"user_id": "polish"})
+
+    assert len(agents["polisher"].calls) == 1
+    assert len(agents["draft_writer"].calls) == 1
+    assert len(agents["personalizer"].calls) == 1
+    assert len(agents["validator"].calls) == 2
+    assert result["draft"] == "Hi,\n\nPolished.\n\nBest"
+
+
+class ReplyingAgent(StubAgent):
+    """StubAgent that also appends a numbered AIMessage, like the real classifier agents."""
+
+    async def run(self, state):
+        response = await super().run(state)
+        response.messages = [AIMessage(content=f"reply #{len(self.calls)}")]
+        return response
+
+
+async def test_repeated_follow_up_reruns_the_nodes_and_keeps_history(workflow):
+    agents = stub_agents(
+        workflow,
+        input_parser=ReplyingAgent({"parsed_input": {"primary_request": "write"}}),
+        intent_detector=ReplyingAgent({"intent": "follow_up"}),
+    )
+
+    # Same thread (no metadata: user "default"); the follow-up repeats verbatim after a different turn
+    turns = ["Write to Sam about the invoice", "ok, send it", "Write to Sam about dinner", "ok, send it"]
+    for text in turns:
+        result = await workflow.run_query(text)
+
+    # Identical raw_input/parsed_input/constraints, but the answer depends on the history
+    assert len(agents["input_parser"].calls) == len(turns)
+    assert len(agents["intent_detector"].calls) == len(turns)
+    # Every turn's messages were appended to the thread, none overwritten
+    contents = [m.content for m in result["messages"]]
+    assert [c for c in contents if c in turns] == turns
+    assert len([c for c in contents if c.startswith("reply #")]) == 2 * len(turns)
+
+
+class StreamingDraftWriter(StubAgent):
+    """Draft writer whose run streams from a chat model, like the real agent's chain."""
+
+    def __init__(self, *drafts):
+        super().__init__()
+        self.model = GenericFakeChatModel(messages=iter([AIMessage(content=d) for d in drafts]))
+
+    async def run(self, state):
+        self.calls.append(dict(state))
+        message = await self.model.ainvoke(state["messages"])
+        return AgentResponse(messages=[message], updates={"draft": message.content})
+
+
+async def test_run_query_stream_yields_draft_tokens_then_result(workflow):
+    fail = {**FAIL, "validation_report": {**FAIL["validation_report"], "revision_instructions": "Shorter."}}
+    stub_agents(
+        workflow,
+        draft_writer=StreamingDraftWriter("First draft here", "Second draft"),
+        validator=StubAgent(fail, PASS),
+    )
+
+    events = [ev async for ev in workflow.run_query_stream("Follow up with Sam", metadata={"user_id": "stream"})]
+
+    kinds = [kind for kind, _ in events]
+    assert kinds[-1] == "result"
+    assert kinds.count("restart") == 2
+    # Tokens after the last restart are the final draft
+    last_restart = len(kinds) - 1 - kinds[::-1].index("restart")
+    assert "".join(v for k, v in events[last_restart:] if k == "token") == "Second draft"
+    assert events[-1][1]["draft"] == "Second draft"
+
+
+class SlowMemoryAgent(StubAgent):
+    """Memory agent stub whose write takes a while; `finished` counts completed writes."""
+
+    def __init__(self, delay: float):
+        super().__init__(delay=delay)
+        self.finished = 0
+
+    async def run(self, state):
+        response = await super().run(state)
+        self.finished += 1
+        response.messages = [AIMessage(content="Memory updated.")]
+        return response
+
+
+async def test_memory_write_runs_after_run_query_returns(workflow):
+    memory_agent = SlowMemoryAgent(delay=0.3)
+    stub_agents(workflow, memory_agent=memory_agent)
+
+    loop = asyncio.get_running_loop()
+    start = loop.time()
+    await workflow.run_query("Follow up with Sam", metadata={"user_id": "memory-bg"})
+
+    assert loop.time() - start < 0.25
+    assert memory_agent.finished == 0
+
+    await workflow.drain_memory_writes()
+
+    assert memory_agent.finished == 1
+    # The reply still lands in the thread's checkpointed history
+    snapshot = await workflow.app.aget_state({"configurable": {"thread_id": create_session_id("memory-bg")}})
+    assert snapshot.values["messages"][-1].content == "Memory updated."
+
+
+async def test_next_run_on_a_thread_waits_for_its_memory_write(workflow):
+    memory_agent = SlowMemoryAgent(delay=0.2)
+    agents = stub_agents(workflow, memory_agent=memory_agent)
+
+    await workflow.run_query("Write to Sam about the invoice", metadata={"user_id": "memory-order"})
+    assert memory_agent.finished == 0
+    result = await workflow.run_query("ok, send it", metadata={"user_id": "memory-order"})
+
+    # The second run started from the checkpoint that already had the first turn's memory reply
+    assert memory_agent.finished >= 1
+    second_input = [m.content for m in agents["input_parser"].calls[1]["messages"]]
+    assert second_input[-3] == "Memory updated."  # then the request context, then the request
+    assert second_input[-1] == "ok, send it"
+    contents = [m.content for m in result["messages"]]
+    assert contents.index("Memory updated.") < contents.index("ok, send it")
+
+
+async def test_aclose_waits_for_pending_memory_writes(workflow, monkeypatch):
+    # aclose() also closes the process-wide LLM HTTP client; keep the shared one out of it
+    monkeypatch.setattr(litellm, "aclient_session", None)
+    memory_agent = SlowMemoryAgent(delay=0.2)
+    stub_agents(workflow, memory_agent=memory_agent)
+
+    await workflow.run_query("Follow up with Sam", metadata={"user_id": "memory-close"})
+    assert memory_agent.finished == 0
+
+    await workflow.aclose()
+
+    assert memory_agent.finished == 1
+
+
+async def test_memory_writes_past_the_pending_limit_are_dropped(workflow, monkeypatch):
+    monkeypatch.setattr(workflow_module, "MAX_PENDING_MEMORY_WRITES", 1)
+    memory_agent = SlowMemoryAgent(delay=0.2)
+    stub_agents(workflow, memory_agent=memory_agent)
+
+    await workflow.run_queries([
+        {"user_input": "Follow up with Sam", "metadata": {"user_id": "memory-cap-1"}},
+        {"user_input": "Follow up with Pat", "metadata": {"user_id": "memory-cap-2"}},
+    ])
+    await workflow.drain_memory_writes()
+
+    assert memory_agent.finished == 1
+
+
+async def test_sessions_of_the_same_user_get_separate_threads(workflow):
+    agents = stub_agents(workflow)
+
+    await workflow.run_query("Write to Sam about the invoice", session_id="tab-1")
+    result = await workflow.run_query("Write to Pat about dinner", session_id="tab-2")
+
+    # Same (default) user, different sessions: the second thread starts empty
+    contents = [m.content for m in result["messages"]]
+    assert "Write to Sam about the invoice" not in contents
+    assert agents["input_parser"].calls[1]["messages"][-1].content == "Write to Pat about dinner"
+    assert len(agents["input_parser"].calls[1]["messages"]) == 1
+
+
+async def test_least_recently_used_threads_are_dropped(workflow, monkeypatch):
+    monkeypatch.setattr(workflow_module, "MAX_CHECKPOINT_THREADS", 1)
+    stub_agents(workflow)
+
+    await workflow.run_query("Write to Sam about the invoice", session_id="old")
+    await workflow.run_query("Write to Pat about dinner", session_id="new")
+
+    old = await workflow.app.aget_state({"configurable": {"thread_id": create_session_id("default:old")}})
+    new = await workflow.app.aget_state({"configurable": {"thread_id": create_session_id("default:new")}})
+    assert not old.values
+    assert new.values["messages"]
@@ -0,0 +1,26 @@
+from langchain_core.messages import AIMessage, AIMessageChunk
+
+
+class FakeChain:
+    """
+    Stand-in for an agent's prompt | llm chain: captures the last input and returns
+    a fixed reply (the same AIMessage on every call; built once per fake).
+    """
+
+    def __init__(self, response_text: str):
+        self.response_text = response_text
+        self.response = AIMessage(content=response_text)
+        self.last_input = None
+
+    async def ainvoke(self, inp, config=None):
+        self.last_input = inp
+        return self.response
+
+    async def astream(self, inp, config=None):
+        # 8-character chunks; `streamed` counts the characters actually consumed
+        self.last_input = inp
+        self.streamed = 0
+        for i in range(0, len(self.response_text), 8):
+            piece = self.response_text[i:i + 8]
+            self.streamed += len(piece)
+            yield AIMessageChunk(content=piece)